@@ -0,0 +1,282 @@
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+import lugo4py
+from ball_kinematics import BallTrajectory
+from candidate_scoring import inside_field
+from instrumentation import parse_duration_ms
+from pass_lanes import INTERCEPTION_REACH
+from shot_map import ShotMap
+from turn_context import TurnContext
+
+SHOOT, PASS, CARRY = 'shoot', 'pass', 'carry'
+
+# Pontos de cada caminho simulado: ao longo da linha do chute/passe, ou um por turno de condução
+PATH_SAMPLES = 8
+# Direções de condução da bola avaliadas; cada uma é simulada por PATH_SAMPLES turnos
+CARRY_DIRECTIONS = 16
+# Alvos de passe: o companheiro e pontos à frente dele (no sentido do ataque)
+PASS_LEADS = (0, 300)
+
+# Cada lote simula ROLLOUTS_PER_BATCH mundos para todas as ações. Em cada mundo, cada adversário
+# continua no movimento atual por um atraso de reação sorteado e depois corre até o caminho da bola
+# com uma fração sorteada da velocidade máxima.
+ROLLOUTS_PER_BATCH = 8
+MAX_REACTION_TURNS = 1
+MIN_SPEED_FACTOR = 0.85
+
+# Valores dos desfechos. Com a bola: o avanço no campo, o espaço livre na chegada e a chance de chutar
+# de lá (somados, ficam abaixo de 1). Bola perdida: pior quanto mais perto do nosso gol.
+# Gol: GOAL_VALUE, então o chute vale a pena a partir de uns 30% de qualidade perto do gol.
+GOAL_VALUE = 2.0
+PROGRESS_WEIGHT = 0.5
+SPACE_WEIGHT = 0.1
+SPACE_SCALE = 2000.0
+FUTURE_SHOT_WEIGHT = 0.3
+LOSS_WEIGHT = 0.5
+# Turnos à frente em que o espaço livre na chegada é medido (adversários previstos)
+SPACE_LOOKAHEAD_TURNS = 3
+
+# Fração de LISTENING_DURATION disponível para a busca e limite de lotes por turno
+DEFAULT_BUDGET_FRACTION = 0.3
+DEFAULT_MAX_BATCHES = 64
+
+# A busca para antes do prazo quando a melhor ação já está decidida: a vantagem dela sobre a segunda passa
+# de CONVERGENCE_Z erros padrão da diferença, ou as duas estão tão bem estimadas que a diferença que
+# ainda pode aparecer (abaixo de VALUE_TOLERANCE) não importa. Antes de MIN_BATCHES lotes não se decide nada.
+CONVERGENCE_Z = 3.0
+VALUE_TOLERANCE = 0.02
+MIN_BATCHES = 2
+
+
+class ActionCandidates(NamedTuple):
+    """
+    Ações avaliadas pela busca. Para cada uma: o caminho da bola (C, PATH_SAMPLES, 2), o turno em que
+    a bola passa por cada ponto e o valor do desfecho se a bola não for tomada (`success_value`)
+    ou se for (`failure_value`).
+    """
+    kinds: List[str]
+    numbers: np.ndarray
+    targets: np.ndarray
+    paths: np.ndarray
+    ball_turns: np.ndarray
+    ignores_goalkeeper: np.ndarray
+    success_value: np.ndarray
+    failure_value: np.ndarray
+
+
+class ActionChoice(NamedTuple):
+    kind: str
+    number: int
+    target: lugo4py.Point
+    value: float
+    success: float
+    rollouts: int
+
+
+class ActionSearch:
+    """
+    Busca anytime da ação do portador da bola: gera de uma vez os candidatos (chute, passes para cada
+    companheiro, conduções em várias direções), simula lotes de mundos com o modelo da bola e os
+    adversários previstos e estima, para cada ação, a chance de a bola não ser tomada no caminho.
+    Simula lotes enquanto couber mais um antes do prazo (ou até `max_batches`), então máquinas mais
+    rápidas fazem mais simulações e decidem melhor sem perder o turno. Para antes disso quando a
+    melhor ação já se destacou das outras (veja CONVERGENCE_Z), liberando o GIL para os outros bots
+    do processo.
+    """
+
+    def __init__(self, budget_ms: float, max_batches: int = DEFAULT_MAX_BATCHES):
+        self.budget_ms = budget_ms
+        self.max_batches = max_batches
+        self.searches = 0
+        self.batches = 0
+        self.deadline_stops = 0
+        self.converged_stops = 0
+        self.choices: Dict[str, int] = {SHOOT: 0, PASS: 0, CARRY: 0}
+        # Interrompe a busca no próximo lote (usado pela especulação quando o turno real chega antes)
+        self.stop: Optional[threading.Event] = None
+
+    @classmethod
+    def from_env(cls, bots_in_process: int = 1) -> Optional['ActionSearch']:
+        """
+        Prazo de ACTION_SEARCH_FRACTION x LISTENING_DURATION, dividido entre os `bots_in_process` bots
+        que disputam o GIL no mesmo processo (team_main.py), e limite de ACTION_SEARCH_BATCHES lotes.
+        Só é criada com ACTION_SEARCH=on; sem isso, on_holding segue as regras fixas.
+        """
+        if os.environ.get('ACTION_SEARCH', '').lower() != 'on':
+            return None
+        listening_ms = parse_duration_ms(os.environ.get('LISTENING_DURATION', '50ms'))
+        fraction = float(os.environ.get('ACTION_SEARCH_FRACTION', DEFAULT_BUDGET_FRACTION))
+        return cls(listening_ms * fraction / max(bots_in_process, 1),
+                   int(os.environ.get('ACTION_SEARCH_BATCHES', DEFAULT_MAX_BATCHES)))
+
+    def search(self, candidates: ActionCandidates, context: TurnContext, started_at: float,
+               seed: int = 0) -> Optional[ActionChoice]:
+        """
+        Simula lotes até o prazo (`budget_ms` contados de `started_at`, em perf_counter) ou até a melhor
+        ação convergir, e retorna a de maior valor esperado. Sempre simula ao menos um lote.
+        """
+        if len(candidates.kinds) == 0:
+            return None
+
+        deadline = started_at + self.budget_ms / 1000
+        rng = np.random.default_rng(seed)
+        successes = np.zeros(len(candidates.kinds))
+        batches = 0
+        while True:
+            batch_start = time.perf_counter()
+            successes += rollout_batch(candidates, context, rng)
+            batches += 1
+            now = time.perf_counter()
+            if batches >= self.max_batches or (self.stop is not None and self.stop.is_set()):
+                break
+            if batches >= MIN_BATCHES and _converged(candidates, successes, batches * ROLLOUTS_PER_BATCH):
+                self.converged_stops += 1
+                break
+            if now + (now - batch_start) > deadline:
+                self.deadline_stops += 1
+                break
+
+        value, success = _estimate(candidates, successes, batches * ROLLOUTS_PER_BATCH)
+        rollouts = batches * ROLLOUTS_PER_BATCH
+        best = int(np.argmax(value))
+        self.searches += 1
+        self.batches += batches
+        self.choices[candidates.kinds[best]] += 1
+        x, y = candidates.targets[best]
+        return ActionChoice(candidates.kinds[best], int(candidates.numbers[best]), lugo4py.Point(x=float(x), y=float(y)),
+                            float(value[best]), float(success[best]), rollouts)
+
+    def stats(self) -> dict:
+        return {
+            'budget_ms': self.budget_ms,
+            'searches': self.searches,
+            'mean_rollouts': round(self.batches * ROLLOUTS_PER_BATCH / self.searches, 1) if self.searches else 0.0,
+            'deadline_stops': self.deadline_stops,
+            'converged_stops': self.converged_stops,
+            'choices': dict(self.choices),
+        }
+
+
+def holder_candidates(context: TurnContext, me: lugo4py.Player, shot_map: ShotMap, keeper_y: float,
+                      shot_quality: float, shot_target: lugo4py.Point) -> ActionCandidates:
+    """
+    Monta os candidatos do portador `me`: o chute em `shot_target`, passes para cada companheiro de linha
+    (com os avanços de PASS_LEADS) e conduções em CARRY_DIRECTIONS direções.
+    """
+    side_factor = 1 if context.side == lugo4py.TeamSide.HOME else -1
+    origin = context.ball_position
+    fractions = np.arange(1, PATH_SAMPLES + 1) / PATH_SAMPLES
+
+    # Chute e passes: a bola chutada na velocidade máxima
+    receivers = (context.ally_numbers != me.number) & (context.ally_numbers != lugo4py.specs.GOALKEEPER_NUMBER)
+    numbers = np.repeat(context.ally_numbers[receivers], len(PASS_LEADS))
+    pass_targets = np.repeat(context.ally_positions[receivers], len(PASS_LEADS), axis=0)
+    pass_targets[:, 0] += np.tile(PASS_LEADS, int(receivers.sum())) * side_factor
+    kick_targets = np.vstack(([(shot_target.x, shot_target.y)], pass_targets))
+    np.clip(kick_targets[:, 0], 0, lugo4py.specs.MAX_X_COORDINATE, out=kick_targets[:, 0])
+
+    lanes = kick_targets - origin
+    lengths = np.hypot(lanes[:, 0], lanes[:, 1])
+    kick = BallTrajectory(origin, np.array([100.0, 0.0]), lugo4py.specs.BALL_MAX_SPEED)
+    kick_turns = kick.turns_to_travel(lengths[:, np.newaxis] * fractions)
+    kick_paths = origin + lanes[:, np.newaxis, :] * fractions[np.newaxis, :, np.newaxis]
+
+    # Conduções: o portador anda PLAYER_MAX_SPEED por turno com a bola
+    angles = np.linspace(0, 2 * np.pi, CARRY_DIRECTIONS, endpoint=False)
+    directions = np.column_stack((np.cos(angles), np.sin(angles)))
+    steps = np.arange(1, PATH_SAMPLES + 1) * lugo4py.specs.PLAYER_MAX_SPEED
+    carry_paths = origin + directions[:, np.newaxis, :] * steps[np.newaxis, :, np.newaxis]
+    inside = inside_field(carry_paths[:, -1])
+    carry_paths = carry_paths[inside]
+    carry_turns = np.tile(np.arange(1, PATH_SAMPLES + 1, dtype=float), (len(carry_paths), 1))
+
+    n_kicks, n_carries = len(kick_targets), len(carry_paths)
+    kinds = [SHOOT] + [PASS] * (n_kicks - 1) + [CARRY] * n_carries
+    targets = np.vstack((kick_targets, carry_paths[:, -1]))
+
+    # Valores dos desfechos
+    arrival = targets
+    progress = _progress(arrival, side_factor)
+    space = np.minimum(context.nearest_opponent_distance(arrival, SPACE_LOOKAHEAD_TURNS), SPACE_SCALE) / SPACE_SCALE
+    future_shot = shot_map.qualities(context.side, arrival, keeper_y)
+    success_value = PROGRESS_WEIGHT * progress + SPACE_WEIGHT * space + FUTURE_SHOT_WEIGHT * future_shot
+    failure_value = -LOSS_WEIGHT * (1 - progress)
+
+    # O chute: o gol com a qualidade do mapa; defendido, a bola fica com o goleiro no fundo do campo deles
+    success_value[0] = shot_quality * GOAL_VALUE
+    failure_value[0] = -LOSS_WEIGHT * (1 - _progress(np.array([origin]), side_factor)[0])
+
+    return ActionCandidates(
+        kinds=kinds,
+        numbers=np.concatenate(([0], numbers, np.zeros(n_carries, dtype=int))),
+        targets=targets,
+        paths=np.concatenate((kick_paths, carry_paths)),
+        ball_turns=np.concatenate((kick_turns, carry_turns)),
+        ignores_goalkeeper=np.array([True] + [False] * (n_kicks - 1 + n_carries)),
+        success_value=success_value,
+        failure_value=failure_value,
+    )
+
+
+def rollout_batch(candidates: ActionCandidates, context: TurnContext, rng: np.random.Generator) -> np.ndarray:
+    """
+    Simula ROLLOUTS_PER_BATCH mundos e retorna, para cada ação, em quantos deles nenhum adversário
+    chega a algum ponto do caminho antes da bola. Vetorizado em mundos x ações x pontos x adversários.
+    """
+    if len(context.opponents) == 0:
+        return np.where(np.isinf(candidates.ball_turns[:, -1]), 0, ROLLOUTS_PER_BATCH)
+
+    n_opponents = len(context.opponents)
+    delays = rng.integers(0, MAX_REACTION_TURNS + 1, size=(ROLLOUTS_PER_BATCH, n_opponents))
+    speeds = lugo4py.specs.PLAYER_MAX_SPEED * rng.uniform(MIN_SPEED_FACTOR, 1.0, size=(ROLLOUTS_PER_BATCH, n_opponents))
+    starts = context.opponent_positions + context.opponent_velocities * delays[..., np.newaxis]
+
+    # Turnos de cada adversário até cada ponto de cada caminho (W, C, S, O)
+    delta = candidates.paths[np.newaxis, :, :, np.newaxis, :] - starts[:, np.newaxis, np.newaxis, :, :]
+    distances = np.maximum(np.hypot(delta[..., 0], delta[..., 1]) - INTERCEPTION_REACH, 0)
+    opponent_turns = delays[:, np.newaxis, np.newaxis, :] + distances / speeds[:, np.newaxis, np.newaxis, :]
+
+    # O goleiro não conta nos chutes: o mapa de chutes já considera se ele chega
+    keeper = context.opponent_numbers == lugo4py.specs.GOALKEEPER_NUMBER
+    if keeper.any():
+        ignored = candidates.ignores_goalkeeper[:, np.newaxis] & keeper[np.newaxis, :]
+        opponent_turns = np.where(ignored[np.newaxis, :, np.newaxis, :], np.inf, opponent_turns)
+
+    margin = (opponent_turns.min(axis=3) - candidates.ball_turns[np.newaxis]).min(axis=2)
+    return (margin > 0).sum(axis=0)
+
+
+def _estimate(candidates: ActionCandidates, successes: np.ndarray, rollouts: int):
+    """
+    Valor esperado e chance de sucesso de cada ação. A estimativa começa com uma simulação "meio sucesso"
+    a priori, para as poucas simulações não decidirem sozinhas.
+    """
+    success = (successes + 0.5) / (rollouts + 1)
+    return success * candidates.success_value + (1 - success) * candidates.failure_value, success
+
+
+def _converged(candidates: ActionCandidates, successes: np.ndarray, rollouts: int) -> bool:
+    """
+    Se mais simulações não mudariam a escolha: a vantagem da melhor ação sobre a segunda, comparada ao
+    erro padrão da diferença (o valor de cada ação é linear na chance de sucesso, que é uma proporção).
+    """
+    if len(successes) < 2:
+        return True
+    value, success = _estimate(candidates, successes, rollouts)
+    errors = np.abs(candidates.success_value - candidates.failure_value) * np.sqrt(success * (1 - success) / rollouts)
+    second, best = np.argpartition(value, -2)[-2:]
+    error = np.hypot(errors[best], errors[second])
+    return value[best] - value[second] > CONVERGENCE_Z * error or error < VALUE_TOLERANCE
+
+
+def _progress(points: np.ndarray, side_factor: int) -> np.ndarray:
+    """
+    Avanço (0 a 1) de cada ponto no sentido do ataque.
+    """
+    x = points[:, 0] / lugo4py.specs.MAX_X_COORDINATE
+    return x if side_factor > 0 else 1 - x
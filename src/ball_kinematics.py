@@ -0,0 +1,133 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+import lugo4py
+from turn_context import get_turn_context
+
+
+class BallTrajectory:
+    """
+    Solução fechada do modelo de desaceleração da bola usado pelo bot:
+    a cada turno a velocidade cai BALL_DECELERATION (sem ficar negativa) e a bola anda
+    `direção * velocidade / 100`. Após k turnos o deslocamento acumulado é
+    S(k) = k * v0 - D * k * (k + 1) / 2, limitado ao turno em que a bola para.
+    """
+
+    def __init__(self, position: np.ndarray, direction: np.ndarray, speed: float,
+                 deceleration: float = lugo4py.specs.BALL_DECELERATION):
+        self.position = np.asarray(position, dtype=float)
+        self.step = np.asarray(direction, dtype=float) / 100
+        self.speed = max(float(speed), 0.0)
+        self.deceleration = deceleration
+
+        # Último turno em que a bola ainda anda (velocidade >= 0 depois da desaceleração)
+        self.stop_turn = int(self.speed // deceleration) if deceleration > 0 else 0
+
+    def travelled(self, turns) -> np.ndarray:
+        """
+        S(k): soma das velocidades após `turns` turnos (escalar ou array de horizontes).
+        """
+        k = np.minimum(np.maximum(np.asarray(turns, dtype=float), 0), self.stop_turn)
+        return k * self.speed - self.deceleration * k * (k + 1) / 2
+
+    def turns_to_travel(self, distances) -> np.ndarray:
+        """
+        Menor k com S(k) >= distância, para cada distância de um array. Distâncias que a bola
+        não percorre antes de parar recebem infinito.
+        """
+        travelled = self.travelled(np.arange(self.stop_turn + 1))
+        turns = np.searchsorted(travelled, distances, side='left')
+        return np.where(turns > self.stop_turn, np.inf, turns)
+
+    def position_at(self, turns) -> np.ndarray:
+        """
+        Posição da bola após `turns` turnos. Para um array de N horizontes retorna (N, 2).
+        """
+        travelled = self.travelled(turns)
+        return self.position + np.multiply.outer(travelled, self.step)
+
+    def trajectory(self, horizon: int) -> np.ndarray:
+        """
+        Posições (horizon + 1, 2) da bola do turno atual até `horizon` turnos à frente.
+        """
+        return self.position_at(np.arange(horizon + 1))
+
+    @property
+    def stop_point(self) -> np.ndarray:
+        return self.position_at(self.stop_turn)
+
+    def goal_line_crossing(self, goal_line_x: float, max_turns: Optional[int] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Turno e ponto em que a bola cruza a linha x = `goal_line_x`, ou None se ela parar antes
+        (ou depois de `max_turns`) ou estiver se afastando da linha.
+        """
+        if self.step[0] == 0 or self.stop_turn == 0:
+            return None
+
+        needed = (goal_line_x - self.position[0]) / self.step[0]
+        if needed < 0 or needed > self.travelled(self.stop_turn):
+            return None
+
+        # Menor k com S(k) >= needed: raiz de D/2 k^2 - (v0 - D/2) k + needed = 0
+        half_dec = self.deceleration / 2
+        b = self.speed - half_dec
+        if half_dec > 0:
+            k = math.ceil((b - math.sqrt(max(b * b - 4 * half_dec * needed, 0.0))) / (2 * half_dec))
+        else:
+            k = math.ceil(needed / self.speed) if self.speed > 0 else 0
+        k = min(max(k, 1), self.stop_turn)
+        # Corrige eventuais erros de arredondamento da raiz
+        while k > 1 and self.travelled(k - 1) >= needed:
+            k -= 1
+        while k < self.stop_turn and self.travelled(k) < needed:
+            k += 1
+
+        if max_turns is not None and k > max_turns:
+            return None
+
+        crossing = self.position + self.step * needed
+        return k, crossing
+
+    def earliest_interception(self, origin: np.ndarray, player_speed: float, reach: float = 0.0,
+                              horizon: int = 30) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Primeiro turno (até `horizon`) em que um jogador saindo de `origin` com velocidade
+        `player_speed` consegue chegar até a bola, considerando o alcance `reach`.
+        """
+        turns = np.arange(horizon + 1)
+        positions = self.position_at(turns)
+        distances = np.hypot(positions[:, 0] - origin[0], positions[:, 1] - origin[1])
+        reachable = np.flatnonzero(distances <= turns * player_speed + reach)
+        if len(reachable) == 0:
+            return None
+
+        turn = int(reachable[0])
+        return turn, positions[turn]
+
+    def earliest_interceptions(self, origins: np.ndarray, player_speed: float, reach: float = 0.0,
+                               horizon: int = 30) -> np.ndarray:
+        """
+        `earliest_interception` para N jogadores (N, 2) de uma vez: o primeiro turno de cada um (N,),
+        infinito para quem não chega até a bola em `horizon` turnos.
+        """
+        turns = np.arange(horizon + 1)
+        positions = self.position_at(turns)
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        distances = np.hypot(positions[np.newaxis, :, 0] - origins[:, np.newaxis, 0],
+                             positions[np.newaxis, :, 1] - origins[:, np.newaxis, 1])
+        reachable = distances <= turns * player_speed + reach
+        return np.where(reachable.any(axis=1), reachable.argmax(axis=1), np.inf)
+
+
+def get_ball_trajectory(inspector: lugo4py.GameSnapshotInspector) -> BallTrajectory:
+    """
+    Trajetória da bola do turno, calculada uma vez e compartilhada por todos os helpers.
+    """
+    context = get_turn_context(inspector)
+    trajectory = context.cache.get('ball_trajectory')
+    if trajectory is None:
+        trajectory = BallTrajectory(context.ball_position, context.ball_direction, context.ball_speed)
+        context.cache['ball_trajectory'] = trajectory
+    return trajectory
@@ -0,0 +1,437 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import lugo4py
+from lugo4py.protos import server_pb2
+from action_search import ActionSearch
+from frame_cache import FrameCache
+from my_bot import MyBot
+from replay import dispatch_turn
+from settings import MAPPER_COLS, MAPPER_ROWS, get_initial_position, get_my_expected_position, get_strategy, \
+    get_tactic_table
+
+HOME = lugo4py.TeamSide.HOME
+AWAY = lugo4py.TeamSide.AWAY
+PLAYERS = lugo4py.specs.MAX_PLAYERS
+MAX_X = lugo4py.specs.MAX_X_COORDINATE
+MAX_Y = lugo4py.specs.MAX_Y_COORDINATE
+
+# Times dos cenários: o que ataca (para x = MAX_X, visto como o time da casa) e o que defende
+ATTACK, DEFENSE = 0, 1
+
+DEFAULT_SEED = 2024
+DEFAULT_WARMUP = 20
+# Chamadas medidas por rodada; as rodadas passam por todas as medidas, uma de cada vez, então uma
+# variação lenta da máquina (outro processo, frequência da CPU) afeta todas por igual
+DEFAULT_REPEAT = 40
+DEFAULT_ROUNDS = 5
+# Regressão: a rodada mais rápida e a mediana pelo menos esta porcentagem acima das anteriores
+DEFAULT_THRESHOLD = 10.0
+
+# Lotes da ActionSearch em cada on_holding medido: sem o prazo, o tempo medido é o do trabalho
+# feito, e não o orçamento do turno (que a busca sempre ocupa)
+SEARCH_BATCHES = 4
+
+FORMAT_VERSION = 1
+
+
+class Scenario(NamedTuple):
+    """
+    Situação de jogo do ponto de vista do time que ataca, para x = MAX_X. `positions` e `velocities`
+    são (2, PLAYERS, 2) por time (ATTACK, DEFENSE) e índice (número - 1); `holder` é (time, índice)
+    ou None; `me` é o número do jogador cujos helpers são medidos.
+    """
+    name: str
+    positions: np.ndarray
+    velocities: np.ndarray
+    ball: np.ndarray
+    ball_velocity: np.ndarray
+    holder: Optional[Tuple[int, int]]
+    me: int
+
+
+def kickoff(rng: np.random.Generator) -> Scenario:
+    compiled = get_tactic_table().compiled
+    positions = compiled[[HOME, AWAY], 1:, -1]
+    return Scenario('kickoff', positions, np.zeros_like(positions), np.array([MAX_X / 2, MAX_Y / 2]),
+                    np.zeros(2), None, 10)
+
+
+def crowded_midfield(rng: np.random.Generator) -> Scenario:
+    positions = rng.normal((MAX_X / 2, MAX_Y / 2), (1500, 1200), size=(2, PLAYERS, 2))
+    positions[ATTACK, 0] = (600, MAX_Y / 2)
+    positions[DEFENSE, 0] = (MAX_X - 600, MAX_Y / 2)
+    positions[ATTACK, 7] = (MAX_X / 2, MAX_Y / 2)
+    return Scenario('crowded_midfield', positions, _random_velocities(rng, 60), positions[ATTACK, 7].copy(),
+                    np.zeros(2), (ATTACK, 7), 8)
+
+
+def counter_attack(rng: np.random.Generator) -> Scenario:
+    positions = np.empty((2, PLAYERS, 2))
+    positions[ATTACK, 0] = (500, MAX_Y / 2)
+    positions[ATTACK, 1:5] = rng.uniform((5000, 1500), (8000, 8500), size=(4, 2))
+    positions[ATTACK, 5:8] = rng.uniform((9000, 1500), (11500, 8500), size=(3, 2))
+    positions[ATTACK, 8] = (12500, 4500)
+    positions[ATTACK, 9:11] = ((14500, 3000), (14000, 7000))
+    positions[DEFENSE, 0] = (MAX_X - 500, MAX_Y / 2)
+    positions[DEFENSE, 1:4] = rng.uniform((15000, 2500), (17000, 7500), size=(3, 2))
+    positions[DEFENSE, 4:] = rng.uniform((8000, 1000), (11500, 9000), size=(7, 2))
+
+    velocities = np.zeros((2, PLAYERS, 2))
+    velocities[ATTACK, 5:] = (100, 0)
+    velocities[DEFENSE, 1:] = (100, 0)
+    velocities += _random_velocities(rng, 20)
+    return Scenario('counter_attack', positions, velocities, positions[ATTACK, 8].copy(), np.array([100.0, 0.0]),
+                    (ATTACK, 8), 9)
+
+
+def goalmouth_scramble(rng: np.random.Generator) -> Scenario:
+    goalmouth = (MAX_X - 2200, MAX_Y / 2)
+    positions = np.empty((2, PLAYERS, 2))
+    positions[ATTACK, 0] = (MAX_X / 2 - 2000, MAX_Y / 2)
+    positions[ATTACK, 1:6] = rng.uniform((8000, 1000), (13000, 9000), size=(5, 2))
+    positions[ATTACK, 6:] = rng.normal(goalmouth, 800, size=(5, 2))
+    positions[DEFENSE, 0] = (MAX_X - 400, MAX_Y / 2)
+    positions[DEFENSE, 1:8] = rng.normal(goalmouth, 900, size=(7, 2))
+    positions[DEFENSE, 8:] = rng.uniform((11000, 2000), (14000, 8000), size=(3, 2))
+    angle = rng.uniform(-np.pi, np.pi)
+    return Scenario('goalmouth_scramble', positions, _random_velocities(rng, 80),
+                    np.array([MAX_X - 1700, MAX_Y / 2 - 400]), 30 * np.array([np.cos(angle), np.sin(angle)]),
+                    None, 10)
+
+
+SCENARIOS: List[Callable[[np.random.Generator], Scenario]] = [kickoff, crowded_midfield, counter_attack,
+                                                              goalmouth_scramble]
+
+
+def _random_velocities(rng: np.random.Generator, max_speed: float) -> np.ndarray:
+    angles = rng.uniform(-np.pi, np.pi, size=(2, PLAYERS))
+    speeds = rng.uniform(0, max_speed, size=(2, PLAYERS))
+    return np.stack((np.cos(angles) * speeds, np.sin(angles) * speeds), axis=-1)
+
+
+def build_snapshot(scenario: Scenario, side: lugo4py.TeamSide, turn: int, back: int = 0) -> server_pb2.GameSnapshot:
+    """
+    Snapshot do cenário com o time que ataca no lado `side` (para o visitante, o campo é espelhado,
+    como no Mapper). Com `back`, os jogadores e a bola voltam `back` turnos pelas velocidades.
+    """
+    mirror = side == AWAY
+    snapshot = server_pb2.GameSnapshot()
+    snapshot.state = server_pb2.GameSnapshot.State.LISTENING
+    snapshot.turn = turn
+
+    sides = {ATTACK: side, DEFENSE: AWAY if side == HOME else HOME}
+    for team, team_side in sides.items():
+        message = snapshot.home_team if team_side == HOME else snapshot.away_team
+        message.side = team_side
+        message.name = 'HOME' if team_side == HOME else 'AWAY'
+        for index in range(PLAYERS):
+            player = message.players.add()
+            player.number = index + 1
+            player.team_side = team_side
+            _fill(player.position, player.velocity, scenario.positions[team, index] - back *
+                  scenario.velocities[team, index], scenario.velocities[team, index], mirror)
+            player.init_position.CopyFrom(get_initial_position(team_side, index + 1))
+
+    ball = scenario.ball - back * scenario.ball_velocity
+    _fill(snapshot.ball.position, snapshot.ball.velocity, ball, scenario.ball_velocity, mirror)
+    if scenario.holder is not None:
+        team, index = scenario.holder
+        message = snapshot.home_team if sides[team] == HOME else snapshot.away_team
+        snapshot.ball.holder.CopyFrom(message.players[index])
+    return snapshot
+
+
+def _fill(position, velocity, xy: np.ndarray, step: np.ndarray, mirror: bool):
+    x, y = np.clip(xy, 0, (MAX_X, MAX_Y))
+    if mirror:
+        x, y, step = MAX_X - x, MAX_Y - y, -step
+    position.x, position.y = int(round(x)), int(round(y))
+    speed = float(np.hypot(step[0], step[1]))
+    if speed > 0:
+        # Direções com módulo 100, como as do servidor
+        velocity.direction.x, velocity.direction.y = step[0] / speed * 100, step[1] / speed * 100
+    velocity.speed = speed
+
+
+# Helpers medidos: nome -> chamada (bot, inspector)
+HELPERS: Dict[str, Callable[[MyBot, lugo4py.GameSnapshotInspector], object]] = {
+    'get_closest_players': lambda bot, inspector: bot.get_closest_players(inspector),
+    'get_role': lambda bot, inspector: bot.get_role(inspector),
+    'get_free_allies': lambda bot, inspector: bot.get_free_allies(inspector, bot.strategy.free_ally_radius),
+    'is_marked': lambda bot, inspector: bot.is_marked(inspector, inspector.get_me(), bot.strategy.marked_holder_radius),
+    'find_support_position': lambda bot, inspector: bot.find_support_position(
+        inspector, inspector.get_ball_holder() or inspector.get_me()),
+    'find_open_space_in_attack': lambda bot, inspector: bot.find_open_space_in_attack(inspector),
+    'find_dribble_position': lambda bot, inspector: bot.find_dribble_position(inspector),
+    'find_best_pass': lambda bot, inspector: bot.find_best_pass(
+        inspector, [p for p in inspector.get_my_team_players() if p.number != bot.number]),
+    'search_action': lambda bot, inspector: bot.search_action(inspector),
+    'evaluate_shot': lambda bot, inspector: bot.evaluate_shot(inspector),
+    'predict_ball_reachable_position': lambda bot, inspector: bot.predict_ball_reachable_position(
+        inspector, inspector.get_me()),
+    'predict_ball_interception_point': lambda bot, inspector: bot.predict_ball_interception_point(inspector),
+    'dynamic_defensive_position': lambda bot, inspector: bot.dynamic_defensive_position(
+        inspector, bot.strategy.def_players[0]),
+    'get_my_expected_position': lambda bot, inspector: get_my_expected_position(
+        inspector, bot.mapper, bot.number, bot.strategy),
+}
+
+
+class Benchmark(NamedTuple):
+    key: str
+    bot: MyBot
+    snapshot: server_pb2.GameSnapshot
+    call: Callable[[MyBot, lugo4py.GameSnapshotInspector], object]
+    # Os helpers são medidos com o turno já iniciado; os handlers iniciam o turno por conta própria
+    start_turn: bool
+
+
+def benchmarks(seed: int = DEFAULT_SEED) -> List[Benchmark]:
+    """
+    Todos os pares (cenário, lado) com os helpers do jogador `me` e os handlers de `me`, do primeiro
+    defensor e do goleiro. Os cenários são sorteados com `seed`, então a lista é sempre a mesma.
+    """
+    result = []
+    strategy = get_strategy()
+    for index, make_scenario in enumerate(SCENARIOS):
+        scenario = make_scenario(np.random.default_rng([seed, index]))
+        for side in (HOME, AWAY):
+            snapshot = build_snapshot(scenario, side, turn=10)
+            previous = build_snapshot(scenario, side, turn=9, back=1)
+            prefix = f"{scenario.name}/{'home' if side == HOME else 'away'}"
+            bots = {}
+            for number in dict.fromkeys((scenario.me, strategy.def_players[0], lugo4py.specs.GOALKEEPER_NUMBER)):
+                bot = bots[number] = new_bot(side, number)
+                # O turno anterior dá ao OpponentTracker as velocidades dos adversários
+                bot._start_turn(lugo4py.GameSnapshotInspector(side, number, previous), 'benchmark')
+
+            for name, helper in HELPERS.items():
+                result.append(Benchmark(f'{prefix}/{name}', bots[scenario.me], snapshot, helper, True))
+            for number, bot in bots.items():
+                handler = dispatch_turn(bot, lugo4py.GameSnapshotInspector(side, number, snapshot))[0]
+                result.append(Benchmark(f'{prefix}/{handler}#{number}', bot, snapshot,
+                                        lambda bot, inspector: dispatch_turn(bot, inspector), False))
+    return result
+
+
+def calibration(bot: MyBot, inspector: lugo4py.GameSnapshotInspector):
+    """
+    Trabalho fixo, sem nada do bot, com a mesma mistura dos helpers: numpy em arrays pequenos e
+    Python puro. Só a velocidade da máquina muda o seu tempo (o inspector é ignorado).
+    """
+    points = np.arange(44.0).reshape(22, 2)
+    distances = np.hypot(points[:, np.newaxis, 0] - points[np.newaxis, :, 0],
+                         points[:, np.newaxis, 1] - points[np.newaxis, :, 1])
+    np.argsort(distances, axis=1, kind='stable')
+    return sum(index * index for index in range(300))
+
+
+def new_bot(side: lugo4py.TeamSide, number: int) -> MyBot:
+    """
+    MyBot sem conexão e sem o FrameCache: cada repetição mede a busca inteira, não o reaproveitamento.
+    A ActionSearch (se ligada) faz sempre SEARCH_BATCHES lotes.
+    """
+    bot = MyBot(side, number, get_initial_position(side, number), lugo4py.Mapper(MAPPER_COLS, MAPPER_ROWS, side))
+    bot.frame_cache = FrameCache(0, 0)
+    if bot.action_search is not None:
+        bot.action_search = ActionSearch(math.inf, SEARCH_BATCHES)
+    return bot
+
+
+def measure(benchmark: Benchmark, warmup: int, repeat: int) -> Tuple[List[float], List[float]]:
+    """
+    Tempos (us) de `repeat` chamadas, depois de `warmup` chamadas descartadas, e os tempos da
+    referência (`calibration`), chamada logo antes de cada uma. Cada chamada recebe um inspector
+    novo (o TurnContext é montado do zero, como em um turno de verdade), criado fora do tempo
+    medido, e o coletor de lixo fica desligado durante a medição, como no timeit.
+    """
+    side, number = benchmark.bot.side, benchmark.bot.number
+
+    def prepare() -> lugo4py.GameSnapshotInspector:
+        inspector = lugo4py.GameSnapshotInspector(side, number, benchmark.snapshot)
+        if benchmark.start_turn:
+            benchmark.bot._start_turn(inspector, 'benchmark')
+        # O goleiro usa random: a mesma semente em toda chamada
+        random.seed(0)
+        return inspector
+
+    for _ in range(warmup):
+        benchmark.call(benchmark.bot, prepare())
+
+    samples, references = [], []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            inspector = prepare()
+            started = time.perf_counter_ns()
+            calibration(benchmark.bot, inspector)
+            references.append((time.perf_counter_ns() - started) / 1000)
+            started = time.perf_counter_ns()
+            benchmark.call(benchmark.bot, inspector)
+            samples.append((time.perf_counter_ns() - started) / 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return samples, references
+
+
+def summarize(rounds: List[List[float]], references: List[List[float]]) -> dict:
+    """
+    `median_us` é a mediana das medianas das rodadas; os quartis e o desvio são de todas as chamadas.
+    `relative` é a mediana, entre as rodadas, da razão entre a mediana da rodada e a da referência
+    medida junto com ela (veja `measure`).
+    """
+    samples = [sample for round_samples in rounds for sample in round_samples]
+    q1, _, q3 = statistics.quantiles(samples, n=4) if len(samples) > 1 else (samples[0],) * 3
+    round_medians = [statistics.median(round_samples) for round_samples in rounds]
+    relative = [median / statistics.median(reference) for median, reference in zip(round_medians, references)]
+    return {
+        'samples': len(samples),
+        'median_us': round(statistics.median(round_medians), 2),
+        'rounds_us': [round(median, 2) for median in round_medians],
+        'relative': round(statistics.median(relative), 4),
+        'relative_rounds': [round(value, 4) for value in relative],
+        'q1_us': round(q1, 2),
+        'q3_us': round(q3, 2),
+        'mean_us': round(statistics.fmean(samples), 2),
+        'stdev_us': round(statistics.stdev(samples), 2) if len(samples) > 1 else 0.0,
+        'min_us': round(min(samples), 2),
+    }
+
+
+def run(seed: int = DEFAULT_SEED, warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT,
+        rounds: int = DEFAULT_ROUNDS, only: Optional[str] = None,
+        progress: Callable[[str, dict], None] = None) -> dict:
+    """
+    Mede as medidas selecionadas em `rounds` rodadas, cada rodada passando por todas elas: uma
+    máquina que fica lenta por alguns segundos atrapalha uma rodada, não todas as de uma medida.
+    """
+    selected = [benchmark for benchmark in benchmarks(seed) if not only or only in benchmark.key]
+
+    samples: Dict[str, List[List[float]]] = {benchmark.key: [] for benchmark in selected}
+    references: Dict[str, List[List[float]]] = {benchmark.key: [] for benchmark in selected}
+    for round_index in range(rounds):
+        for benchmark in selected:
+            # O aquecimento completo só na primeira rodada; nas demais, uma chamada para voltar ao cache
+            round_samples, round_references = measure(benchmark, warmup if round_index == 0 else 1, repeat)
+            samples[benchmark.key].append(round_samples)
+            references[benchmark.key].append(round_references)
+
+    results = {}
+    for key, rounds_samples in samples.items():
+        results[key] = summarize(rounds_samples, references[key])
+        if progress:
+            progress(key, results[key])
+    return {
+        'format': FORMAT_VERSION,
+        'meta': {
+            'seed': seed,
+            'warmup': warmup,
+            'repeat': repeat,
+            'rounds': rounds,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'strategy_revision': get_strategy().revision,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float,
+            normalize: bool = True) -> Tuple[List[str], List[str]]:
+    """
+    Compara duas execuções pelos tempos relativos à referência (`relative`), que descontam uma
+    máquina mais lenta ou mais carregada, ou pelos tempos absolutos, sem `normalize`. Uma medida
+    regrediu se a mediana e a rodada mais rápida (a menos atrapalhada pelo resto da máquina)
+    subiram, as duas, mais de `threshold` por cento. Retorna as linhas do relatório e as chaves
+    que regrediram.
+    """
+    metric, rounds_metric = ('relative', 'relative_rounds') if normalize else ('median_us', 'rounds_us')
+    lines, regressions = [], []
+    for key, now in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            lines.append(f'{key:<70s} {"new":>10s} {now["median_us"]:10.1f}us')
+            continue
+        change = _change(before[metric], now[metric])
+        regressed = change > threshold and _change(min(before[rounds_metric]), min(now[rounds_metric])) > threshold
+        if regressed:
+            regressions.append(key)
+        lines.append(f'{key:<70s} {before["median_us"]:10.1f}us {now["median_us"]:10.1f}us {change:+7.1f}%'
+                     f'{"  REGRESSION" if regressed else ""}')
+    for key in baseline['results']:
+        if key not in current['results']:
+            lines.append(f'{key:<70s} {"missing":>10s}')
+    return lines, regressions
+
+
+def _change(before: float, now: float) -> float:
+    return (now / before - 1) * 100 if before else 0.0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Times the MyBot helpers and handlers on seeded synthetic '
+                                                 'snapshots (kickoff, crowded midfield, counter-attack, goalmouth '
+                                                 'scramble) for both sides.')
+    parser.add_argument('--out', help='writes the results as JSON to this file')
+    parser.add_argument('--compare', help='results of a previous run; fails if a benchmark regressed')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='percent increase of the median that counts as a regression')
+    parser.add_argument('--absolute', action='store_true',
+                        help='compares the raw times instead of the times relative to the calibration workload')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='measured calls per round')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS,
+                        help='passes over all the benchmarks; the result is the median of the round medians')
+    parser.add_argument('--only', help='runs only the benchmarks whose key contains this text')
+    parser.add_argument('--list', action='store_true', help='lists the benchmark keys and exits')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for benchmark in benchmarks(args.seed):
+            print(benchmark.key)
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline['meta']['seed'] != args.seed:
+            parser.error(f"--compare was run with --seed {baseline['meta']['seed']}")
+
+    def progress(key: str, result: dict):
+        if baseline is None:
+            print(f"{key:<70s} {result['median_us']:10.1f}us  (rounds {min(result['rounds_us']):.1f} to "
+                  f"{max(result['rounds_us']):.1f})")
+
+    current = run(args.seed, args.warmup, args.repeat, args.rounds, args.only, progress)
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            json.dump(current, out_file, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        lines, regressions = compare(baseline, current, args.threshold, not args.absolute)
+        print('\n'.join(lines))
+        if regressions:
+            print(f'{len(regressions)} benchmarks regressed more than {args.threshold:g}%')
+            return 1
+        print('no regression')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import lugo4py
+from turn_context import TurnContext
+
+
+class ScoredCandidates(NamedTuple):
+    """
+    Resultado da avaliação de um lote de pontos candidatos (apenas os que estão dentro do campo).
+    """
+    points: np.ndarray
+    nearest_opponent: np.ndarray
+    goal_distance: np.ndarray
+    score: np.ndarray
+
+
+def inside_field(points: np.ndarray) -> np.ndarray:
+    """
+    Máscara dos pontos de um array (N, 2) que estão dentro do campo.
+    """
+    return (0 < points[:, 0]) & (points[:, 0] < lugo4py.specs.FIELD_WIDTH) & \
+        (0 < points[:, 1]) & (points[:, 1] < lugo4py.specs.FIELD_HEIGHT)
+
+
+def ring_candidates(center: lugo4py.Point, radii: Sequence[float], start_deg: float, end_deg: float,
+                    n_angles: int, endpoint: bool = True) -> np.ndarray:
+    """
+    Gera pontos (N, 2) em arcos ao redor de `center`, para cada raio em `radii`,
+    com `n_angles` ângulos entre `start_deg` e `end_deg`.
+    """
+    rads = np.radians(np.linspace(start_deg, end_deg, n_angles, endpoint=endpoint))
+    radii = np.asarray(radii, dtype=float)[:, np.newaxis]
+    return np.column_stack((
+        (center.x + radii * np.cos(rads)).ravel(),
+        (center.y + radii * np.sin(rads)).ravel(),
+    ))
+
+
+def grid_candidates(origin: lugo4py.Point, ahead: Sequence[float], lateral: Sequence[float],
+                    side_factor: int) -> np.ndarray:
+    """
+    Gera uma grade (N, 2) de pontos à frente de `origin`, combinando as distâncias
+    `ahead` (no sentido do ataque) com os deslocamentos laterais `lateral`.
+    """
+    ahead, lateral = np.meshgrid(np.asarray(ahead, dtype=float), np.asarray(lateral, dtype=float), indexing='ij')
+    return np.column_stack((
+        origin.x + ahead.ravel() * side_factor,
+        origin.y + lateral.ravel(),
+    ))
+
+
+def refine_candidates(center: lugo4py.Point, radii: Sequence[float] = (100, 200), n_angles: int = 8) -> np.ndarray:
+    """
+    Pontos (N, 2) em volta de um resultado anterior, incluindo o próprio ponto, para refinar
+    uma busca em vez de refazê-la inteira.
+    """
+    return np.vstack(([(center.x, center.y)], ring_candidates(center, radii, 0, 360, n_angles, endpoint=False)))
+
+
+def score_candidates(context: TurnContext, points: np.ndarray, goal: Optional[lugo4py.Point] = None,
+                     goal_weight: float = 0.0, lookahead: int = 0, lane_y: Optional[float] = None,
+                     lane_weight: float = 0.0) -> ScoredCandidates:
+    """
+    Avalia todos os candidatos de uma vez: descarta os pontos fora do campo e calcula
+    a distância até o adversário mais próximo, a distância até o gol e o score
+    `adversário mais próximo - goal_weight * distância ao gol`. Com `lookahead`, os adversários
+    são considerados nas posições previstas para daqui a tantos turnos. Com `lane_y`, o score
+    também perde `lane_weight` por unidade de distância lateral até essa faixa do campo.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    points = points[inside_field(points)]
+
+    nearest_opponent = context.nearest_opponent_distance(points, lookahead)
+    if goal is not None:
+        goal_distance = np.hypot(points[:, 0] - goal.x, points[:, 1] - goal.y)
+    else:
+        goal_distance = np.zeros(len(points))
+
+    score = nearest_opponent - goal_weight * goal_distance
+    if lane_y is not None:
+        score -= lane_weight * np.abs(points[:, 1] - lane_y)
+    return ScoredCandidates(points, nearest_opponent, goal_distance, score)
+
+
+def best_candidate(scored: ScoredCandidates, min_score: float = -np.inf) -> Optional[lugo4py.Point]:
+    """
+    Retorna o candidato de maior score, ou None se nenhum superar `min_score`.
+    """
+    if len(scored.points) == 0:
+        return None
+
+    best = int(np.argmax(scored.score))
+    if not scored.score[best] > min_score:
+        return None
+    return lugo4py.Point(x=float(scored.points[best][0]), y=float(scored.points[best][1]))
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import re
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+import lugo4py
+
+# Dados derivados (tabelas táticas, mapa de chutes...) ficam em .cache/ na raiz do projeto,
+# compartilhados pelos bots e reaproveitados quando o nodemon reinicia o processo
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache')
+
+# Mudar o formato dos arquivos invalida todos os caches gravados
+CACHE_FORMAT = 1
+# Arquivos mantidos por nome: ao gravar um novo, os mais antigos são apagados. Mais de um porque
+# variantes de um torneio, com estratégias diferentes, usam o mesmo diretório ao mesmo tempo
+KEEP_PER_NAME = 4
+
+
+def cache_key(*params) -> str:
+    """
+    Hash dos parâmetros de que os dados dependem (configurações, constantes do lugo4py...).
+    """
+    return hashlib.sha1(repr((CACHE_FORMAT, lugo4py.specs.FIELD_WIDTH, lugo4py.specs.FIELD_HEIGHT) + params)
+                        .encode()).hexdigest()[:12]
+
+
+def cache_path(name: str, key: str, extension: str) -> str:
+    return os.path.join(os.environ.get('BOT_CACHE_DIR') or CACHE_DIR, f'{name}_{key}{extension}')
+
+
+def save_atomic(path: str, write: Callable[[BinaryIO], None]) -> bool:
+    """
+    Grava o arquivo por meio de um temporário, já que outros bots podem estar lendo ou gravando
+    o mesmo cache. Retorna False (e o dado fica só na memória) se não for possível gravar.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f'could not save {path}: {e}')
+        return False
+
+
+def load_or_build_array(name: str, key: str, build: Callable[[], np.ndarray], mmap: bool = False) -> np.ndarray:
+    """
+    Lê o array gravado em disco (com memory-map se `mmap`), ou o calcula e grava na primeira vez.
+    """
+    path = cache_path(name, key, '.npy')
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    array = build()
+    if not save_atomic(path, lambda f: np.save(f, array)):
+        return array
+    prune(name, '.npy')
+    return np.load(path, mmap_mode='r') if mmap else array
+
+
+def prune(name: str, extension: str, keep: int = KEEP_PER_NAME):
+    """
+    Apaga os arquivos de `name` (gravados com outras chaves) além dos `keep` mais recentes. Um processo
+    que ainda usa um arquivo apagado com memory-map continua lendo normalmente.
+    """
+    directory = os.environ.get('BOT_CACHE_DIR') or CACHE_DIR
+    pattern = re.compile(re.escape(name) + r'_[0-9a-f]{12}' + re.escape(extension))
+    try:
+        paths = [os.path.join(directory, filename) for filename in os.listdir(directory) if pattern.fullmatch(filename)]
+        paths.sort(key=os.path.getmtime, reverse=True)
+    except OSError:
+        return
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
@@ -0,0 +1,133 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import lugo4py
+import lugo4py.mapper as mapper
+from lugo4py.protos import physics_pb2
+
+MAX_X = lugo4py.specs.MAX_X_COORDINATE
+MAX_Y = lugo4py.specs.MAX_Y_COORDINATE
+
+# Colunas de `bounds`
+MIN_X, MIN_Y, MAX_X_BOUND, MAX_Y_BOUND = 0, 1, 2, 3
+
+
+class FieldGrid:
+    """
+    As regiões de um `lugo4py.Mapper(cols, rows, side)` pré-calculadas em arrays: `centers` (cols, rows, 2)
+    e `bounds` (cols, rows, 4), em coordenadas do campo (espelhadas para o time visitante, como no Mapper).
+
+    Um ponto vira região só com aritmética inteira (x * cols // MAX_X), sem criar objetos do lugo4py,
+    então a resolução da grade não muda o custo por turno: uma grade 40x24 custa o mesmo que a 10x6.
+    Os centros e as regiões são os mesmos do Mapper (`get_region(col, row).get_center()` e
+    `get_region_from_point`), que continua disponível em `mapper` para o que precisar de `Region`.
+    """
+
+    def __init__(self, cols: int, rows: int, side: lugo4py.TeamSide):
+        self.mapper = mapper.Mapper(cols, rows, side)
+        self.cols = cols
+        self.rows = rows
+        self.side = side
+        self._mirrored = side == lugo4py.TeamSide.AWAY
+        # Constantes de `cells_of`, criadas uma vez (montá-las a cada chamada custava mais que a conta)
+        self._field_size = np.array([MAX_X, MAX_Y])
+        self._counts = np.array([cols, rows])
+        self._last_cell = self._counts - 1
+
+        # Mesma conta (em float) e mesmo arredondamento (metade para o par) do Mapper
+        width, height = self.mapper.regionWidth, self.mapper.regionHeight
+        centers_x = np.round(np.arange(cols) * width + width / 2).astype(np.int64)
+        centers_y = np.round(np.arange(rows) * height + height / 2).astype(np.int64)
+        low_x, high_x = np.arange(cols) * width, np.arange(1, cols + 1) * width
+        low_y, high_y = np.arange(rows) * height, np.arange(1, rows + 1) * height
+        if self._mirrored:
+            centers_x, centers_y = MAX_X - centers_x, MAX_Y - centers_y
+            low_x, high_x = MAX_X - high_x, MAX_X - low_x
+            low_y, high_y = MAX_Y - high_y, MAX_Y - low_y
+
+        self.centers = np.empty((cols, rows, 2), dtype=np.int64)
+        self.centers[:, :, 0] = centers_x[:, np.newaxis]
+        self.centers[:, :, 1] = centers_y[np.newaxis, :]
+        self.bounds = np.empty((cols, rows, 4))
+        self.bounds[:, :, MIN_X] = low_x[:, np.newaxis]
+        self.bounds[:, :, MAX_X_BOUND] = high_x[:, np.newaxis]
+        self.bounds[:, :, MIN_Y] = low_y[np.newaxis, :]
+        self.bounds[:, :, MAX_Y_BOUND] = high_y[np.newaxis, :]
+
+        self._center_points: List[List[physics_pb2.Point]] = [
+            [physics_pb2.Point(x=int(self.centers[col, row, 0]), y=int(self.centers[col, row, 1]))
+             for row in range(rows)]
+            for col in range(cols)
+        ]
+
+    @classmethod
+    def from_mapper(cls, my_mapper: mapper.Mapper) -> 'FieldGrid':
+        return get_field_grid(my_mapper.cols, my_mapper.rows, my_mapper.side)
+
+    def col_of(self, x: float) -> int:
+        """
+        Coluna do x (coordenada do campo), como `get_region_from_point(...).get_col()`.
+        """
+        if self._mirrored:
+            x = MAX_X - x
+        return min(max(int(x * self.cols // MAX_X), 0), self.cols - 1)
+
+    def row_of(self, y: float) -> int:
+        if self._mirrored:
+            y = MAX_Y - y
+        return min(max(int(y * self.rows // MAX_Y), 0), self.rows - 1)
+
+    def cell_of(self, point) -> Tuple[int, int]:
+        """
+        (coluna, linha) da região do ponto.
+        """
+        return self.col_of(point.x), self.row_of(point.y)
+
+    def index_of(self, point) -> int:
+        """
+        Índice da região do ponto em `centers.reshape(-1, 2)` (coluna * rows + linha).
+        """
+        return self.col_of(point.x) * self.rows + self.row_of(point.y)
+
+    def cells_of(self, points: np.ndarray) -> np.ndarray:
+        """
+        (N, 2) com (coluna, linha) de cada um dos N pontos (x, y).
+        """
+        points = np.asarray(points)
+        if self._mirrored:
+            points = self._field_size - points
+        cells = np.floor_divide(points * self._counts, self._field_size).astype(np.int64)
+        np.maximum(cells, 0, out=cells)
+        return np.minimum(cells, self._last_cell, out=cells)
+
+    def indices_of(self, points: np.ndarray) -> np.ndarray:
+        cells = self.cells_of(points)
+        return cells[:, 0] * self.rows + cells[:, 1]
+
+    def center(self, col: int, row: int) -> physics_pb2.Point:
+        """
+        Centro da região (criado uma única vez: é compartilhado, não o altere).
+        """
+        return self._center_points[min(max(col, 0), self.cols - 1)][min(max(row, 0), self.rows - 1)]
+
+    def centers_of(self, points: np.ndarray) -> np.ndarray:
+        """
+        (N, 2) com o centro da região de cada ponto.
+        """
+        cells = self.cells_of(points)
+        return self.centers[cells[:, 0], cells[:, 1]]
+
+
+_FIELD_GRIDS: Dict[Tuple[int, int, int], FieldGrid] = {}
+
+
+def get_field_grid(cols: int, rows: int, side: lugo4py.TeamSide) -> FieldGrid:
+    """
+    Grade compartilhada por todos os bots do processo (ela nunca muda depois de criada).
+    """
+    key = (cols, rows, side)
+    grid = _FIELD_GRIDS.get(key)
+    if grid is None:
+        grid = _FIELD_GRIDS[key] = FieldGrid(cols, rows, side)
+    return grid
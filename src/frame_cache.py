@@ -0,0 +1,161 @@
+import os
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import lugo4py
+from turn_context import TurnContext
+
+HIT, REFINE, MISS = 'hit', 'refine', 'miss'
+
+# Deslocamento máximo (desde o cálculo) da âncora e dos adversários relevantes para reaproveitar
+# um resultado como está, e para apenas refiná-lo ao redor do resultado anterior
+DEFAULT_REUSE_DISTANCE = 100.0
+DEFAULT_REFINE_DISTANCE = 300.0
+
+
+class _Entry(NamedTuple):
+    anchor: np.ndarray
+    radius: float
+    opponents: np.ndarray  # posições por número (12, 2), NaN para quem não estava em campo
+    relevant: np.ndarray  # máscara dos adversários dentro do raio na hora do cálculo
+    value: Any
+
+
+class FrameCache:
+    """
+    Resultados de turnos anteriores de um bot (melhor ponto de apoio, de drible...), reaproveitados
+    enquanto a âncora da busca (o jogador ou o portador) e os adversários que estavam perto dela
+    se moverem pouco desde o cálculo:
+    - até `reuse_distance`, o resultado anterior é usado como está (hit);
+    - até `refine_distance`, a busca é refeita só ao redor do resultado anterior (refine);
+    - acima disso, ou se um adversário entrou na região, a busca é completa (miss).
+    Tudo é descartado quando o estado do jogador muda, em um gol, em `getting_ready` ou
+    se um turno foi pulado.
+    """
+
+    def __init__(self, reuse_distance: float = DEFAULT_REUSE_DISTANCE,
+                 refine_distance: float = DEFAULT_REFINE_DISTANCE):
+        self.reuse_distance = reuse_distance
+        self.refine_distance = refine_distance
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.invalidations = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._turn: Optional[int] = None
+        self._handler: Optional[str] = None
+        self._score: Optional[Tuple[int, int]] = None
+        self._opponents: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_env(cls) -> 'FrameCache':
+        """
+        Limiares de FRAME_CACHE_REUSE e FRAME_CACHE_REFINE; "0" nos dois desliga o reaproveitamento.
+        """
+        return cls(float(os.environ.get('FRAME_CACHE_REUSE', DEFAULT_REUSE_DISTANCE)),
+                   float(os.environ.get('FRAME_CACHE_REFINE', DEFAULT_REFINE_DISTANCE)))
+
+    def start_turn(self, context: TurnContext, handler: str):
+        """
+        Chamado no início de cada handler: descarta os resultados se o contexto do jogo mudou.
+        """
+        snapshot = context.inspector.get_snapshot()
+        score = (snapshot.home_team.score, snapshot.away_team.score)
+        if self._turn is None or context.turn != self._turn + 1 or handler != self._handler or score != self._score:
+            self.invalidate()
+        self._turn = context.turn
+        self._handler = handler
+        self._score = score
+
+        self._opponents = np.full((lugo4py.specs.MAX_PLAYERS + 1, 2), np.nan)
+        self._opponents[context.opponent_numbers] = context.opponent_positions
+
+    def fork(self) -> 'FrameCache':
+        """
+        Cópia com os mesmos resultados e limiares (e contadores zerados), ex.: para o bot da especulação
+        continuar a partir das buscas do bot real.
+        """
+        fork = FrameCache(self.reuse_distance, self.refine_distance)
+        fork._entries = dict(self._entries)
+        fork._turn, fork._handler, fork._score = self._turn, self._handler, self._score
+        return fork
+
+    def adopt(self, other: 'FrameCache'):
+        """
+        Fica com os resultados de `other` (ex.: os calculados pela especulação para este turno). O estado
+        do turno não muda, então `start_turn` continua descartando tudo se o contexto do jogo mudou.
+        """
+        self._entries.update(other._entries)
+
+    def invalidate(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def lookup(self, name: str, anchor) -> Tuple[str, Any]:
+        """
+        Classifica o resultado guardado em `name` para a âncora atual: (HIT | REFINE | MISS, valor anterior).
+        """
+        entry = self._entries.get(name)
+        if entry is None or self._opponents is None:
+            return self._count(name, MISS), None
+
+        anchor = np.asarray(anchor, dtype=float)
+        moved = float(np.hypot(*(anchor - entry.anchor)))
+
+        relevant_now = _within(self._opponents, anchor, entry.radius)
+        if np.any(relevant_now & ~entry.relevant):
+            return self._count(name, MISS), None
+        if np.any(entry.relevant):
+            delta = self._opponents[entry.relevant] - entry.opponents[entry.relevant]
+            if np.isnan(delta).any():
+                return self._count(name, MISS), None
+            moved = max(moved, float(np.hypot(delta[:, 0], delta[:, 1]).max()))
+
+        if moved <= self.reuse_distance:
+            return self._count(name, HIT), entry.value
+        if moved <= self.refine_distance:
+            return self._count(name, REFINE), entry.value
+        return self._count(name, MISS), None
+
+    def store(self, name: str, anchor, radius: float, value: Any):
+        """
+        Guarda o resultado calculado para a âncora; são relevantes os adversários a até `radius` dela.
+        """
+        anchor = np.asarray(anchor, dtype=float)
+        self._entries[name] = _Entry(anchor, radius, self._opponents.copy(),
+                                     _within(self._opponents, anchor, radius), value)
+
+    def update(self, name: str, value: Any):
+        """
+        Troca o valor guardado por um refinamento, mantendo a âncora e as posições do último cálculo completo.
+        """
+        entry = self._entries.get(name)
+        if entry is not None:
+            self._entries[name] = entry._replace(value=value)
+
+    def stats(self) -> dict:
+        totals = {HIT: 0, REFINE: 0, MISS: 0}
+        for counter in self.counters.values():
+            for status, count in counter.items():
+                totals[status] += count
+        lookups = sum(totals.values())
+        return {
+            'reuse_distance': self.reuse_distance,
+            'refine_distance': self.refine_distance,
+            'invalidations': self.invalidations,
+            'hit_rate': round(totals[HIT] / lookups, 3) if lookups else 0.0,
+            'totals': totals,
+            'searches': {name: dict(counter) for name, counter in sorted(self.counters.items())},
+        }
+
+    def _count(self, name: str, status: str) -> str:
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = {HIT: 0, REFINE: 0, MISS: 0}
+        counter[status] += 1
+        return status
+
+
+def _within(positions: np.ndarray, anchor: np.ndarray, radius: float) -> np.ndarray:
+    with np.errstate(invalid='ignore'):
+        return np.hypot(positions[:, 0] - anchor[0], positions[:, 1] - anchor[1]) <= radius
@@ -0,0 +1,187 @@
+import atexit
+import bisect
+import json
+import os
+import re
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Métodos do MyBot medidos pela instrumentação
+HANDLERS = ['on_disputing', 'on_defending', 'on_holding', 'on_supporting', 'as_goalkeeper']
+HELPERS = [
+    'get_free_allies', 'is_marked', 'get_closest_players', 'find_support_position', 'find_dribble_position',
+    'find_open_space_in_attack', 'dynamic_defensive_position', 'find_best_shot_target', 'evaluate_shot',
+    'find_best_pass', 'search_action', 'predict_ball_future_position', 'predict_ball_interception_point',
+    'predict_ball_reachable_position',
+]
+
+# Limites superiores (em microssegundos) dos buckets do histograma: 10 buckets por década, de 1us a 10s
+BUCKET_EDGES_US = [round(10 ** (i / 10), 1) for i in range(71)]
+
+# Quantos estouros de orçamento guardamos para o relatório
+MAX_SLOW_TURNS = 100
+
+
+class LatencyHistogram:
+    """
+    Histograma de latências com buckets fixos. Os percentis são estimados pelo limite
+    superior do bucket, então relatórios de builds diferentes podem ser comparados com diff.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_US) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def add(self, elapsed_us: float):
+        self.counts[bisect.bisect_left(BUCKET_EDGES_US, elapsed_us)] += 1
+        self.count += 1
+        self.total_us += elapsed_us
+        if elapsed_us > self.max_us:
+            self.max_us = elapsed_us
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return BUCKET_EDGES_US[index] if index < len(BUCKET_EDGES_US) else self.max_us
+        return self.max_us
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_us': round(self.total_us / self.count, 1) if self.count else 0.0,
+            'p50_us': self.percentile(0.50),
+            'p99_us': self.percentile(0.99),
+            'max_us': round(self.max_us, 1),
+            # Apenas os buckets preenchidos, como pares [limite superior, contagem]
+            'buckets': [[BUCKET_EDGES_US[i] if i < len(BUCKET_EDGES_US) else None, c]
+                        for i, c in enumerate(self.counts) if c],
+        }
+
+
+class LatencyMonitor:
+    """
+    Registra a latência de handlers e helpers do bot e guarda os turnos que passam do orçamento
+    para o relatório. Nada é impresso durante o turno: o stdout sairia do orçamento justamente
+    nos turnos que já estouraram (a telemetria também marca esses turnos).
+    """
+
+    def __init__(self, budget_ms: float, report_path: Optional[str] = None):
+        self.budget_us = budget_ms * 1000
+        self.report_path = report_path
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.over_budget = 0
+        self.slow_turns: List[dict] = []
+        # Contadores extras incluídos no relatório (ex.: acertos do FrameCache do bot)
+        self.counters: Dict[str, Callable[[], dict]] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def wrap(self, name: str, func: Callable, is_handler: bool = False) -> Callable:
+        histogram = self.histogram(name)
+        perf_counter_ns = time.perf_counter_ns
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed_us = (perf_counter_ns() - start) / 1000
+                histogram.add(elapsed_us)
+                if is_handler and elapsed_us > self.budget_us:
+                    self.flag_slow_turn(name, args[0] if args else None, elapsed_us)
+
+        return timed
+
+    def flag_slow_turn(self, handler: str, inspector, elapsed_us: float):
+        self.over_budget += 1
+        turn = inspector.get_turn() if inspector is not None else None
+        if len(self.slow_turns) < MAX_SLOW_TURNS:
+            self.slow_turns.append({'turn': turn, 'handler': handler, 'elapsed_us': round(elapsed_us, 1)})
+
+    def report(self) -> dict:
+        return {
+            'budget_us': self.budget_us,
+            'over_budget': self.over_budget,
+            'slow_turns': self.slow_turns,
+            'latency': {name: h.to_dict() for name, h in sorted(self.histograms.items()) if h.count},
+            'counters': {name: counters() for name, counters in sorted(self.counters.items())},
+        }
+
+    def dump(self, path: Optional[str] = None):
+        path = path or self.report_path
+        if not path:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as report_file:
+            json.dump(self.report(), report_file, indent=2, sort_keys=True)
+            report_file.write('\n')
+
+
+def parse_duration_ms(value: str) -> float:
+    """
+    Converte durações no formato do servidor ("50ms", "1s", "500us") para milissegundos.
+    """
+    match = re.fullmatch(r'\s*([0-9.]+)\s*(us|µs|ms|s)?\s*', value)
+    if not match:
+        raise ValueError(f'invalid duration {value!r}')
+    amount, unit = float(match.group(1)), match.group(2) or 'ms'
+    return amount * {'us': 0.001, 'µs': 0.001, 'ms': 1.0, 's': 1000.0}[unit]
+
+
+def budget_from_env() -> float:
+    """
+    Orçamento por turno em ms: LISTENING_DURATION (o mesmo valor passado ao servidor)
+    multiplicado por LATENCY_BUDGET_FRACTION.
+    """
+    listening_ms = parse_duration_ms(os.environ.get('LISTENING_DURATION', '50ms'))
+    return listening_ms * float(os.environ.get('LATENCY_BUDGET_FRACTION', '0.5'))
+
+
+def instrument_bot(bot, monitor: LatencyMonitor, handlers: List[str] = None, helpers: List[str] = None):
+    """
+    Troca os handlers e helpers da instância do bot por versões medidas pelo monitor.
+    """
+    for name in HANDLERS if handlers is None else handlers:
+        setattr(bot, name, monitor.wrap(name, getattr(bot, name), is_handler=True))
+    for name in HELPERS if helpers is None else helpers:
+        setattr(bot, name, monitor.wrap(name, getattr(bot, name)))
+    frame_cache = getattr(bot, 'frame_cache', None)
+    if frame_cache is not None:
+        monitor.counters['frame_cache'] = frame_cache.stats
+    action_search = getattr(bot, 'action_search', None)
+    if action_search is not None:
+        monitor.counters['action_search'] = action_search.stats
+    speculator = getattr(bot, 'speculator', None)
+    if speculator is not None:
+        monitor.counters['speculation'] = speculator.stats
+    return bot
+
+
+def monitor_from_env(side, number: int) -> Optional[LatencyMonitor]:
+    """
+    Cria o monitor se LATENCY_REPORT_DIR estiver definido (por padrão os handlers e helpers não são
+    medidos). O relatório é gravado ao fim da partida (ou na saída do processo).
+    """
+    report_dir = os.environ.get('LATENCY_REPORT_DIR', '')
+    if not report_dir:
+        return None
+
+    side_name = 'home' if side == 0 else 'away'
+    monitor = LatencyMonitor(budget_from_env(), os.path.join(report_dir, f'latency_{side_name}_{number:02d}.json'))
+    atexit.register(monitor.dump)
+    return monitor
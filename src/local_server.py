@@ -0,0 +1,397 @@
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent import futures
+from typing import Dict, List, Optional, Tuple
+
+import grpc
+
+import lugo4py
+from lugo4py.protos import server_pb2
+from lugo4py.protos import server_pb2_grpc as server_grpc
+
+HOME = lugo4py.TeamSide.HOME
+AWAY = lugo4py.TeamSide.AWAY
+
+# Distância em que o jogador toca a bola e pode pegá-la
+CATCH_DISTANCE = lugo4py.specs.PLAYER_SIZE / 2 + lugo4py.specs.BALL_SIZE / 2
+GOALKEEPER_CATCH_DISTANCE = lugo4py.specs.PLAYER_SIZE * 2.3 / 2 + lugo4py.specs.BALL_SIZE / 2
+
+# Duração padrão das partidas locais, em turnos
+DEFAULT_TURNS = 3000
+# Espera pelas ordens que faltam (s), a mesma janela padrão do servidor oficial (--listening-duration 50ms)
+DEFAULT_LISTENING_TIMEOUT = 0.05
+
+# Marca de fim de partida nas filas de snapshots
+_END = object()
+
+
+class _Body:
+    """
+    Posição e velocidade de um elemento do campo (jogador ou bola), com a direção unitária.
+    """
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+        self.dir_x = 1.0
+        self.dir_y = 0.0
+        self.speed = 0.0
+
+    def set_velocity(self, dir_x: float, dir_y: float, speed: float):
+        length = math.hypot(dir_x, dir_y)
+        if length > 0:
+            self.dir_x, self.dir_y = dir_x / length, dir_y / length
+        self.speed = max(speed, 0.0)
+
+
+class _PlayerState(_Body):
+    def __init__(self, side: int, number: int, init_position):
+        super().__init__(init_position.x, init_position.y)
+        self.side = side
+        self.number = number
+        self.init_x = init_position.x
+        self.init_y = init_position.y
+        self.jump_turns = 0
+        self.orders: list = []
+
+
+class LocalGameServer(server_grpc.GameServicer):
+    """
+    Servidor substituto do `lugobots/server` para partidas locais e sem Docker.
+    Implementa o serviço `Game` (JoinATeam e SendOrders) com uma física simplificada para
+    move/kick/catch/jump. Cada turno é processado assim que todos os jogadores conectados
+    enviam suas ordens (ou após `listening_timeout`), então a partida anda na velocidade dos bots.
+    """
+
+    def __init__(self, max_turns: int = DEFAULT_TURNS, players_per_team: int = 11,
+                 join_timeout: float = 30.0, listening_timeout: float = DEFAULT_LISTENING_TIMEOUT):
+        self.max_turns = max_turns
+        self.players_per_team = players_per_team
+        self.join_timeout = join_timeout
+        self.listening_timeout = listening_timeout
+        self.port: Optional[int] = None
+
+        self.state = server_pb2.GameSnapshot.State.WAITING
+        self.turn = 0
+        self.score = {HOME: 0, AWAY: 0}
+        self.possession = {HOME: 0, AWAY: 0}
+        # Turnos em que algum jogador do time não mandou as ordens a tempo
+        self.timed_out = {HOME: 0, AWAY: 0}
+        self.players: Dict[Tuple[int, int], _PlayerState] = {}
+        self.ball = _Body(lugo4py.specs.MAX_X_COORDINATE / 2, lugo4py.specs.MAX_Y_COORDINATE / 2)
+        self.holder: Optional[_PlayerState] = None
+        self.shot_clock_side = HOME
+        self.shot_clock = lugo4py.specs.SHOT_CLOCK_TIME
+
+        self._lock = threading.Condition()
+        self._streams: Dict[Tuple[int, int], queue.Queue] = {}
+        # O OrderSet não diz quem o enviou: o jogador é identificado pela conexão usada no JoinATeam.
+        # Por isso o lugo4py coloca "?t=<lado>-<número>" no endereço, forçando uma conexão por bot.
+        self._peers: Dict[str, Tuple[int, int]] = {}
+        self._arrivals: List[_PlayerState] = []
+        self._waiting_orders = set()
+        self.finished = threading.Event()
+
+    # ------------------------------------------------------------------ gRPC
+
+    def JoinATeam(self, request, context):
+        key = (request.team_side, request.number)
+        with self._lock:
+            if key in self.players or self.state != server_pb2.GameSnapshot.State.WAITING:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, f'cannot join as {key}')
+            self.players[key] = _PlayerState(request.team_side, request.number, request.init_position)
+            self._peers[context.peer()] = key
+            stream = self._streams[key] = queue.Queue()
+            self._lock.notify_all()
+
+        while context.is_active():
+            try:
+                snapshot = stream.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if snapshot is _END:
+                return
+            yield snapshot
+
+    def SendOrders(self, request, context):
+        with self._lock:
+            player = self.players.get(self._peers.get(context.peer()))
+            if player is None:
+                return server_pb2.OrderResponse(code=server_pb2.OrderResponse.StatusCode.UNKNOWN_PLAYER)
+            if self.state != server_pb2.GameSnapshot.State.LISTENING:
+                return server_pb2.OrderResponse(code=server_pb2.OrderResponse.StatusCode.NOT_LISTENING)
+            if request.turn != self.turn:
+                return server_pb2.OrderResponse(code=server_pb2.OrderResponse.StatusCode.WRONG_TURN)
+
+            player.orders = list(request.orders)
+            key = (player.side, player.number)
+            if key in self._waiting_orders:
+                self._waiting_orders.discard(key)
+                self._arrivals.append(player)
+            self._lock.notify_all()
+        return server_pb2.OrderResponse(code=server_pb2.OrderResponse.StatusCode.SUCCESS)
+
+    # ------------------------------------------------------------------ partida
+
+    def run_game(self) -> dict:
+        """
+        Espera os jogadores, joga `max_turns` turnos e retorna o resultado da partida.
+        """
+        expected = 2 * self.players_per_team
+        deadline = time.monotonic() + self.join_timeout
+        with self._lock:
+            while len(self.players) < expected and time.monotonic() < deadline:
+                self._lock.wait(timeout=0.1)
+
+        self._get_ready()
+        while self.turn < self.max_turns:
+            self.turn += 1
+            self._listen()
+            self._play()
+
+        with self._lock:
+            self.state = server_pb2.GameSnapshot.State.OVER
+        self._broadcast()
+        for stream in self._streams.values():
+            stream.put(_END)
+        self.finished.set()
+        return self.result()
+
+    def result(self) -> dict:
+        return {
+            'turns': self.turn,
+            'score': {'home': self.score[HOME], 'away': self.score[AWAY]},
+            'possession': {'home': self.possession[HOME], 'away': self.possession[AWAY]},
+            'timed_out_turns': {'home': self.timed_out[HOME], 'away': self.timed_out[AWAY]},
+        }
+
+    def _get_ready(self):
+        with self._lock:
+            self.state = server_pb2.GameSnapshot.State.GET_READY
+            for player in self.players.values():
+                player.x, player.y = player.init_x, player.init_y
+                player.speed = 0.0
+                player.jump_turns = 0
+            self.ball = _Body(lugo4py.specs.MAX_X_COORDINATE / 2, lugo4py.specs.MAX_Y_COORDINATE / 2)
+            self.holder = None
+        self._broadcast()
+
+    def _listen(self):
+        with self._lock:
+            self.state = server_pb2.GameSnapshot.State.LISTENING
+            self._arrivals = []
+            self._waiting_orders = set(self.players)
+            for player in self.players.values():
+                player.orders = []
+        self._broadcast()
+
+        deadline = time.monotonic() + self.listening_timeout
+        with self._lock:
+            while self._waiting_orders and time.monotonic() < deadline:
+                self._lock.wait(timeout=max(deadline - time.monotonic(), 0))
+            for side in {side for side, _ in self._waiting_orders}:
+                self.timed_out[side] += 1
+            self.state = server_pb2.GameSnapshot.State.PLAYING
+
+    def _play(self):
+        # A bola livre anda antes das ordens dos jogadores
+        if self.holder is None:
+            self._move_ball()
+
+        moved = set()
+        for player in self._arrivals:
+            for order in player.orders:
+                kind = order.WhichOneof('action')
+                if kind == 'move' and player.jump_turns == 0:
+                    velocity = order.move.velocity
+                    player.set_velocity(velocity.direction.x, velocity.direction.y,
+                                        min(velocity.speed, lugo4py.specs.PLAYER_MAX_SPEED))
+                    self._move_player(player)
+                    moved.add(id(player))
+                elif kind == 'jump' and player.number == lugo4py.specs.GOALKEEPER_NUMBER and player.jump_turns == 0:
+                    velocity = order.jump.velocity
+                    player.set_velocity(velocity.direction.x, velocity.direction.y,
+                                        min(velocity.speed, lugo4py.specs.GOALKEEPER_JUMP_SPEED))
+                    player.jump_turns = lugo4py.specs.GOALKEEPER_JUMP_DURATION
+                    self._move_player(player)
+                    moved.add(id(player))
+                elif kind == 'catch':
+                    self._catch(player)
+                elif kind == 'kick' and self.holder is player:
+                    self._kick(player, order.kick.velocity)
+
+        # Jogadores sem ordem de movimento mantêm a velocidade atual
+        for player in self.players.values():
+            if id(player) not in moved and player.speed > 0:
+                self._move_player(player)
+            if player.jump_turns > 0:
+                player.jump_turns -= 1
+
+        self._update_shot_clock()
+        if self.holder is not None:
+            self.possession[self.holder.side] += 1
+
+    def _move_player(self, player: _PlayerState):
+        player.x = min(max(player.x + player.dir_x * player.speed, 0), lugo4py.specs.MAX_X_COORDINATE)
+        player.y = min(max(player.y + player.dir_y * player.speed, 0), lugo4py.specs.MAX_Y_COORDINATE)
+        if self.holder is player:
+            self.ball.x, self.ball.y = player.x, player.y
+            self.ball.set_velocity(player.dir_x, player.dir_y, player.speed)
+
+    def _move_ball(self):
+        ball = self.ball
+        if ball.speed <= 0:
+            return
+        ball.x += ball.dir_x * ball.speed
+        ball.y += ball.dir_y * ball.speed
+        ball.speed -= lugo4py.specs.BALL_DECELERATION
+        if ball.speed < lugo4py.specs.BALL_MIN_SPEED:
+            ball.speed = 0.0
+
+        # Laterais: a bola volta para o campo
+        if ball.y < 0 or ball.y > lugo4py.specs.MAX_Y_COORDINATE:
+            ball.y = -ball.y if ball.y < 0 else 2 * lugo4py.specs.MAX_Y_COORDINATE - ball.y
+            ball.dir_y = -ball.dir_y
+
+        if ball.x < 0 or ball.x > lugo4py.specs.MAX_X_COORDINATE:
+            if lugo4py.specs.GOAL_MIN_Y <= ball.y <= lugo4py.specs.GOAL_MAX_Y:
+                self._goal(AWAY if ball.x < 0 else HOME)
+                return
+            ball.x = -ball.x if ball.x < 0 else 2 * lugo4py.specs.MAX_X_COORDINATE - ball.x
+            ball.dir_x = -ball.dir_x
+
+    def _catch(self, player: _PlayerState):
+        if self.holder is player:
+            return
+        reach = GOALKEEPER_CATCH_DISTANCE if player.number == lugo4py.specs.GOALKEEPER_NUMBER else CATCH_DISTANCE
+        if math.hypot(player.x - self.ball.x, player.y - self.ball.y) <= reach:
+            self._give_ball(player)
+
+    def _kick(self, player: _PlayerState, velocity):
+        length = math.hypot(velocity.direction.x, velocity.direction.y)
+        if length == 0:
+            return
+        dir_x, dir_y = velocity.direction.x / length, velocity.direction.y / length
+
+        # Redução de força proporcional ao ângulo com a direção do jogador (0.5 a 1.0)
+        cos_angle = max(-1.0, min(1.0, dir_x * player.dir_x + dir_y * player.dir_y))
+        reducer = 0.5 + 0.5 * (180 - math.degrees(math.acos(cos_angle))) / 180
+        speed = min(velocity.speed, lugo4py.specs.BALL_MAX_SPEED) * reducer
+
+        # A velocidade do chute é somada à velocidade atual da bola
+        vel_x = dir_x * speed + self.ball.dir_x * self.ball.speed
+        vel_y = dir_y * speed + self.ball.dir_y * self.ball.speed
+        self.holder = None
+        self.ball.set_velocity(vel_x, vel_y, min(math.hypot(vel_x, vel_y), lugo4py.specs.BALL_MAX_SPEED))
+        self._move_ball()
+
+    def _give_ball(self, player: _PlayerState):
+        if self.holder is None or self.holder.side != player.side:
+            self.shot_clock_side = player.side
+            self.shot_clock = lugo4py.specs.SHOT_CLOCK_TIME
+        self.holder = player
+        self.ball.x, self.ball.y = player.x, player.y
+        self.ball.set_velocity(player.dir_x, player.dir_y, player.speed)
+
+    def _update_shot_clock(self):
+        if self.holder is None or self.holder.side != self.shot_clock_side:
+            return
+        self.shot_clock -= 1
+        if self.shot_clock <= 0:
+            # Fim do tempo de ataque: a bola vai para o goleiro do outro time
+            goalkeeper = self.players.get((1 - self.shot_clock_side, lugo4py.specs.GOALKEEPER_NUMBER))
+            if goalkeeper is not None:
+                self._give_ball(goalkeeper)
+            else:
+                self.holder = None
+
+    def _goal(self, side: int):
+        self.score[side] += 1
+        self._get_ready()
+
+    # ------------------------------------------------------------------ snapshots
+
+    def snapshot(self) -> server_pb2.GameSnapshot:
+        snapshot = server_pb2.GameSnapshot()
+        snapshot.state = self.state
+        snapshot.turn = self.turn
+        for side, team in ((HOME, snapshot.home_team), (AWAY, snapshot.away_team)):
+            team.side = side
+            team.name = 'HOME' if side == HOME else 'AWAY'
+            team.score = self.score[side]
+        for (side, _), player in sorted(self.players.items()):
+            team = snapshot.home_team if side == HOME else snapshot.away_team
+            message = team.players.add()
+            _fill_player(message, player)
+
+        snapshot.ball.position.x = round(self.ball.x)
+        snapshot.ball.position.y = round(self.ball.y)
+        # Direções com módulo 100, como as geradas pelo lugo4py
+        snapshot.ball.velocity.direction.x = self.ball.dir_x * 100
+        snapshot.ball.velocity.direction.y = self.ball.dir_y * 100
+        snapshot.ball.velocity.speed = self.ball.speed
+        if self.holder is not None:
+            _fill_player(snapshot.ball.holder, self.holder)
+        snapshot.shot_clock.team_side = self.shot_clock_side
+        snapshot.shot_clock.remaining_turns = max(self.shot_clock, 0)
+        return snapshot
+
+    def _broadcast(self):
+        with self._lock:
+            snapshot = self.snapshot()
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.put(snapshot)
+
+
+def _fill_player(message: server_pb2.Player, player: _PlayerState):
+    message.number = player.number
+    message.team_side = player.side
+    message.position.x = round(player.x)
+    message.position.y = round(player.y)
+    message.velocity.direction.x = player.dir_x * 100
+    message.velocity.direction.y = player.dir_y * 100
+    message.velocity.speed = player.speed
+    message.init_position.x = round(player.init_x)
+    message.init_position.y = round(player.init_y)
+
+
+def serve(port: int = 5000, **kwargs) -> Tuple[grpc.Server, LocalGameServer]:
+    """
+    Sobe o servidor gRPC com um LocalGameServer. A partida começa ao chamar `run_game()`.
+    Com `port=0`, o sistema escolhe uma porta livre, guardada em `game.port`.
+    """
+    game = LocalGameServer(**kwargs)
+    # Cada jogador mantém um stream aberto durante a partida, então precisamos de uma thread por jogador
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4 * game.players_per_team + 8))
+    server_grpc.add_GameServicer_to_server(game, server)
+    game.port = server.add_insecure_port(f'[::]:{port}')
+    server.start()
+    return server, game
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Lugo game server.')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS)
+    parser.add_argument('--players', type=int, default=11, help='players expected per team')
+    parser.add_argument('--join-timeout', type=float, default=30.0)
+    parser.add_argument('--listening-timeout', type=float, default=DEFAULT_LISTENING_TIMEOUT,
+                        help='seconds to wait for missing orders, like --listening-duration')
+    args = parser.parse_args()
+
+    server, game = serve(args.port, max_turns=args.turns, players_per_team=args.players,
+                         join_timeout=args.join_timeout, listening_timeout=args.listening_timeout)
+    start = time.monotonic()
+    result = game.run_game()
+    result['seconds'] = round(time.monotonic() - start, 3)
+    server.stop(grace=1)
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,29 @@
-from my_bot import MyBot
+from startup import ImportTimer, startup_report
+
+# Installed before the other imports, to report how long each one takes
+import_timer = ImportTimer().install()
+
+import logging
+import os
+import time
+
+from my_bot import TEAM_FACTS, TURN_BRANCHES, MyBot
 from lugo4py import NewDefaultStarter, Mapper
+from instrumentation import instrument_bot, monitor_from_env
 
-from settings import MAPPER_COLS, MAPPER_ROWS, PLAYER_INITIAL_POSITIONS
+from settings import MAPPER_COLS, MAPPER_ROWS, get_initial_position
 
 if __name__ == "__main__":
     #################################################################################
+    #   Runs one player (BOT_NUMBER) of the team; src/team_main.py runs them all    #
+    #   in one process. The bot itself is in my_bot.py. The optional modes below    #
+    #   are only imported when their environment variable turns them on, so a       #
+    #   restart (nodemon) does not pay for what it does not use.                    #
     #################################################################################
-    #                You do not need to change this file                            #
-    #                       Work on my_bot.py file                                  #
-    #################################################################################
-    #################################################################################
-    
+
+    # Messages from outside the turns (strategy reloads...); LOG_LEVEL=WARNING keeps only the problems
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format='%(asctime)s %(name)s: %(message)s')
+
     starter = NewDefaultStarter()
 
     # The default mapper uses a 10x6 map
@@ -19,21 +32,60 @@ if __name__ == "__main__":
     config = starter.get_config()
     mapper = Mapper(MAPPER_COLS, MAPPER_ROWS, config.get_bot_team_side())
 
-    position = PLAYER_INITIAL_POSITIONS[config.get_bot_number()]
-
-    initialRegion = mapper.get_region(
-        position['Col'],
-        position['Row'],
-    )
-    starter.set_initial_position(initialRegion.get_center())
+    # PLAYER_INITIAL_POSITIONS is compiled in settings.py together with the tactic tables of the
+    # strategy file (src/strategy.json, reloaded while the bot runs). The compiled tables are loaded
+    # from the disk cache (.cache/), and only built when the settings change. The shot map is opened
+    # on first use, before the kickoff (MyBot.getting_ready).
+    derived_started = time.perf_counter()
+    starter.set_initial_position(get_initial_position(config.get_bot_team_side(), config.get_bot_number()))
     starter.set_mapper(mapper)
+    derived_ms = (time.perf_counter() - derived_started) * 1000
 
     def on_join():
         print("I may run it when the bot is connected to the server")
 
-    starter.run(MyBot(
+    bot = MyBot(
         starter.get_config().get_bot_team_side(),
         starter.get_config().get_bot_number(),
         starter.get_initial_position(),
         starter.get_mapper()
-    ), on_join)
+    )
+
+    # Team-wide facts of the turn are computed once and shared with the teammates (TEAM_CACHE=off disables it)
+    if os.environ.get('TEAM_CACHE', '').lower() != 'off':
+        from team_cache import team_cache_from_env
+        bot.team_cache = team_cache_from_env(config.get_bot_team_side(), TEAM_FACTS)
+
+    # Speculative mode (SPECULATION=on): the next turn is precomputed while waiting for its snapshot
+    if os.environ.get('SPECULATION', '').lower() == 'on':
+        from speculation import speculate_bot, speculator_from_env
+        speculate_bot(bot, speculator_from_env(bot))
+
+    # Stacks of the turns listed in PROFILE_TURNS, or slower than the budget, saved to PROFILE_DIR for flame graphs.
+    # Enabled per bot with PROFILE_BOTS; `kill -USR1 <pid>` profiles the next turn (e.g. while paused at a breakpoint)
+    if os.environ.get('PROFILE_BOTS', '').strip():
+        from profiler import profile_bot, profiler_from_env
+        profiler = profiler_from_env(config.get_bot_team_side(), config.get_bot_number())
+        if profiler:
+            profile_bot(bot, profiler)
+
+    # Every turn (branch taken, time, exception) is recorded in TELEMETRY_DIR (off unless set); read it with
+    # src/read_telemetry.py
+    if os.environ.get('TELEMETRY_DIR'):
+        from telemetry import telemetry_bot, telemetry_from_env
+        telemetry_bot(bot, telemetry_from_env(config.get_bot_team_side(), config.get_bot_number(), TURN_BRANCHES))
+
+    # Latency histograms per handler/helper, saved to LATENCY_REPORT_DIR (off unless set) when the match is over
+    monitor = monitor_from_env(config.get_bot_team_side(), config.get_bot_number())
+    if monitor:
+        instrument_bot(bot, monitor)
+
+    # Snapshots saved to SNAPSHOT_RECORD_DIR can be replayed offline with src/replay.py
+    if os.environ.get('SNAPSHOT_RECORD_DIR'):
+        from recorder import record_bot, writer_from_env
+        writer = writer_from_env(config.get_bot_team_side(), config.get_bot_number())
+        if writer:
+            record_bot(bot, writer)
+
+    print(startup_report(import_timer, derived_ms))
+    starter.run(bot, on_join)
@@ -0,0 +1,641 @@
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import lugo4py
+from lugo4py.protos import server_pb2
+from field_grid import get_field_grid
+from local_server import CATCH_DISTANCE, GOALKEEPER_CATCH_DISTANCE
+from my_bot import CHASE_FALLBACK_TURNS, CHASE_HORIZON_TURNS, MIN_SHOT_QUALITY, TURN_BRANCHES, MyBot
+from role_assignment import CHASE, FORBIDDEN, PRESS, SLOT, TIE_BREAK
+from settings import MAPPER_COLS, MAPPER_ROWS, get_strategy, get_tactic_table
+from shot_map import ShotMap, get_shot_map
+from strategy import Strategy, load_strategy
+
+HOME = lugo4py.TeamSide.HOME
+AWAY = lugo4py.TeamSide.AWAY
+SIDES = (HOME, AWAY)
+
+PLAYERS = lugo4py.specs.MAX_PLAYERS
+# Índice do goleiro nos arrays de jogadores (o índice é o número - 1)
+GOALKEEPER = lugo4py.specs.GOALKEEPER_NUMBER - 1
+MAX_X = lugo4py.specs.MAX_X_COORDINATE
+MAX_Y = lugo4py.specs.MAX_Y_COORDINATE
+GOAL_Y = MAX_Y / 2
+
+BRANCH = {name: index for index, name in enumerate(TURN_BRANCHES)}
+
+# Sem portador da bola (`holder`); com portador, holder = lado * PLAYERS + índice
+FREE = -1
+
+# Mesmos horizontes e limites usados pelos handlers do MyBot
+INTERCEPTION_MAX_TURNS = 30
+GOALKEEPER_REACT_SPEED = 100
+GOALKEEPER_MIN_Y = lugo4py.specs.GOAL_MIN_Y + 920 / 2 + 100
+GOALKEEPER_MAX_Y = lugo4py.specs.GOAL_MAX_Y - 920 / 2 - 100
+GOALKEEPER_CENTER_DISTANCE = lugo4py.specs.FIELD_WIDTH / 4
+
+DEFAULT_WORLDS = 4096
+DEFAULT_TURNS = 200
+
+
+class Worlds:
+    """
+    N estados independentes e simplificados do jogo, guardados em arrays e avançados juntos:
+    cada `step` é um turno em todos os mundos. A física é a do local_server.py (bola com
+    desaceleração e rebote nas laterais, gol entre as traves, pegar a bola no alcance do corpo),
+    sem o tempo de ataque, a redução do chute pelo ângulo e a duração do pulo do goleiro.
+
+    `players` é (N, 2, PLAYERS, 2): mundo, lado, índice (número - 1) e (x, y).
+    """
+
+    def __init__(self, players: np.ndarray, ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray,
+                 holder: np.ndarray, kickoff: np.ndarray):
+        self.players = np.asarray(players, dtype=float)
+        self.ball = np.asarray(ball, dtype=float)
+        self.ball_dir = np.asarray(ball_dir, dtype=float)
+        self.ball_speed = np.asarray(ball_speed, dtype=float)
+        self.holder = np.asarray(holder, dtype=np.int64)
+        # Posições iniciais (2, PLAYERS, 2), para onde os jogadores voltam depois de um gol
+        self.kickoff = kickoff
+        self.n = len(self.ball)
+        self.score = np.zeros((self.n, 2), dtype=np.int64)
+
+    @classmethod
+    def at_kickoff(cls, n: int, strategy: Strategy) -> 'Worlds':
+        kickoff = initial_positions(strategy)
+        return cls(np.broadcast_to(kickoff, (n, 2, PLAYERS, 2)).copy(), np.tile([MAX_X / 2, GOAL_Y], (n, 1)),
+                   np.tile([1.0, 0.0], (n, 1)), np.zeros(n), np.full(n, FREE), kickoff)
+
+    @classmethod
+    def random(cls, n: int, strategy: Strategy, rng: np.random.Generator) -> 'Worlds':
+        """
+        Situações sorteadas: jogadores espalhados pelo campo (os goleiros perto do seu gol) e,
+        em metade dos mundos, a bola com um jogador de linha; na outra metade, a bola livre
+        andando em uma direção e velocidade qualquer.
+        """
+        players = rng.uniform((0, 0), (MAX_X, MAX_Y), size=(n, 2, PLAYERS, 2))
+        for side, goal_x in ((HOME, 0), (AWAY, MAX_X)):
+            players[:, side, GOALKEEPER, 0] = np.abs(goal_x - rng.uniform(0, 1000, n))
+            players[:, side, GOALKEEPER, 1] = rng.uniform(lugo4py.specs.GOAL_MIN_Y, lugo4py.specs.GOAL_MAX_Y, n)
+
+        angles = rng.uniform(-np.pi, np.pi, n)
+        holder = np.where(rng.random(n) < 0.5, rng.integers(0, 2, n) * PLAYERS + rng.integers(1, PLAYERS, n), FREE)
+        ball = rng.uniform((0, 0), (MAX_X, MAX_Y), size=(n, 2))
+        held = holder != FREE
+        ball[held] = players.reshape(n, 2 * PLAYERS, 2)[held, holder[held]]
+        speed = np.where(held, 0.0, rng.uniform(0, lugo4py.specs.BALL_MAX_SPEED, n))
+        return cls(players, ball, np.column_stack((np.cos(angles), np.sin(angles))), speed, holder,
+                   initial_positions(strategy))
+
+    def flat_players(self) -> np.ndarray:
+        """
+        Visão (N, 2 * PLAYERS, 2) dos jogadores, indexada como `holder`.
+        """
+        return self.players.reshape(self.n, 2 * PLAYERS, 2)
+
+    def step(self, targets: np.ndarray, speeds: np.ndarray, kicks: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Um turno em todos os mundos, na ordem do local_server.py: a bola livre anda, os jogadores
+        vão até `targets` (N, 2, PLAYERS, 2) a até `speeds` por turno (NaN fica parado), o portador
+        chuta com a velocidade `kicks` (N, 2) (NaN não chuta) e quem estiver no alcance pega a bola.
+        Retorna as máscaras (N,) dos eventos do turno: chutes, gols de cada lado e roubadas.
+        """
+        events = {'goal_home': np.zeros(self.n, dtype=bool), 'goal_away': np.zeros(self.n, dtype=bool)}
+        self._move_ball(self.holder == FREE, events)
+
+        delta = targets - self.players
+        distance = np.hypot(delta[..., 0], delta[..., 1])
+        moving = np.isfinite(distance) & (distance > 0)
+        scale = np.where(moving, np.minimum(speeds, distance) / np.where(moving, distance, 1), 0)
+        self.players += delta * np.where(moving, scale, 0)[..., np.newaxis]
+        np.clip(self.players, 0, (MAX_X, MAX_Y), out=self.players)
+
+        held = self.holder != FREE
+        holders = self.flat_players()[np.flatnonzero(held), self.holder[held]]
+        self.ball[held] = holders
+
+        kicked = held & np.isfinite(kicks[:, 0])
+        kicker = np.where(kicked, self.holder, FREE)
+        if kicked.any():
+            velocity = kicks[kicked]
+            speed = np.hypot(velocity[:, 0], velocity[:, 1])
+            self.ball_dir[kicked] = velocity / np.maximum(speed, 1e-9)[:, np.newaxis]
+            self.ball_speed[kicked] = np.minimum(speed, lugo4py.specs.BALL_MAX_SPEED)
+            self.holder[kicked] = FREE
+            self._move_ball(kicked, events)
+        events['kick'] = kicked
+
+        previous = self.holder.copy()
+        self._catch(kicker)
+        events['steal'] = (previous != FREE) & (self.holder != FREE) & (previous // PLAYERS != self.holder // PLAYERS)
+        events['catch'] = (previous == FREE) & (self.holder != FREE)
+
+        scored = events['goal_home'] | events['goal_away']
+        self.score[:, HOME] += events['goal_home']
+        self.score[:, AWAY] += events['goal_away']
+        self._reset(scored)
+        return events
+
+    def _move_ball(self, mask: np.ndarray, events: Dict[str, np.ndarray]):
+        mask = mask & (self.ball_speed > 0)
+        self.ball[mask] += self.ball_dir[mask] * self.ball_speed[mask, np.newaxis]
+        self.ball_speed[mask] -= lugo4py.specs.BALL_DECELERATION
+        self.ball_speed[self.ball_speed < lugo4py.specs.BALL_MIN_SPEED] = 0.0
+
+        # Laterais: a bola volta para o campo
+        for axis, limit in ((1, MAX_Y), (0, MAX_X)):
+            out = mask & ((self.ball[:, axis] < 0) | (self.ball[:, axis] > limit))
+            if axis == 0:
+                in_goal = out & (self.ball[:, 1] >= lugo4py.specs.GOAL_MIN_Y) & \
+                    (self.ball[:, 1] <= lugo4py.specs.GOAL_MAX_Y)
+                events['goal_away'] |= in_goal & (self.ball[:, 0] < 0)
+                events['goal_home'] |= in_goal & (self.ball[:, 0] > MAX_X)
+                out &= ~in_goal
+            self.ball[out, axis] = np.where(self.ball[out, axis] < 0, -self.ball[out, axis],
+                                            2 * limit - self.ball[out, axis])
+            self.ball_dir[out, axis] = -self.ball_dir[out, axis]
+
+    def _catch(self, kicker: np.ndarray):
+        """
+        O jogador mais próximo da bola dentro do seu alcance fica com ela (quem acabou de chutar não conta).
+        Um adversário no alcance do portador também rouba a bola, como o catch do servidor.
+        """
+        flat = self.flat_players()
+        distance = np.hypot(flat[..., 0] - self.ball[:, np.newaxis, 0], flat[..., 1] - self.ball[:, np.newaxis, 1])
+        reach = np.full(2 * PLAYERS, CATCH_DISTANCE)
+        reach[[GOALKEEPER, PLAYERS + GOALKEEPER]] = GOALKEEPER_CATCH_DISTANCE
+
+        can_catch = distance <= reach
+        can_catch[np.arange(self.n), np.maximum(kicker, 0)] &= kicker == FREE
+        held = self.holder != FREE
+        # Com a bola dominada, só o outro time disputa
+        holder_side = np.where(held, self.holder // PLAYERS, -1)
+        player_side = np.arange(2 * PLAYERS) // PLAYERS
+        can_catch &= player_side[np.newaxis, :] != holder_side[:, np.newaxis]
+
+        catching = can_catch.any(axis=1)
+        if catching.any():
+            nearest = np.where(can_catch, distance, np.inf).argmin(axis=1)
+            self.holder[catching] = nearest[catching]
+            self.ball[catching] = flat[catching, nearest[catching]]
+            self.ball_speed[catching] = 0.0
+
+    def _reset(self, mask: np.ndarray):
+        if not mask.any():
+            return
+        self.players[mask] = self.kickoff
+        self.ball[mask] = (MAX_X / 2, GOAL_Y)
+        self.ball_speed[mask] = 0.0
+        self.holder[mask] = FREE
+
+
+def initial_positions(strategy: Strategy) -> np.ndarray:
+    """
+    (2, PLAYERS, 2) com as posições iniciais da tabela tática.
+    """
+    compiled = get_tactic_table(MAPPER_COLS, strategy).compiled
+    return compiled[:, 1:, -1].copy()
+
+
+# ---------------------------------------------------------------- versões vetorizadas dos helpers do MyBot
+
+
+def travelled(speed: np.ndarray, turns: np.ndarray) -> np.ndarray:
+    """
+    BallTrajectory.travelled para N bolas (N,) e K horizontes (K,): (N, K).
+    """
+    deceleration = lugo4py.specs.BALL_DECELERATION
+    stop_turn = np.floor_divide(np.maximum(speed, 0), deceleration)
+    k = np.minimum(np.asarray(turns, dtype=float)[np.newaxis, :], stop_turn[:, np.newaxis])
+    return k * np.maximum(speed, 0)[:, np.newaxis] - deceleration * k * (k + 1) / 2
+
+
+def ball_future_positions(ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray, turns: int) -> np.ndarray:
+    """
+    MyBot.predict_ball_future_position para N bolas: (N, 2).
+    """
+    return ball + ball_dir * travelled(ball_speed, np.array([turns]))
+
+
+def ball_interceptions(ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray,
+                       origins: np.ndarray, horizon: int = CHASE_HORIZON_TURNS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    BallTrajectory.earliest_interception para M jogadores de cada uma das N bolas (origins (N, M, 2)):
+    o primeiro turno em que cada um alcança a bola (N, M), infinito se nenhum, e o ponto (N, M, 2), NaN se nenhum.
+    """
+    turns = np.arange(horizon + 1)
+    trajectory = ball[:, np.newaxis, :] + ball_dir[:, np.newaxis, :] * travelled(ball_speed, turns)[..., np.newaxis]
+    delta = trajectory[:, np.newaxis, :, :] - origins[:, :, np.newaxis, :]
+    reachable = np.hypot(delta[..., 0], delta[..., 1]) <= \
+        turns * lugo4py.specs.PLAYER_MAX_SPEED + lugo4py.specs.PLAYER_SIZE / 2
+    first = reachable.argmax(axis=2)
+    points = np.take_along_axis(trajectory, first[..., np.newaxis].repeat(2, axis=2), axis=1)
+    missed = ~reachable.any(axis=2)
+    points[missed] = np.nan
+    return np.where(missed, np.inf, first), points
+
+
+def ball_reachable_positions(ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray,
+                             origins: np.ndarray, horizon: int = CHASE_HORIZON_TURNS) -> np.ndarray:
+    """
+    MyBot.predict_ball_reachable_position para M jogadores de cada uma das N bolas (origins (N, M, 2)):
+    o primeiro ponto da trajetória que cada um alcança, (N, M, 2), NaN se nenhum.
+    """
+    return ball_interceptions(ball, ball_dir, ball_speed, origins, horizon)[1]
+
+
+def goal_line_crossings(ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray, side,
+                        max_turns: int = INTERCEPTION_MAX_TURNS) -> np.ndarray:
+    """
+    MyBot.predict_ball_interception_point para N bolas: onde cada uma cruza a linha do gol do
+    time `side` (N, 2), NaN se ela estiver se afastando, parar antes ou demorar mais de `max_turns`.
+    """
+    goal_x = 0 if side == HOME else MAX_X
+    side_factor = 1 if side == HOME else -1
+    step_x = ball_dir[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        needed = (goal_x - ball[:, 0]) / step_x
+    reached = travelled(ball_speed, np.arange(1, max_turns + 1)) >= needed[:, np.newaxis]
+    stop_turn = np.floor_divide(np.maximum(ball_speed, 0), lugo4py.specs.BALL_DECELERATION)
+    # Como S(k) não diminui, alcançar a linha até `max_turns` já garante que a bola chega lá antes de parar
+    valid = (step_x * side_factor <= 0) & (step_x != 0) & (stop_turn > 0) & (needed >= 0) & reached.any(axis=1)
+
+    crossings = np.full_like(ball, np.nan)
+    crossings[valid, 0] = goal_x
+    crossings[valid, 1] = ball[valid, 1] + ball_dir[valid, 1] * needed[valid]
+    return crossings
+
+
+def shot_targets(shot_map: ShotMap, side, shooters: np.ndarray, keeper_ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MyBot.evaluate_shot (e find_best_shot_target) para N chutadores: qualidades (N,) e miras (N, 2).
+    """
+    return shot_map.lookups(side, shooters, keeper_ys)
+
+
+def defensive_positions(ball: np.ndarray, side, strategy: Strategy) -> np.ndarray:
+    """
+    MyBot.dynamic_defensive_position de cada um dos `def_players` para N bolas: (N, len(def_players), 2).
+    """
+    goal_x = 0 if side == HOME else MAX_X
+    midfield_x = lugo4py.specs.FIELD_WIDTH / 2
+    line_x = goal_x + (ball[:, 0] - goal_x) * strategy.defense_ball_factor
+    if side == HOME:
+        line_x = np.maximum(np.minimum(line_x, midfield_x - 300), goal_x + strategy.defense_min_goal_distance)
+    else:
+        line_x = np.minimum(np.maximum(line_x, midfield_x + 300), goal_x - strategy.defense_min_goal_distance)
+    center_y = GOAL_Y + (ball[:, 1] - GOAL_Y) * strategy.defense_center_y_factor
+
+    count = len(strategy.def_players)
+    offsets = (count - 1) / 2 - np.arange(count)
+    if side == AWAY:
+        offsets = -offsets
+    pos_y = np.clip(center_y[:, np.newaxis] + offsets * strategy.defense_spacing, 200, lugo4py.specs.FIELD_HEIGHT - 200)
+
+    positions = np.empty((len(ball), count, 2))
+    positions[..., 0] = np.round(line_x)[:, np.newaxis]
+    positions[..., 1] = np.round(pos_y)
+    return positions
+
+
+def expected_positions(ball: np.ndarray, side, strategy: Strategy) -> np.ndarray:
+    """
+    get_my_expected_position de todos os jogadores para N bolas: (N, PLAYERS, 2).
+    """
+    cols = get_field_grid(MAPPER_COLS, MAPPER_ROWS, side).cells_of(ball)[:, 0]
+    targets = get_tactic_table(MAPPER_COLS, strategy).targets[side, 1:]
+    return targets[:, cols].transpose(1, 0, 2)
+
+
+def closest_players(players: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    MyBot.get_closest_players para N times (N, PLAYERS, 2): índices (N, PLAYERS) do mais próximo
+    de cada ponto (N, 2) ao mais distante.
+    """
+    distances = np.hypot(players[..., 0] - points[:, np.newaxis, 0], players[..., 1] - points[:, np.newaxis, 1])
+    return np.argsort(distances, axis=1, kind='stable')
+
+
+def assigned_to_role(slot_turns: np.ndarray, role_turns: np.ndarray, count: int) -> np.ndarray:
+    """
+    role_assignment.assign_roles com um papel só, para N times: máscara (N, PLAYERS) de quem fica com
+    uma das `count` vagas. Com vagas iguais, a atribuição de custo mínimo são os `count` jogadores
+    com a menor diferença entre o tempo até o papel e o tempo até o lugar (desempate pelo número, como lá).
+    """
+    saving = role_turns + TIE_BREAK * np.arange(PLAYERS) - slot_turns
+    chosen = np.argsort(saving, axis=1, kind='stable')[:, :count]
+    assigned = np.zeros(role_turns.shape, dtype=bool)
+    np.put_along_axis(assigned, chosen, True, axis=1)
+    return assigned & (role_turns < FORBIDDEN)
+
+
+def chase_costs(ball: np.ndarray, ball_dir: np.ndarray, ball_speed: np.ndarray,
+                players: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Custos do papel CHASE em MyBot._assign_roles para N times (N, PLAYERS), FORBIDDEN para o goleiro,
+    e para onde cada jogador correria (N, PLAYERS, 2).
+    """
+    turns, points = ball_interceptions(ball, ball_dir, ball_speed, players)
+    fallback = ball_future_positions(ball, ball_dir, ball_speed, CHASE_FALLBACK_TURNS)
+    delta = players - fallback[:, np.newaxis, :]
+    late = CHASE_HORIZON_TURNS + 1 + np.hypot(delta[..., 0], delta[..., 1]) / lugo4py.specs.PLAYER_MAX_SPEED
+    turns = np.where(np.isinf(turns), late, turns)
+    turns[:, GOALKEEPER] = FORBIDDEN
+    return turns, np.where(np.isnan(points), fallback[:, np.newaxis, :], points)
+
+
+def press_costs(players: np.ndarray, holders: np.ndarray) -> np.ndarray:
+    """
+    Custos do papel PRESS em MyBot._assign_roles para N times (N, PLAYERS): turnos até o portador (N, 2).
+    """
+    delta = players - holders[:, np.newaxis, :]
+    turns = np.hypot(delta[..., 0], delta[..., 1]) / lugo4py.specs.PLAYER_MAX_SPEED
+    turns[:, GOALKEEPER] = FORBIDDEN
+    return turns
+
+
+# ---------------------------------------------------------------- política: os handlers do MyBot em todos os mundos
+
+
+class Decisions:
+    """
+    Ordens de um turno para todos os mundos (veja `Worlds.step`) e a jogada de cada jogador,
+    como índice em TURN_BRANCHES.
+    """
+
+    def __init__(self, n: int):
+        self.targets = np.full((n, 2, PLAYERS, 2), np.nan)
+        self.speeds = np.full((n, 2, PLAYERS), lugo4py.specs.PLAYER_MAX_SPEED)
+        self.kicks = np.full((n, 2), np.nan)
+        self.shots = np.zeros(n, dtype=bool)
+        self.branches = np.full((n, 2, PLAYERS), BRANCH['expected_position'], dtype=np.int8)
+
+
+def decide(worlds: Worlds, strategy: Strategy, shot_map: ShotMap,
+           min_shot_quality: float = MIN_SHOT_QUALITY) -> Decisions:
+    """
+    As regras dos handlers do MyBot (sem a ActionSearch, os passes e as buscas por pontos) para os
+    dois times de todos os mundos. Jogadores de linha que não perseguem a bola, não pressionam e
+    não defendem vão para a posição tática; o portador chuta quando o mapa de chutes deixa.
+    """
+    n = worlds.n
+    decisions = Decisions(n)
+    rows = np.arange(n)
+    ball, ball_dir, ball_speed = worlds.ball, worlds.ball_dir, worlds.ball_speed
+    held = worlds.holder != FREE
+    holder_side = np.where(held, worlds.holder // PLAYERS, -1)
+    holder_index = worlds.holder % PLAYERS
+    def_indices = np.array(strategy.def_players) - 1
+
+    for side in SIDES:
+        players = worlds.players[:, side]
+        targets = decisions.targets[:, side]
+        opponent_goal_x = MAX_X if side == HOME else 0
+        holding, defending, disputing = holder_side == side, held & (holder_side != side), ~held
+
+        branches = decisions.branches[:, side]
+        targets[:] = expected_positions(ball, side, strategy)
+
+        # on_defending / on_supporting: os zagueiros mantêm a linha
+        line = defensive_positions(ball, side, strategy)
+        targets[:, def_indices] = np.where(disputing[:, np.newaxis, np.newaxis], targets[:, def_indices], line)
+        branches[~disputing[:, np.newaxis] & (np.arange(PLAYERS) == def_indices[:, np.newaxis]).any(axis=0)] = \
+            BRANCH['defensive_position']
+
+        # Papéis pelo menor tempo total (veja MyBot.get_role); o lugar de cada um é o alvo até aqui
+        delta = players - targets
+        slot_turns = np.hypot(delta[..., 0], delta[..., 1]) / lugo4py.specs.PLAYER_MAX_SPEED
+        # on_disputing: `ball_catchers` vão ao primeiro ponto da trajetória que alcançam
+        free = np.flatnonzero(disputing)
+        chase_turns, chase = chase_costs(ball[free], ball_dir[free], ball_speed[free], players[free])
+        chasing = assigned_to_role(slot_turns[free], chase_turns, strategy.ball_catchers)
+        targets[free] = np.where(chasing[..., np.newaxis], chase, targets[free])
+        branches[free] = np.where(chasing, BRANCH['chase_ball'], branches[free])
+
+        # on_defending: um jogador pressiona o portador
+        holder_position = worlds.flat_players()[rows, np.maximum(worlds.holder, 0)]
+        press_turns = press_costs(players, holder_position)
+        pressing = defending[:, np.newaxis] & assigned_to_role(slot_turns, press_turns, 1)
+        targets[pressing] = np.broadcast_to(holder_position[:, np.newaxis, :], targets.shape)[pressing]
+        branches[pressing] = BRANCH['press_holder']
+
+        # on_holding: zagueiros afastam para o meio; os demais chutam ou avançam para o gol
+        opponent_keeper_y = worlds.players[:, 1 - side, GOALKEEPER, 1]
+        quality, aims = shot_targets(shot_map, side, ball, opponent_keeper_y)
+        is_defender = np.isin(holder_index, def_indices)
+        clearing = holding & (is_defender | (holder_index == GOALKEEPER))
+        shooting = holding & ~clearing & (quality >= min_shot_quality)
+        advancing = holding & ~clearing & ~shooting
+        decisions.kicks[clearing] = _kick_velocity(ball[clearing], (lugo4py.specs.FIELD_WIDTH / 2, GOAL_Y))
+        decisions.kicks[shooting] = _kick_velocity(ball[shooting], aims[shooting])
+        targets[rows[advancing], holder_index[advancing]] = (opponent_goal_x, GOAL_Y)
+        decisions.shots |= shooting
+        for branch, mask in (('defender_clear', clearing), ('shoot', shooting), ('advance', advancing)):
+            branches[rows[mask], holder_index[mask]] = BRANCH[branch]
+
+        # as_goalkeeper: no centro do gol com a bola longe; perto, pula para onde a bola cruza a linha
+        keeper = ~(holding & (holder_index == GOALKEEPER))
+        goal_x = 0 if side == HOME else MAX_X
+        far = np.hypot(ball[:, 0] - goal_x, ball[:, 1] - GOAL_Y) > GOALKEEPER_CENTER_DISTANCE
+        crossing = goal_line_crossings(ball, ball_dir, ball_speed, side)
+        target_y = np.where((ball_speed > GOALKEEPER_REACT_SPEED) & np.isfinite(crossing[:, 1]), crossing[:, 1],
+                            ball[:, 1])
+        target_y = np.where(far, GOAL_Y, np.clip(target_y, GOALKEEPER_MIN_Y, GOALKEEPER_MAX_Y))
+        targets[keeper, GOALKEEPER] = np.column_stack((np.full(n, goal_x), target_y))[keeper]
+        decisions.speeds[keeper & ~far, side, GOALKEEPER] = lugo4py.specs.GOALKEEPER_JUMP_SPEED
+        branches[:, GOALKEEPER] = np.where(
+            keeper, np.where(far, BRANCH['goalkeeper_center'], BRANCH['goalkeeper_jump']), BRANCH['goalkeeper_clear'])
+
+    return decisions
+
+
+def _kick_velocity(origins: np.ndarray, targets) -> np.ndarray:
+    delta = np.asarray(targets, dtype=float) - origins
+    length = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+    return delta / length[:, np.newaxis] * lugo4py.specs.BALL_MAX_SPEED
+
+
+def simulate(worlds: Worlds, turns: int, strategy: Strategy, shot_map: ShotMap = None,
+             min_shot_quality: float = MIN_SHOT_QUALITY) -> dict:
+    """
+    Avança todos os mundos por `turns` turnos e soma os eventos. Cada turno de cada mundo são
+    2 * PLAYERS decisões (uma por jogador).
+    """
+    shot_map = shot_map or get_shot_map()
+    totals = {'shots': 0, 'goals_home': 0, 'goals_away': 0, 'steals': 0, 'catches': 0}
+    possession = np.zeros(2, dtype=np.int64)
+    branches = np.zeros(len(TURN_BRANCHES), dtype=np.int64)
+    # Chutes ainda em voo, para saber quantos viraram gol
+    in_flight = np.zeros(worlds.n, dtype=bool)
+    shot_goals = 0
+
+    started = time.perf_counter()
+    for _ in range(turns):
+        decisions = decide(worlds, strategy, shot_map, min_shot_quality)
+        events = worlds.step(decisions.targets, decisions.speeds, decisions.kicks)
+
+        scored = events['goal_home'] | events['goal_away']
+        shot_goals += int(np.count_nonzero(scored & (in_flight | decisions.shots)))
+        in_flight = (in_flight | decisions.shots) & (worlds.holder == FREE) & ~scored
+        totals['shots'] += int(np.count_nonzero(decisions.shots))
+        totals['goals_home'] += int(np.count_nonzero(events['goal_home']))
+        totals['goals_away'] += int(np.count_nonzero(events['goal_away']))
+        totals['steals'] += int(np.count_nonzero(events['steal']))
+        totals['catches'] += int(np.count_nonzero(events['catch']))
+        held = worlds.holder[worlds.holder != FREE]
+        possession += np.bincount(held // PLAYERS, minlength=2)
+        branches += np.bincount(decisions.branches.ravel(), minlength=len(TURN_BRANCHES))
+    elapsed = time.perf_counter() - started
+
+    decision_turns = worlds.n * turns * 2 * PLAYERS
+    return {
+        'worlds': worlds.n,
+        'turns': turns,
+        'seconds': round(elapsed, 3),
+        'decision_turns': decision_turns,
+        'decision_turns_per_minute': round(decision_turns / elapsed * 60) if elapsed else 0,
+        **totals,
+        'shot_conversion': round(shot_goals / totals['shots'], 3) if totals['shots'] else 0.0,
+        'possession_home': round(possession[HOME] / possession.sum(), 3) if possession.sum() else 0.0,
+        'branches': {name: int(count) for name, count in zip(TURN_BRANCHES, branches) if count},
+    }
+
+
+# ---------------------------------------------------------------- conferência com o MyBot
+
+
+def snapshot_of(worlds: Worlds, index: int) -> server_pb2.GameSnapshot:
+    """
+    Snapshot do mundo `index`, como o servidor o enviaria (posições inteiras, direções com módulo 100).
+    """
+    snapshot = server_pb2.GameSnapshot()
+    snapshot.state = server_pb2.GameSnapshot.State.LISTENING
+    snapshot.turn = index + 1
+    for side, team in ((HOME, snapshot.home_team), (AWAY, snapshot.away_team)):
+        team.side = side
+        for i in range(PLAYERS):
+            player = team.players.add()
+            player.number = i + 1
+            player.team_side = side
+            player.position.x, player.position.y = (int(round(v)) for v in worlds.players[index, side, i])
+    snapshot.ball.position.x, snapshot.ball.position.y = (int(round(v)) for v in worlds.ball[index])
+    snapshot.ball.velocity.direction.x, snapshot.ball.velocity.direction.y = worlds.ball_dir[index] * 100
+    snapshot.ball.velocity.speed = worlds.ball_speed[index]
+    if worlds.holder[index] != FREE:
+        side, i = divmod(int(worlds.holder[index]), PLAYERS)
+        team = snapshot.home_team if side == HOME else snapshot.away_team
+        snapshot.ball.holder.CopyFrom(team.players[i])
+    return snapshot
+
+
+def check(worlds: Worlds, strategy: Strategy, count: int) -> List[str]:
+    """
+    Compara as versões vetorizadas com os métodos do MyBot em `count` mundos. Retorna as diferenças.
+    """
+    # O MyBot vê posições inteiras e direções com módulo 100: as versões vetorizadas recebem o mesmo
+    worlds.players = np.round(worlds.players)
+    worlds.ball = np.round(worlds.ball)
+    worlds.ball_dir = np.array([[d.ball.velocity.direction.x / 100, d.ball.velocity.direction.y / 100]
+                                for d in (snapshot_of(worlds, i) for i in range(worlds.n))])
+    shot_map = get_shot_map()
+    sample = np.arange(min(count, worlds.n))
+    shooter = 9  # o número 10
+    failures = []
+    # Papéis de cada jogador nas decisões vetorizadas (o on_supporting, sem passes, não é simulado)
+    decisions = decide(worlds, strategy, shot_map)
+    role_of = {BRANCH['chase_ball']: CHASE, BRANCH['press_holder']: PRESS}
+
+    def compare(name: str, index: int, expected, actual):
+        expected = None if expected is None else (expected.x, expected.y)
+        if expected is None:
+            same = bool(np.all(np.isnan(actual)))
+        else:
+            same = np.allclose(expected, actual, rtol=0, atol=1e-6)
+        if not same:
+            failures.append(f'world {index}: {name}: MyBot {expected} vectorized {tuple(actual)}')
+
+    for side in SIDES:
+        bots = {number: MyBot(side, number, lugo4py.Point(), lugo4py.Mapper(MAPPER_COLS, MAPPER_ROWS, side))
+                for number in (lugo4py.specs.GOALKEEPER_NUMBER, shooter + 1, *strategy.def_players)}
+        for bot in bots.values():
+            bot.strategy = strategy
+
+        _, aims = shot_targets(shot_map, side, worlds.players[:, side, shooter],
+                               worlds.players[:, 1 - side, GOALKEEPER, 1])
+        crossings = goal_line_crossings(worlds.ball, worlds.ball_dir, worlds.ball_speed, side)
+        line = defensive_positions(worlds.ball, side, strategy)
+        reachable = ball_reachable_positions(worlds.ball, worlds.ball_dir, worlds.ball_speed, worlds.players[:, side])
+        expected = expected_positions(worlds.ball, side, strategy)
+        closest = closest_players(worlds.players[:, side], worlds.ball)
+
+        for index in sample:
+            snapshot = snapshot_of(worlds, index)
+            inspector = lugo4py.GameSnapshotInspector(side, shooter + 1, snapshot)
+            bot = bots[shooter + 1]
+            compare('find_best_shot_target', index, bot.find_best_shot_target(inspector), aims[index])
+            compare('predict_ball_reachable_position', index,
+                    bot.predict_ball_reachable_position(inspector, inspector.get_me()), reachable[index, shooter])
+            compare('get_my_expected_position', index,
+                    get_tactic_table(MAPPER_COLS, strategy).points[side][shooter + 1][
+                        get_field_grid(MAPPER_COLS, MAPPER_ROWS, side).col_of(snapshot.ball.position.x)],
+                    expected[index, shooter])
+            numbers = [p.number - 1 for p in bot.get_closest_players(inspector)]
+            if numbers != closest[index].tolist():
+                failures.append(f'world {index}: get_closest_players: MyBot {numbers} vectorized {closest[index]}')
+            if worlds.holder[index] == FREE or worlds.holder[index] // PLAYERS != side:
+                roles = [bot.get_role(inspector, number) for number in range(2, PLAYERS + 1)]
+                vectorized = [role_of.get(int(branch), SLOT) for branch in decisions.branches[index, side, 1:]]
+                if roles != vectorized:
+                    failures.append(f'world {index}: get_role: MyBot {roles} vectorized {vectorized}')
+
+            inspector = lugo4py.GameSnapshotInspector(side, lugo4py.specs.GOALKEEPER_NUMBER, snapshot)
+            compare('predict_ball_interception_point', index,
+                    bots[lugo4py.specs.GOALKEEPER_NUMBER].predict_ball_interception_point(inspector), crossings[index])
+            for column, number in enumerate(strategy.def_players):
+                inspector = lugo4py.GameSnapshotInspector(side, number, snapshot)
+                compare(f'dynamic_defensive_position({number})', index,
+                        bots[number].dynamic_defensive_position(inspector, number), line[index, column])
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulates thousands of simplified matches at once with MyBot's "
+                                                 "rules, vectorized over the worlds.")
+    parser.add_argument('--worlds', type=int, default=DEFAULT_WORLDS)
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--kickoff', action='store_true', help='starts every world at the kickoff instead of a '
+                                                               'random situation')
+    parser.add_argument('--strategy', help='strategy file (default: the one the bots use)')
+    parser.add_argument('--min-shot-quality', type=float, default=MIN_SHOT_QUALITY)
+    parser.add_argument('--check', type=int, metavar='N',
+                        help="compares the vectorized helpers with MyBot's on N random worlds and exits")
+    parser.add_argument('--out', help='writes the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    strategy = load_strategy(args.strategy) if args.strategy else get_strategy()
+    rng = np.random.default_rng(args.seed)
+
+    if args.check:
+        failures = check(Worlds.random(args.check, strategy, rng), strategy, args.check)
+        for failure in failures[:20]:
+            print(failure)
+        print(f'{len(failures)} differences in {args.check} worlds')
+        return 1 if failures else 0
+
+    worlds = Worlds.at_kickoff(args.worlds, strategy) if args.kickoff else Worlds.random(args.worlds, strategy, rng)
+    result = simulate(worlds, args.turns, strategy, min_shot_quality=args.min_shot_quality)
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            json.dump(result, out_file, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
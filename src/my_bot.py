@@ -1,45 +1,137 @@
-import math
 import random
+import time
 import traceback
 from abc import ABC
-from typing import List
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
-import lugo4py
-from settings import get_my_expected_position
+import numpy as np
 
-DEF_PLAYERS = [5, 4, 3, 2]
+import lugo4py
+from action_search import CARRY, ActionChoice, ActionSearch, holder_candidates
+from ball_kinematics import get_ball_trajectory
+from candidate_scoring import (ScoredCandidates, best_candidate, grid_candidates, refine_candidates, ring_candidates,
+                               score_candidates)
+from field_grid import FieldGrid
+from frame_cache import HIT, REFINE, FrameCache
+from opponent_model import OpponentModel
+from opponent_tracker import OpponentTracker
+from pass_lanes import best_pass, evaluate_passes
+from role_assignment import APPROACH, CHASE, FORBIDDEN, PRESS, SLOT, SUPPORT, assign_roles
+from settings import get_ball_col, get_my_expected_position, get_strategy, get_tactic_table
+from strategy import Strategy
+from shot_map import get_shot_map
+from turn_context import BALL_ROW, get_turn_context, turn_key
+
+if TYPE_CHECKING:
+    # Só para as anotações: os dois módulos são importados por main.py quando ligados
+    from team_cache import TeamTurnCache
+    from telemetry import Telemetry
+
+# Fatos do turno compartilhados pelo time (TeamTurnCache) e quantos inteiros cada um ocupa. Os raios
+# e os defensores vêm da estratégia (strategy.json), então os fatos são nomeados pelo papel
+TEAM_FACTS = {
+    'closest_to_ball': lugo4py.specs.MAX_PLAYERS,
+    'closest_to_holder': lugo4py.specs.MAX_PLAYERS,
+    'free_allies': lugo4py.specs.MAX_PLAYERS + 1,
+    'goalkeeper_free_allies': lugo4py.specs.MAX_PLAYERS + 1,
+    'holder_marked': 1,
+    'defensive_positions': 2 * (lugo4py.specs.MAX_PLAYERS + 1),
+    'roles': lugo4py.specs.MAX_PLAYERS + 1,
+}
+
+# Densidade de amostragem das buscas por pontos candidatos (raios e quantidade de ângulos)
+SUPPORT_RADII = (600, 800, 1000)
+SUPPORT_ANGLES = 48
+DRIBBLE_RADII = (300, 400, 500)
+DRIBBLE_ANGLES = 25
+# Grade à frente do jogador usada na busca por espaço livre no ataque
+OPEN_SPACE_AHEAD = tuple(range(600, 1801, 100))
+OPEN_SPACE_LATERAL = tuple(range(-600, 601, 100))
+# Adversários a até (alcance da busca + esta margem) da âncora invalidam o resultado guardado no FrameCache
+FRAME_RELEVANT_MARGIN = 1500
+# Quantos turnos à frente (pela velocidade observada, veja opponent_tracker.py) os adversários são
+# considerados: na marcação e nos companheiros livres, o tempo de um passe curto chegar; nas buscas
+# por pontos, o tempo de o jogador chegar até eles
+MARKING_LOOKAHEAD_TURNS = 3
+SEARCH_LOOKAHEAD_TURNS = 5
+# Na busca por espaço no ataque, quanto o score perde por unidade de distância lateral até a faixa
+# menos ocupada pelo adversário (veja opponent_model.py)
+OPEN_LANE_WEIGHT = 0.25
+# Risco de interceptação máximo aceito em um passe (veja pass_lanes.py)
+MAX_PASS_RISK = 0.25
+# Qualidade mínima (veja shot_map.py) para chutar ao gol
+MIN_SHOT_QUALITY = 0.25
+# Vagas do on_supporting (veja get_role): quem se aproxima do goleiro com a bola e quem apoia o portador marcado
+GOALKEEPER_APPROACHERS = 3
+HOLDER_SUPPORTERS = 1
+# Turnos à frente da bola para onde corre quem a persegue sem conseguir alcançá-la
+CHASE_FALLBACK_TURNS = 5
+# Horizonte (em turnos) da busca pelo ponto da trajetória que o jogador alcança
+CHASE_HORIZON_TURNS = 30
+
+# Jogadas que os handlers registram em `turn_branch` para a telemetria (veja telemetry.py)
+TURN_BRANCHES = [
+    'chase_ball', 'expected_position', 'press_holder', 'defensive_position',
+    'search_shoot', 'search_pass', 'search_carry', 'defender_pass', 'defender_clear', 'shoot', 'advance_free',
+    'pass', 'dribble', 'advance', 'approach_goalkeeper', 'support_holder', 'open_space',
+    'goalkeeper_pass', 'goalkeeper_clear', 'goalkeeper_center', 'goalkeeper_jump',
+]
 
 
 class MyBot(lugo4py.Bot, ABC):
+    # Cache dos fatos do turno compartilhado com os companheiros; sem ele, cada bot calcula tudo
+    team_cache: Optional['TeamTurnCache'] = None
+    # Telemetria dos turnos; sem ela, os erros dos handlers vão para o stdout
+    telemetry: Optional['Telemetry'] = None
+    # Se os turnos deste bot trocam a revisão da estratégia (veja StrategyWatcher.for_turn). A cópia usada
+    # pela especulação roda com o turno previsto e só lê a estratégia em uso
+    advances_strategy = True
+
+    def __init__(self, side: lugo4py.TeamSide, number: int, init_position: lugo4py.Point, my_mapper: lugo4py.Mapper):
+        super().__init__(side, number, init_position, my_mapper)
+        # Resultados das buscas de turnos anteriores, reaproveitados enquanto o jogo muda pouco
+        self.frame_cache = FrameCache.from_env()
+        # Histórico recente dos adversários, para prever onde estarão nos próximos turnos
+        self.opponent_tracker = OpponentTracker()
+        # Como o adversário se distribui em campo ao longo da partida (ocupação média de cada região)
+        self.opponent_model = OpponentModel(FieldGrid.from_mapper(my_mapper))
+        # Busca das ações do portador da bola, limitada pelo tempo do turno (ACTION_SEARCH=on; None usa as regras fixas)
+        self.action_search = ActionSearch.from_env()
+        self._turn_started_at = time.perf_counter()
+        # Táticas, defensores e limiares do turno, recarregados de strategy.json entre os turnos
+        self.strategy: Strategy = get_strategy()
+        # Jogada escolhida e erro do turno, lidos pela telemetria
+        self.turn_branch: Optional[str] = None
+        self.turn_error: Optional[Exception] = None
+
     def on_disputing(self, inspector: lugo4py.GameSnapshotInspector) -> List[lugo4py.Order]:
         """
         Método chamado quando nenhum jogador está com a posse da bola (bola disputada).
         O bot decide se vai tentar pegar a bola ou se posicionar.
         """
         try:
+            self._start_turn(inspector, 'on_disputing')
             me = inspector.get_me()
-            ball_position = inspector.get_ball().position
-            my_team = inspector.get_my_team_players()
-
-            # Ordena os jogadores do time por proximidade da bola
-            closest_players = self.get_closest_players(ball_position, my_team)
-            n_catchers = 3  # Quantos jogadores tentarão pegar a bola
-            catchers = closest_players[:n_catchers]
-            if me in catchers:
-                # Se estou entre os mais próximos, vou em direção à bola
-                target_pos = self.predict_ball_future_position(inspector, 5)
+
+            # `ball_catchers` jogadores tentarão pegar a bola (veja get_role)
+            if self.get_role(inspector) == CHASE:
+                # Se sou um deles, vou ao primeiro ponto da trajetória da bola que consigo alcançar
+                self.turn_branch = 'chase_ball'
+                target_pos = self.predict_ball_reachable_position(inspector, me)
+                if target_pos is None:
+                    target_pos = self.predict_ball_future_position(inspector, CHASE_FALLBACK_TURNS)
                 move_order = inspector.make_order_move_max_speed(target_pos)
             else:
                 # Caso contrário, me posiciono na posição esperada
-                move_order = inspector.make_order_move_max_speed(get_my_expected_position(inspector, self.mapper, self.number))
+                self.turn_branch = 'expected_position'
+                move_order = inspector.make_order_move_max_speed(get_my_expected_position(inspector, self.mapper, self.number, self.strategy))
 
             catch_order = inspector.make_order_catch()
 
             return [move_order, catch_order]
 
         except Exception as e:
-            print(f'did not play this turn due to exception {e}')
-            traceback.print_exc()
+            self._failed_turn(e)
 
     def on_defending(self, inspector: lugo4py.GameSnapshotInspector) -> List[lugo4py.Order]:
         """
@@ -47,31 +139,30 @@ class MyBot(lugo4py.Bot, ABC):
         O bot decide se pressiona o adversário, mantém a linha defensiva ou retorna à posição esperada.
         """
         try:
+            self._start_turn(inspector, 'on_defending')
             me = inspector.get_me()
             ball_pos = inspector.get_ball().position
-            my_team = inspector.get_my_team_players()
-            
-            closest_player_to_ball = self.get_closest_players(ball_pos, my_team)[0]
-            am_i_closest = (me.number == closest_player_to_ball.number)
             
-            if am_i_closest:
+            if self.get_role(inspector) == PRESS:
+                self.turn_branch = 'press_holder'
                 ball_holder = inspector.get_ball_holder()
                 target_pos = ball_holder.position if ball_holder else ball_pos
                 move_order = inspector.make_order_move_max_speed(target_pos)
                 catch_order = inspector.make_order_catch()
                 return [move_order, catch_order]
             
-            if me.number in DEF_PLAYERS:
+            if me.number in self.strategy.def_players:
+                self.turn_branch = 'defensive_position'
                 defensive_pos = self.dynamic_defensive_position(inspector, me.number)
                 move_order = inspector.make_order_move_max_speed(defensive_pos)
                 return [move_order]
             else:
-                expected_pos = get_my_expected_position(inspector, self.mapper, self.number)
+                self.turn_branch = 'expected_position'
+                expected_pos = get_my_expected_position(inspector, self.mapper, self.number, self.strategy)
                 move_order = inspector.make_order_move_max_speed(expected_pos)
                 return [move_order]
         except Exception as e:
-            print(f'did not play this turn due to exception {e}')
-            traceback.print_exc()
+            self._failed_turn(e)
 
     def on_holding(self, inspector: lugo4py.GameSnapshotInspector) -> List[lugo4py.Order]:
         """
@@ -79,76 +170,69 @@ class MyBot(lugo4py.Bot, ABC):
         O bot decide se chuta ao gol, avança ou passa para um companheiro livre.
         """
         try:
+            self._start_turn(inspector, 'on_holding')
             me = inspector.get_me()
             opponent_goal = self.mapper.get_attack_goal()
 
-            if me.number in DEF_PLAYERS:
+            # Chute, passe ou condução escolhidos pela busca; sem ela, seguem as regras abaixo
+            action = self.search_action(inspector)
+            if action is not None:
+                self.turn_branch = f'search_{action.kind}'
+                if action.kind == CARRY:
+                    return [inspector.make_order_move_max_speed(action.target)]
+                return [inspector.make_order_kick_max_speed(action.target)]
+
+            if me.number in self.strategy.def_players:
                 # Zagueiros com a bola devem passar para um jogador de meio/ataque livre
-                free_allies = self.get_free_allies(inspector, 600)
+                free_allies = self.get_free_allies(inspector, self.strategy.free_ally_radius, 'free_allies')
                 
-                non_defenders = [p for p in free_allies if p.number not in DEF_PLAYERS]
-
-                if non_defenders:
-                    # Passa para o jogador de meio/ataque livre mais avançado
-                    side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
-                    non_defenders.sort(key=lambda p: p.position.x * side_factor, reverse=True)
-                    
-                    target_player = non_defenders[0]
-                    kick_order = inspector.make_order_kick_max_speed(target_player.position)
+                non_defenders = [p for p in free_allies if p.number not in self.strategy.def_players]
+
+                # Passa para o jogador de meio/ataque livre mais avançado cuja linha de passe está segura
+                target_pos = self.find_best_pass(inspector, non_defenders)
+                if target_pos:
+                    self.turn_branch = 'defender_pass'
+                    kick_order = inspector.make_order_kick_max_speed(target_pos)
                     return [kick_order]
                 else:
                     # Se não houver jogadores livres, chuta para o meio do campo
+                    self.turn_branch = 'defender_clear'
                     kick_order = inspector.make_order_kick_max_speed(lugo4py.Point(x=lugo4py.specs.FIELD_WIDTH / 2, y=lugo4py.specs.FIELD_HEIGHT / 2))
                     return [kick_order]
 
-            goal_line_x = opponent_goal.get_center().x
-            x_dist = abs(me.position.x - goal_line_x)
-
-            # Condição para chutar: perto da linha do gol e com ângulo razoável
-            should_shoot = False
-            if x_dist < lugo4py.GOAL_ZONE_RANGE * 1.5:
-                goal_top_y = opponent_goal.get_top_pole().y
-                goal_bottom_y = opponent_goal.get_bottom_pole().y
-                margin = 500  # Margem para permitir chutes da lateral
-                
-                if (goal_bottom_y - margin) < me.position.y < (goal_top_y + margin):
-                    should_shoot = True
-
-            if should_shoot:
-                my_order = inspector.make_order_kick_max_speed(self.find_best_shot_target(inspector))
+            # Condição para chutar: o mapa de chutes diz que o goleiro não chega antes da bola
+            shot_quality, shot_target = self.evaluate_shot(inspector)
+            if shot_quality >= MIN_SHOT_QUALITY:
+                self.turn_branch = 'shoot'
+                my_order = inspector.make_order_kick_max_speed(shot_target)
                 return [my_order]
 
-            if not self.is_marked(inspector, me, 700):
+            if not self.is_marked(inspector, me, self.strategy.marked_holder_radius):
+                self.turn_branch = 'advance_free'
                 return [inspector.make_order_move_max_speed(opponent_goal.get_center())]
             
             # tocar a bola um pouco mais para frente
-            free_players = self.get_free_allies(inspector, 600)
-            if free_players:
-                side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
-                free_players.sort(key=lambda p: p.position.x * side_factor, reverse=True)
-
-                target_player = free_players[0]
-                target_pos = lugo4py.Point(
-                    x=target_player.position.x + (150 * side_factor),
-                    y=target_player.position.y
-                )
-                
+            free_players = self.get_free_allies(inspector, self.strategy.free_ally_radius, 'free_allies')
+            target_pos = self.find_best_pass(inspector, free_players, lead=150)
+            if target_pos:
+                self.turn_branch = 'pass'
                 kick_order = inspector.make_order_kick_max_speed(target_pos)
                 return [kick_order]
 
             dribble_pos = self.find_dribble_position(inspector)
             if dribble_pos:
+                self.turn_branch = 'dribble'
                 return [inspector.make_order_move_max_speed(dribble_pos)]
 
             
 
             # Se não estou marcado ou não achei passe, continuo avançando
+            self.turn_branch = 'advance'
             my_order = inspector.make_order_move_max_speed(opponent_goal.get_center())
             return [my_order]
 
         except Exception as e:
-            print(f'did not play this turn due to exception. {e}')
-            traceback.print_exc()
+            self._failed_turn(e)
 
     def on_supporting(self, inspector: lugo4py.GameSnapshotInspector) -> List[lugo4py.Order]:
         """
@@ -156,36 +240,32 @@ class MyBot(lugo4py.Bot, ABC):
         O bot decide se apoia o portador da bola, se posiciona para receber passe ou mantém posição defensiva.
         """
         try:
+            self._start_turn(inspector, 'on_supporting')
             me = inspector.get_me()
             ball_holder = inspector.get_ball_holder()
-            my_team = inspector.get_my_team_players()
             ball_pos = inspector.get_ball().position #posição da bola
 
             # Defensores tem uma lógica própria
-            if me.number in DEF_PLAYERS:
+            if me.number in self.strategy.def_players:
+                self.turn_branch = 'defensive_position'
                 defensive_pos = self.dynamic_defensive_position(inspector, me.number)
                 move_order = inspector.make_order_move_max_speed(defensive_pos)
                 return [move_order]
 
+            role = self.get_role(inspector)
             # Se o goleiro do meu time está com a bola, me aproximo
-            if ball_holder.number == 1:
-                closest_players = self.get_closest_players(ball_holder.position, my_team)
-                if me in closest_players[:4]:
-                    move_order = inspector.make_order_move_max_speed(ball_holder.position)
-                    return [move_order]
-
-            # Se o portador da bola está marcado, o companheiro mais próximo deve dar suporte
-            if self.is_marked(inspector, ball_holder, 900):
-                closest_teammate = self.get_closest_players(ball_holder.position, my_team)[:2]
-                for closest_player in closest_teammate:
-                    if me.number == closest_player.number:
-                        print("Sou jogador proximo")
-                        # Eu sou o mais próximo, então devo encontrar uma posição de suporte
-                        support_pos = self.find_support_position(inspector, ball_holder)
-                        move_order = inspector.make_order_move_max_speed(support_pos)
-                        return [move_order]
-                    
-            
+            if role == APPROACH:
+                self.turn_branch = 'approach_goalkeeper'
+                move_order = inspector.make_order_move_max_speed(ball_holder.position)
+                return [move_order]
+
+            # Se o portador da bola está marcado, devo dar suporte
+            if role == SUPPORT:
+                self.turn_branch = 'support_holder'
+                support_pos = self.find_support_position(inspector, ball_holder)
+                move_order = inspector.make_order_move_max_speed(support_pos)
+                return [move_order]
+
             # Verifica se está campo de ataque e o cálculo de field_third foi ajustado para maior clareza
             attack_direction_start = (lugo4py.specs.FIELD_WIDTH / 2)
             if self.side == lugo4py.TeamSide.HOME:
@@ -195,18 +275,19 @@ class MyBot(lugo4py.Bot, ABC):
 
             if is_in_attack_zone:
                 # Se estamos atacando, procuro um espaço livre para receber o passe
+                self.turn_branch = 'open_space'
                 move_dest = self.find_open_space_in_attack(inspector)
             else:
                 # Caso contrário, me movo para a minha posição tática esperada
-                move_dest = get_my_expected_position(inspector, self.mapper, self.number)
+                self.turn_branch = 'expected_position'
+                move_dest = get_my_expected_position(inspector, self.mapper, self.number, self.strategy)
                 
             
             move_order = inspector.make_order_move_max_speed(move_dest)
             return [move_order]
 
         except Exception as e:
-            print(f'did not play this turn due to exception {e}')
-            traceback.print_exc()
+            self._failed_turn(e)
 
     def as_goalkeeper(self, inspector: lugo4py.GameSnapshotInspector, state) -> List[lugo4py.Order]:
         """
@@ -214,28 +295,32 @@ class MyBot(lugo4py.Bot, ABC):
         O goleiro decide se passa a bola, intercepta ou se posiciona no gol.
         """
         try:
+            self._start_turn(inspector, f'as_goalkeeper_{state}')
             ball_pos = inspector.get_ball().position
             my_goal_center = self.mapper.get_defense_goal().get_center()
 
             if state == lugo4py.PLAYER_STATE.HOLDING_THE_BALL:
-                free_players = self.get_free_allies(inspector, 800)
-                if free_players:
-                    side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
-                    free_players.sort(key=lambda p: p.position.x * side_factor, reverse=True)
-                    target_player = free_players[0]
-                    kick_order = inspector.make_order_kick_max_speed(target_player.position)
+                free_players = self.get_free_allies(inspector, self.strategy.goalkeeper_free_ally_radius,
+                                                    'goalkeeper_free_allies')
+                target_pos = self.find_best_pass(inspector, free_players)
+                if target_pos:
+                    self.turn_branch = 'goalkeeper_pass'
+                    kick_order = inspector.make_order_kick_max_speed(target_pos)
                     return [kick_order]
                 else:
+                    self.turn_branch = 'goalkeeper_clear'
                     kick_order = inspector.make_order_kick_max_speed(lugo4py.Point(x=lugo4py.specs.FIELD_WIDTH / 2, y=lugo4py.specs.FIELD_HEIGHT / 2))
                     return [kick_order]
 
             oscillation_y = random.randint(-50, 50)
 
             if lugo4py.distance_between_points(my_goal_center, ball_pos) > lugo4py.specs.FIELD_WIDTH / 4:
+                self.turn_branch = 'goalkeeper_center'
                 target_pos = lugo4py.Point(x=my_goal_center.x, y=my_goal_center.y + oscillation_y)
                 move_order = inspector.make_order_move_max_speed(target_pos)
                 return [move_order]
 
+            self.turn_branch = 'goalkeeper_jump'
             target_y = ball_pos.y
             predicted_ball_pos = None
             if inspector.get_ball().velocity.speed > 100:  # Só reage a bolas mais rápidas
@@ -261,15 +346,17 @@ class MyBot(lugo4py.Bot, ABC):
             return [jump_order, catch_order]
 
         except Exception as e:
-            print(f'did not play this turn due to exception {e}')
-            traceback.print_exc()
+            self._failed_turn(e)
 
     def getting_ready(self, snapshot: lugo4py.GameSnapshot):
         """
         Método chamado antes do início do jogo e após um gol.
         Pode ser usado para redefinir variáveis ou estratégias.
         """
-        print('getting ready')
+        self.frame_cache.invalidate()
+        self.opponent_tracker.reset()
+        # O mapa de chutes é aberto no primeiro uso; aqui, antes do apito, o primeiro uso fica fora dos turnos
+        get_shot_map()
 
     def is_near(self, region_origin: lugo4py.mapper.Region, dest_origin: lugo4py.mapper.Region) -> bool:
         """
@@ -283,35 +370,13 @@ class MyBot(lugo4py.Bot, ABC):
         """
         Encontra a melhor posição para dar suporte ao jogador com a posse de bola.
         """
-        best_pos = None
-        max_dist_to_opp = -1
-
-        # Gera pontos candidatos ao redor do portador da bola
-        for angle in range(0, 360, 45):
-            rad = angle * 3.14159 / 180
-            dist = 800
-            candidate_pos = lugo4py.Point(
-                x=ball_holder.position.x + dist * math.cos(rad),
-                y=ball_holder.position.y + dist * math.sin(rad)
-            )
-
-            # Verifica se a posição candidata está dentro do campo
-            if not (0 < candidate_pos.x < lugo4py.specs.FIELD_WIDTH and 0 < candidate_pos.y < lugo4py.specs.FIELD_HEIGHT):
-                continue
-
-            # Encontra o oponente mais próximo da posição candidata
-            opponents = inspector.get_opponent_players()
-            closest_opp_dist = float('inf')
-            if opponents:
-                for opp in opponents:
-                    d = lugo4py.geo.distance_between_points(candidate_pos, opp.position)
-                    if d < closest_opp_dist:
-                        closest_opp_dist = d
-            
-            # Queremos a posição que está mais longe de qualquer oponente
-            if closest_opp_dist > max_dist_to_opp:
-                max_dist_to_opp = closest_opp_dist
-                best_pos = candidate_pos
+        context = get_turn_context(inspector)
+
+        # Pontos candidatos ao redor do portador da bola: queremos a posição mais longe de qualquer oponente
+        best_pos = self._incremental_search(
+            f'support_{ball_holder.number}', ball_holder.position, max(SUPPORT_RADII),
+            lambda: ring_candidates(ball_holder.position, SUPPORT_RADII, 0, 360, SUPPORT_ANGLES, endpoint=False),
+            lambda candidates: score_candidates(context, candidates, lookahead=SEARCH_LOOKAHEAD_TURNS))
 
         if best_pos:
             return best_pos
@@ -320,96 +385,119 @@ class MyBot(lugo4py.Bot, ABC):
             goal_direction = -1 if self.side == lugo4py.TeamSide.HOME else 1
             return lugo4py.Point(x=ball_holder.position.x + (goal_direction * 500), y=ball_holder.position.y)
 
+    def find_best_pass(self, inspector: lugo4py.GameSnapshotInspector, receivers: List[lugo4py.Player],
+                       lead: float = 0) -> Optional[lugo4py.Point]:
+        """
+        Escolhe o passe para o companheiro mais avançado entre `receivers` cuja linha de passe
+        não pode ser interceptada, mirando `lead` à frente dele. Retorna None se nenhum passe for seguro.
+        """
+        if not receivers:
+            return None
+        context = get_turn_context(inspector)
+        side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
+
+        numbers = [p.number for p in receivers]
+        targets = [(p.position.x + lead * side_factor, p.position.y) for p in receivers]
+        return best_pass(evaluate_passes(context, numbers, targets, side_factor), MAX_PASS_RISK)
+
+    def search_action(self, inspector: lugo4py.GameSnapshotInspector) -> Optional[ActionChoice]:
+        """
+        Escolhe a ação do portador da bola com a ActionSearch, dentro do prazo contado do início do turno.
+        Retorna None se a busca estiver desligada.
+        """
+        if self.action_search is None:
+            return None
+        context = get_turn_context(inspector)
+        goalkeeper = inspector.get_opponent_goalkeeper()
+        keeper_y = goalkeeper.position.y if goalkeeper else 0
+        shot_quality, shot_target = self.evaluate_shot(inspector)
+
+        candidates = holder_candidates(context, inspector.get_me(), get_shot_map(), keeper_y, shot_quality, shot_target)
+        return self.action_search.search(candidates, context, self._turn_started_at, seed=context.turn)
+
     def predict_ball_future_position(self, inspector: lugo4py.GameSnapshotInspector, turns: int) -> lugo4py.Point:
         """
         Prevê a posição futura da bola, considerando a desaceleração.
         """
-        ball = inspector.get_ball()
-        future_pos = lugo4py.Point(x=ball.position.x, y=ball.position.y)
-        ball_speed = ball.velocity.speed
-        ball_dir = ball.velocity.direction
-
-        for _ in range(turns):
-            ball_speed -= lugo4py.specs.BALL_DECELERATION
-            if ball_speed < 0:
-                ball_speed = 0
-            
-            # A velocidade é dada em unidades por 100 turnos, então dividimos por 100
-            future_pos.x += ball_dir.x * ball_speed / 100
-            future_pos.y += ball_dir.y * ball_speed / 100
-
-        return future_pos
+        future_pos = get_ball_trajectory(inspector).position_at(turns)
+        return lugo4py.Point(x=float(future_pos[0]), y=float(future_pos[1]))
     
+    def predict_ball_reachable_position(self, inspector: lugo4py.GameSnapshotInspector, player: lugo4py.Player) -> Optional[lugo4py.Point]:
+        """
+        Prevê o primeiro ponto da trajetória da bola que o jogador consegue alcançar.
+        Retorna None se a bola não puder ser alcançada nos próximos turnos.
+        """
+        origin = (player.position.x, player.position.y)
+        interception = get_ball_trajectory(inspector).earliest_interception(
+            origin, lugo4py.specs.PLAYER_MAX_SPEED, reach=lugo4py.specs.PLAYER_SIZE / 2)
+        if interception is None:
+            return None
+
+        _, point = interception
+        return lugo4py.Point(x=float(point[0]), y=float(point[1]))
+
     def find_dribble_position(self, inspector: lugo4py.GameSnapshotInspector) -> lugo4py.Point:
         """
         Encontra a melhor posição para driblar, se movendo para um local próximo e livre.
         Retorna None se nenhum local seguro para drible for encontrado.
         """
         me = inspector.get_me()
-        best_pos = None
-        max_dist_to_opp = -1
+        context = get_turn_context(inspector)
 
-        # Gera pontos candidatos ao redor do jogador
-        for angle in range(-90, 91, 45):  # Apenas para frente e para os lados
-            rad = angle * 3.14159 / 180
-            dist = 400 # Distância curta para o drible
-            
-            if self.side == lugo4py.TeamSide.AWAY:
-                rad += 3.14159
-
-            candidate_pos = lugo4py.Point(
-                x=me.position.x + dist * math.cos(rad),
-                y=me.position.y + dist * math.sin(rad)
-            )
-
-            if not (0 < candidate_pos.x < lugo4py.specs.FIELD_WIDTH and 0 < candidate_pos.y < lugo4py.specs.FIELD_HEIGHT):
-                continue
-
-            opponents = inspector.get_opponent_players()
-            closest_opp_dist = float('inf')
-            if opponents:
-                for opp in opponents:
-                    d = lugo4py.geo.distance_between_points(candidate_pos, opp.position)
-                    if d < closest_opp_dist:
-                        closest_opp_dist = d
-            
-            if closest_opp_dist > max_dist_to_opp:
-                max_dist_to_opp = closest_opp_dist
-                best_pos = candidate_pos
+        # Gera pontos candidatos ao redor do jogador, apenas para frente e para os lados
+        start_deg = 90 if self.side == lugo4py.TeamSide.AWAY else -90
 
         # Só retorna uma posição de drible se ela for significativamente mais segura
-        if max_dist_to_opp > 600:
-            return best_pos
-
-        return None
+        return self._incremental_search(
+            'dribble', me.position, max(DRIBBLE_RADII),
+            lambda: ring_candidates(me.position, DRIBBLE_RADII, start_deg, start_deg + 180, DRIBBLE_ANGLES),
+            lambda candidates: score_candidates(context, candidates, lookahead=SEARCH_LOOKAHEAD_TURNS),
+            min_score=600)
 
     def dynamic_defensive_position(self, inspector: lugo4py.GameSnapshotInspector, player_number: int) -> lugo4py.Point:
         """
         Calcula a posição defensiva dinâmica para o jogador, baseada na posição da bola e do gol.
+        As posições dos defensores são calculadas juntas e compartilhadas com o time.
         """
+        if player_number not in self.strategy.def_players:
+            return self._defensive_position(inspector, player_number)
+
+        def compute():
+            # (x, y) de cada defensor na posição do seu número
+            coords = np.zeros(2 * (lugo4py.specs.MAX_PLAYERS + 1), dtype=np.int64)
+            for number in self.strategy.def_players:
+                position = self._defensive_position(inspector, number)
+                coords[2 * number:2 * number + 2] = (position.x, position.y)
+            return coords
+
+        coords = self._team_fact(inspector, 'defensive_positions', compute)
+        return lugo4py.Point(x=int(coords[2 * player_number]), y=int(coords[2 * player_number + 1]))
+
+    def _defensive_position(self, inspector: lugo4py.GameSnapshotInspector, player_number: int) -> lugo4py.Point:
         ball_pos = inspector.get_ball().position
         my_goal_center = self.mapper.get_defense_goal().get_center()
 
-        defense_line_x = my_goal_center.x + (ball_pos.x - my_goal_center.x) * 0.4
+        strategy = self.strategy
+        defense_line_x = my_goal_center.x + (ball_pos.x - my_goal_center.x) * strategy.defense_ball_factor
         
         midfield_x = lugo4py.specs.FIELD_WIDTH / 2
         if self.side == lugo4py.TeamSide.HOME:
             defense_line_x = min(defense_line_x, midfield_x - 300)
-            defense_line_x = max(defense_line_x, my_goal_center.x + 800)
+            defense_line_x = max(defense_line_x, my_goal_center.x + strategy.defense_min_goal_distance)
         else: # AWAY
             defense_line_x = max(defense_line_x, midfield_x + 300)
-            defense_line_x = min(defense_line_x, my_goal_center.x - 800)
+            defense_line_x = min(defense_line_x, my_goal_center.x - strategy.defense_min_goal_distance)
 
-        center_y = my_goal_center.y + (ball_pos.y - my_goal_center.y) * 0.7
-        spacing = 900
+        center_y = my_goal_center.y + (ball_pos.y - my_goal_center.y) * strategy.defense_center_y_factor
 
-        if self.side == lugo4py.TeamSide.HOME:
-            offsets = {2: -1.5, 3: -0.5, 4: 0.5, 5: 1.5}
-        else:  # AWAY
-            offsets = {2: 1.5, 3: 0.5, 4: -0.5, 5: -1.5}
-
-        offset = offsets.get(player_number, 0)
-        pos_y = center_y + offset * spacing
+        # Os defensores se espalham em torno do centro na ordem de def_players (o primeiro fica mais acima
+        # para o time da casa, ex.: 5, 4, 3, 2 -> +1.5, +0.5, -0.5, -1.5); os demais ficam no centro
+        offset = 0
+        if player_number in strategy.def_players:
+            offset = (len(strategy.def_players) - 1) / 2 - strategy.def_players.index(player_number)
+            if self.side == lugo4py.TeamSide.AWAY:
+                offset = -offset
+        pos_y = center_y + offset * strategy.defense_spacing
         
         pos_y = max(200, min(lugo4py.specs.FIELD_HEIGHT - 200, pos_y))
         return lugo4py.Point(x=round(defense_line_x), y=round(pos_y))
@@ -418,41 +506,18 @@ class MyBot(lugo4py.Bot, ABC):
         """
         Calcula o melhor alvo para o chute ao gol, considerando a posição do goleiro adversário.
         """
-        me = inspector.get_me()
-        opponent_goal = self.mapper.get_attack_goal()
-        goal_top_pole = opponent_goal.get_top_pole()
-        goal_bottom_pole = opponent_goal.get_bottom_pole()
+        return self.evaluate_shot(inspector)[1]
 
+    def evaluate_shot(self, inspector: lugo4py.GameSnapshotInspector) -> Tuple[float, lugo4py.Point]:
+        """
+        Consulta no mapa de chutes a qualidade (0 a 1) do chute da minha posição e onde mirar.
+        """
+        me = inspector.get_me()
         goalkeeper = inspector.get_opponent_goalkeeper()
 
-        if not goalkeeper:
-            return goal_top_pole
-
-        target_top = lugo4py.Point(x=goal_top_pole.x, y=round(goal_top_pole.y - lugo4py.BALL_SIZE))
-        target_bottom = lugo4py.Point(x=goal_bottom_pole.x, y=round(goal_bottom_pole.y + lugo4py.BALL_SIZE))
-
-        KEEPER_REACH = lugo4py.PLAYER_SIZE * 1.5
-        gk_coverage_top = goalkeeper.position.y + KEEPER_REACH
-        gk_coverage_bottom = goalkeeper.position.y - KEEPER_REACH
-
-        is_top_path_clear = target_top.y > gk_coverage_top
-        is_bottom_path_clear = target_bottom.y < gk_coverage_bottom
-
-        dist_ball_to_top = lugo4py.geo.distance_between_points(me.position, target_top)
-        dist_ball_to_bottom = lugo4py.geo.distance_between_points(me.position, target_bottom)
-
-        dist_gk_to_top = lugo4py.geo.distance_between_points(goalkeeper.position, target_top)
-        dist_gk_to_bottom = lugo4py.geo.distance_between_points(goalkeeper.position, target_bottom)
-
-        score_top = (dist_gk_to_top / dist_ball_to_top) if is_top_path_clear else -1
-        score_bottom = (dist_gk_to_bottom / dist_ball_to_bottom) if is_bottom_path_clear else -1
-
-        if score_top <= 0 and score_bottom <= 0:
-            return opponent_goal.get_center()
-        if score_top > score_bottom:
-            return target_top
-        else:
-            return target_bottom
+        # Sem goleiro adversário, consulta o mapa com o goleiro longe do gol
+        keeper_y = goalkeeper.position.y if goalkeeper else 0
+        return get_shot_map().lookup(self.side, me.position, keeper_y)
 
     def predict_ball_interception_point(self, inspector: lugo4py.GameSnapshotInspector) -> lugo4py.Point:
         """
@@ -468,119 +533,231 @@ class MyBot(lugo4py.Bot, ABC):
         if ball.velocity.direction.x * side_factor > 0:
             return None  # Bola se afastando
 
-        future_pos = lugo4py.Point(x=ball.position.x, y=ball.position.y)
-        ball_speed = ball.velocity.speed
-        ball_dir = ball.velocity.direction
+        # Simula por no máximo 30 turnos
+        crossing = get_ball_trajectory(inspector).goal_line_crossing(goal_line_x, max_turns=30)
+        if crossing is None:
+            return None
 
-        for _ in range(30):  # Simula por no máximo 30 turnos
-            ball_speed -= lugo4py.specs.BALL_DECELERATION
-            if ball_speed <= 0:
-                break
-            
-            future_pos.x += ball_dir.x * ball_speed / 100
-            future_pos.y += ball_dir.y * ball_speed / 100
+        _, crossing_point = crossing
+        return lugo4py.Point(x=goal_line_x, y=float(crossing_point[1]))
 
-            # Verifica se a bola cruzou a linha do gol
-            if (side_factor > 0 and future_pos.x <= goal_line_x) or \
-               (side_factor < 0 and future_pos.x >= goal_line_x):
-                
-                # Interpolação para encontrar o ponto exato no cruzamento
-                overshoot = abs(future_pos.x - goal_line_x)
-                correction_factor = overshoot / abs(ball_dir.x * ball_speed / 100) if ball_dir.x != 0 else 0
-                
-                intercept_y = future_pos.y - (ball_dir.y * ball_speed / 100 * correction_factor)
-                
-                return lugo4py.Point(x=goal_line_x, y=intercept_y)
-        
-        return None
-
-    def is_marked(self, inspector: lugo4py.GameSnapshotInspector, player: lugo4py.Player, dist: int) -> bool:
+    def is_marked(self, inspector: lugo4py.GameSnapshotInspector, player: lugo4py.Player, dist: int,
+                  fact: Optional[str] = None) -> bool:
         """
         Verifica se um jogador está marcado por um adversário em um determinado raio de distância,
-        considerando apenas os adversários à sua frente ou aos lados.
+        considerando apenas os adversários à sua frente ou aos lados. Para o portador da bola, `fact`
+        é o nome do resultado compartilhado com o time (veja TEAM_FACTS).
         """
-        opponent_team = inspector.get_opponent_players()
-        
-        for opponent in opponent_team:
-            distance_to_opponent = lugo4py.geo.distance_between_points(player.position, opponent.position)
-            
-            if distance_to_opponent <= dist:
-                # Verifica se o oponente não está atrás do jogador
-                is_behind = False
-                tolerance = 200  # Tolerância para considerar "atrás"
-                if self.side == lugo4py.TeamSide.HOME:
-                    if opponent.position.x < player.position.x - tolerance:
-                        is_behind = True
-                else:  # AWAY
-                    if opponent.position.x > player.position.x + tolerance:
-                        is_behind = True
-                
-                if not is_behind:
-                    return True
-        return False
+        context = get_turn_context(inspector)
+
+        def compute():
+            # Adversários onde estarão daqui a MARKING_LOOKAHEAD_TURNS turnos
+            distances = context.opponent_distances_from([(player.position.x, player.position.y)],
+                                                        MARKING_LOOKAHEAD_TURNS)[0]
+
+            # Verifica se o oponente não está atrás do jogador
+            tolerance = 200  # Tolerância para considerar "atrás"
+            opponents_x = context.opponent_positions_at(MARKING_LOOKAHEAD_TURNS)[:, 0]
+            if self.side == lugo4py.TeamSide.HOME:
+                is_behind = opponents_x < player.position.x - tolerance
+            else:  # AWAY
+                is_behind = opponents_x > player.position.x + tolerance
 
-    def get_closest_players(self, point: lugo4py.Point, player_list: List[lugo4py.Player]) -> List[lugo4py.Player]:
+            return [int(np.any((distances <= dist) & ~is_behind))]
+
+        if fact is None or not self._is_ball_holder(inspector, player):
+            return bool(compute()[0])
+        return bool(self._team_fact(inspector, fact, compute)[0])
+
+    def get_closest_players(self, inspector: lugo4py.GameSnapshotInspector, player: Optional[lugo4py.Player] = None) -> List[lugo4py.Player]:
         """
-        Retorna a lista de jogadores mais próximos de um ponto específico.
+        Retorna os jogadores do meu time ordenados pela proximidade da bola,
+        ou do companheiro informado em `player`.
         """
-        sortKey = lambda player: lugo4py.geo.distance_between_points(point, player.position)
+        context = get_turn_context(inspector)
+        row = BALL_ROW if player is None else context.ally_row(player.number)
 
-        closest_players = sorted(player_list, key=sortKey)
-        return closest_players
+        def compute():
+            numbers = np.zeros(lugo4py.specs.MAX_PLAYERS, dtype=np.int64)
+            numbers[:len(context.allies)] = context.ally_numbers[np.argsort(context.ally_distances(row), kind='stable')]
+            return numbers
 
-    def get_free_allies(self, inspector: lugo4py.GameSnapshotInspector, dist: int) -> List[lugo4py.Player]:
+        if player is None:
+            numbers = self._team_fact(inspector, 'closest_to_ball', compute)
+        elif self._is_ball_holder(inspector, player):
+            numbers = self._team_fact(inspector, 'closest_to_holder', compute)
+        else:
+            numbers = compute()
+        return [context.allies[context.ally_index(number)] for number in numbers[:len(context.allies)]]
+
+    def get_role(self, inspector: lugo4py.GameSnapshotInspector, number: Optional[int] = None) -> int:
+        """
+        Papel do jogador `number` (ou o meu) neste turno (veja role_assignment.py). Os papéis do time
+        inteiro são distribuídos juntos, uma vez por turno, e compartilhados com os companheiros.
+        """
+        roles = self._team_fact(inspector, 'roles', lambda: self._assign_roles(inspector))
+        return int(roles[self.number if number is None else number])
+
+    def _assign_roles(self, inspector: lugo4py.GameSnapshotInspector) -> np.ndarray:
+        """
+        Distribui os papéis pelo menor tempo total (em turnos) dos jogadores de linha: bola disputada,
+        `ball_catchers` perseguidores; adversário com a bola, um para pressionar; companheiro com a bola,
+        quem se aproxima do goleiro e quem apoia o portador marcado. Os demais ficam no seu lugar:
+        a posição tática ou, para os defensores, a linha de defesa.
+        """
+        context = get_turn_context(inspector)
+        strategy = self.strategy
+        speed = lugo4py.specs.PLAYER_MAX_SPEED
+
+        numbers = np.sort(context.ally_numbers[context.ally_numbers != lugo4py.specs.GOALKEEPER_NUMBER])
+        positions = context.ally_positions[[context.ally_index(number) for number in numbers.tolist()]]
+        slots = get_tactic_table(self.mapper.cols, strategy).targets[self.side, numbers,
+                                                                     get_ball_col(inspector, self.mapper)]
+        is_defender = np.isin(numbers, strategy.def_players)
+
+        holder = inspector.get_ball().holder
+        roles = []
+        if holder.number == 0:
+            trajectory = get_ball_trajectory(inspector)
+            turns = trajectory.earliest_interceptions(positions, speed, reach=lugo4py.specs.PLAYER_SIZE / 2,
+                                                      horizon=CHASE_HORIZON_TURNS)
+            # Quem não alcança a bola corre até onde ela estará, e chega depois de todos que alcançam
+            fallback = positions - trajectory.position_at(CHASE_FALLBACK_TURNS)
+            late = CHASE_HORIZON_TURNS + 1 + np.hypot(fallback[:, 0], fallback[:, 1]) / speed
+            roles.append((CHASE, strategy.ball_catchers, np.where(np.isinf(turns), late, turns)))
+        else:
+            to_holder = np.hypot(positions[:, 0] - holder.position.x, positions[:, 1] - holder.position.y) / speed
+            if holder.team_side != self.side:
+                # Os defensores que não pressionam ficam na linha de defesa
+                slots = slots.copy()
+                for index in np.flatnonzero(is_defender):
+                    position = self.dynamic_defensive_position(inspector, int(numbers[index]))
+                    slots[index] = (position.x, position.y)
+                roles.append((PRESS, 1, to_holder))
+            else:
+                # Os defensores e o portador não são candidatos
+                candidates = np.where(~is_defender & (numbers != holder.number), to_holder, FORBIDDEN)
+                if holder.number == lugo4py.specs.GOALKEEPER_NUMBER:
+                    roles.append((APPROACH, GOALKEEPER_APPROACHERS, candidates))
+                if self.is_marked(inspector, holder, strategy.support_marked_holder_radius, 'holder_marked'):
+                    roles.append((SUPPORT, HOLDER_SUPPORTERS, candidates))
+
+        delta = positions - slots
+        slot_costs = np.hypot(delta[:, 0], delta[:, 1]) / speed
+        result = np.full(lugo4py.specs.MAX_PLAYERS + 1, SLOT, dtype=np.int64)
+        if roles:
+            result[numbers] = assign_roles(slot_costs, roles)
+        return result
+
+    def get_free_allies(self, inspector: lugo4py.GameSnapshotInspector, dist: int,
+                        fact: Optional[str] = None) -> List[lugo4py.Player]:
+        """
+        Retorna os companheiros de time que estarão livres de adversários em um determinado raio de distância
+        quando um passe chegar (veja MARKING_LOOKAHEAD_TURNS). `fact` é o nome do resultado compartilhado
+        com o time (veja TEAM_FACTS); sem ele, o bot só calcula.
+        """
+        context = get_turn_context(inspector)
+
+        def compute():
+            distances = context.ally_to_opponent_distances(MARKING_LOOKAHEAD_TURNS)
+            is_free = ~np.any(distances <= dist, axis=1) & (context.ally_numbers != 1)
+            free = np.zeros(lugo4py.specs.MAX_PLAYERS + 1, dtype=np.int64)
+            free[context.ally_numbers[is_free]] = 1
+            return free
+
+        # O resultado compartilhado vale para o time todo; cada bot tira a si mesmo da lista
+        free = self._team_fact(inspector, fact, compute) if fact else np.asarray(compute())
+        free_players = [p for p in context.allies if free[p.number] and p.number != self.number]
+        free_players.sort(key=lambda p: (p.position.x, p.position.y))
+        return free_players
+
+    def get_open_lane(self, inspector: lugo4py.GameSnapshotInspector) -> Optional[float]:
         """
-        Retorna os companheiros de time que estão livres de adversários em um determinado raio de distância.
+        y do centro da faixa do campo de ataque menos ocupada pelo adversário até aqui (veja opponent_model.py).
+        Retorna None antes de o modelo ter visto algum turno.
         """
-        my_team = inspector.get_my_team_players()
-        opponent_team = inspector.get_opponent_players()
+        model = self.opponent_model
+        if not model.observed:
+            return None
+        row = model.least_covered_row(model.grid.cols // 2)
+        return float(model.grid.centers[0, row, 1])
 
-        free_players = []
-        for ally in my_team:
-            is_free = True
-            for opponent in opponent_team:
-                distance_to_opponent = lugo4py.geo.distance_between_points(ally.position, opponent.position)
-                if distance_to_opponent <= dist:
-                    is_free = False
+    def _start_turn(self, inspector: lugo4py.GameSnapshotInspector, handler: str):
+        """
+        Início de cada handler: atualiza o histórico dos adversários (e as velocidades no contexto do turno)
+        e o modelo da formação deles, e avisa o FrameCache. O prazo da ActionSearch conta a partir daqui.
+        """
+        self._turn_started_at = time.perf_counter()
+        context = get_turn_context(inspector)
+        self.strategy = get_strategy(context.turn if self.advances_strategy else None)
+        self.opponent_tracker.update(context)
+        context.set_opponent_velocities(self.opponent_tracker.velocities_of(context.opponent_numbers))
+        self.opponent_model.update(context)
+        self.frame_cache.start_turn(context, handler)
 
-            if is_free and ally.number != 1 and ally.number != self.number:
-                free_players.append(ally)
+    def _failed_turn(self, error: Exception):
+        """
+        O turno não foi jogado: o erro vai no registro da telemetria ou, sem ela, para o stdout.
+        """
+        if self.telemetry is None:
+            print(f'did not play this turn due to exception {error}')
+            traceback.print_exc()
+        else:
+            self.turn_error = error
 
-        free_players.sort(key=lambda p: (p.position.x, p.position.y))
-        return free_players
+    def _team_fact(self, inspector: lugo4py.GameSnapshotInspector, name: str, compute) -> np.ndarray:
+        """
+        Lê do cache do time um fato deste turno, calculando-o (e publicando-o) se nenhum
+        companheiro o calculou ainda. Sem cache, ou para fatos fora de TEAM_FACTS, só calcula.
+        O carimbo inclui a estratégia: um bot que ainda não recarregou strategy.json não lê
+        fatos calculados com a nova.
+        """
+        if self.team_cache is None or name not in self.team_cache.slots:
+            return np.asarray(compute())
+        return self.team_cache.get_or_compute(turn_key(inspector) ^ self.strategy.fingerprint, name, compute)
+
+    def _incremental_search(self, name: str, anchor: lugo4py.Point, reach: float,
+                            candidates: Callable[[], np.ndarray], score: Callable[[np.ndarray], ScoredCandidates],
+                            min_score: float = -np.inf) -> Optional[lugo4py.Point]:
+        """
+        Busca por pontos candidatos que passa pelo FrameCache: reaproveita o resultado do turno anterior,
+        refina-o ao redor do ponto anterior ou faz a busca completa, conforme o quanto o jogo mudou.
+        """
+        status, previous = self.frame_cache.lookup(name, (anchor.x, anchor.y))
+        if status == HIT:
+            return previous
+        if status == REFINE and previous is not None:
+            best_pos = best_candidate(score(refine_candidates(previous)), min_score)
+            self.frame_cache.update(name, best_pos)
+            return best_pos
+
+        best_pos = best_candidate(score(candidates()), min_score)
+        self.frame_cache.store(name, (anchor.x, anchor.y), reach + FRAME_RELEVANT_MARGIN, best_pos)
+        return best_pos
+
+    def _is_ball_holder(self, inspector: lugo4py.GameSnapshotInspector, player: lugo4py.Player) -> bool:
+        holder = inspector.get_ball().holder
+        return holder.number != 0 and holder.number == player.number and holder.team_side == player.team_side
 
 
     #encontrar espaço receber e fazer passe
     def find_open_space_in_attack(self, inspector: lugo4py.GameSnapshotInspector) -> lugo4py.Point:
 
         me = inspector.get_me()
+        context = get_turn_context(inspector)
         opponent_goal = self.mapper.get_attack_goal().get_center()
-        best_pos = None
-        best_score = -1
 
-        for i in range(1, 4):
-            side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
-            dist_ahead = i * 600 
-            
-            candidate_points = [
-                lugo4py.Point(x=me.position.x + dist_ahead * side_factor, y=me.position.y),
-                lugo4py.Point(x=me.position.x + dist_ahead * side_factor, y=me.position.y + 400),
-                lugo4py.Point(x=me.position.x + dist_ahead * side_factor, y=me.position.y - 400),
-            ]
-            
-            for point in candidate_points:
-                if not (0 < point.x < lugo4py.specs.FIELD_WIDTH and 0 < point.y < lugo4py.specs.FIELD_HEIGHT):
-                    continue
-
-                opponents = inspector.get_opponent_players()
-                closest_opp_dist = min([lugo4py.geo.distance_between_points(point, opp.position) for opp in opponents]) if opponents else float('inf')
+        side_factor = 1 if self.side == lugo4py.TeamSide.HOME else -1
+        lane_y = self.get_open_lane(inspector)
+        best_pos = self._incremental_search(
+            'open_space', me.position, max(OPEN_SPACE_AHEAD),
+            lambda: grid_candidates(me.position, OPEN_SPACE_AHEAD, OPEN_SPACE_LATERAL, side_factor),
+            lambda candidates: score_candidates(context, candidates, goal=opponent_goal, goal_weight=0.5,
+                                               lookahead=SEARCH_LOOKAHEAD_TURNS, lane_y=lane_y,
+                                               lane_weight=OPEN_LANE_WEIGHT),
+            min_score=-1)
+        if best_pos:
+            return best_pos
 
-                dist_to_goal = lugo4py.geo.distance_between_points(point, opponent_goal)
-                
-                score = closest_opp_dist - dist_to_goal * 0.5
+        return get_my_expected_position(inspector, self.mapper, self.number, self.strategy)
 
-                if score > best_score:
-                    best_score = score
-                    best_pos = point
-        
-        return best_pos if best_pos else get_my_expected_position(inspector, self.mapper, self.number)
\ No newline at end of file
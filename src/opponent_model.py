@@ -0,0 +1,97 @@
+import copy
+from typing import Optional
+
+import numpy as np
+
+from field_grid import FieldGrid
+from turn_context import TurnContext
+
+# Meia-vida (em turnos) das estatísticas: uma observação de 200 turnos atrás vale metade da atual
+HALF_LIFE_TURNS = 200
+# Quando o peso do turno passa disto, todas as somas são divididas por ele (o peso volta a 1)
+RESCALE_WEIGHT = 1e100
+
+
+class OpponentModel:
+    """
+    Como o adversário se distribui em campo, aprendido durante a partida: a ocupação de cada região
+    do FieldGrid (colunas contadas a partir do nosso gol), em adversários, como média com decaimento
+    exponencial (meia-vida de `half_life` turnos), guardada em um array alocado uma única vez.
+
+    Em vez de multiplicar todas as somas pelo decaimento a cada turno, o peso das observações novas
+    cresce (`1 / decaimento` por turno) e as consultas dividem pela soma dos pesos. Assim a atualização
+    só mexe nas posições dos adversários em campo, não no tamanho da grade.
+    """
+
+    def __init__(self, grid: FieldGrid, half_life: float = HALF_LIFE_TURNS):
+        self.grid = grid
+        self.growth = 2 ** (1 / half_life)
+        # Depois de uma pausa longa (ex.: entre as partidas), o passado já não conta: o salto do peso é limitado
+        self._max_gap = 10 * half_life
+        self._occupancy = np.zeros(grid.cols * grid.rows)
+        # Soma dos pesos de todos os turnos
+        self._weights = 0.0
+        self._weight = 1.0
+        self._last_turn = -1
+
+    def reset(self):
+        """
+        Esquece tudo, ex.: no começo de outra partida.
+        """
+        self._occupancy.fill(0)
+        self._weights = 0.0
+        self._weight = 1.0
+        self._last_turn = -1
+
+    def __deepcopy__(self, memo) -> 'OpponentModel':
+        # A grade é compartilhada pelos bots do processo e nunca muda: só as estatísticas são copiadas
+        model = copy.copy(self)
+        model._occupancy = self._occupancy.copy()
+        return model
+
+    def update(self, context: TurnContext):
+        """
+        Soma as posições dos adversários no turno. Chamadas repetidas no mesmo turno não fazem nada;
+        um turno anterior ao último observado (outra partida) reinicia o modelo.
+        """
+        if context.turn == self._last_turn:
+            return
+        if context.turn < self._last_turn:
+            self.reset()
+        if self._last_turn >= 0:
+            self._weight *= self.growth ** min(context.turn - self._last_turn, self._max_gap)
+            if self._weight > RESCALE_WEIGHT:
+                self._rescale()
+        self._last_turn = context.turn
+
+        self._weights += self._weight
+        if len(context.opponent_numbers):
+            np.add.at(self._occupancy, self.grid.indices_of(context.opponent_positions), self._weight)
+
+    @property
+    def observed(self) -> bool:
+        return self._weights > 0
+
+    def occupancy(self) -> np.ndarray:
+        """
+        (cols, rows): quantos adversários, em média, ficam em cada região.
+        """
+        if not self._weights:
+            return np.zeros((self.grid.cols, self.grid.rows))
+        return (self._occupancy / self._weights).reshape(self.grid.cols, self.grid.rows)
+
+    def least_covered_row(self, first_col: int, last_col: Optional[int] = None) -> int:
+        """
+        Linha (faixa do campo) com menos adversários, em média, entre as colunas `first_col` e `last_col`
+        (inclusive; padrão: até o gol adversário). Empates ficam com a faixa mais central.
+        """
+        last_col = self.grid.cols - 1 if last_col is None else last_col
+        rows = self.occupancy()[first_col:last_col + 1].sum(axis=0)
+        center = (self.grid.rows - 1) / 2
+        return min(range(self.grid.rows), key=lambda row: (rows[row], abs(row - center)))
+
+    def _rescale(self):
+        scale = 1 / self._weight
+        self._occupancy *= scale
+        self._weights *= scale
+        self._weight = 1.0
@@ -0,0 +1,81 @@
+import numpy as np
+
+import lugo4py
+from turn_context import TurnContext
+
+# Turnos guardados por adversário; a velocidade é o deslocamento médio na janela
+HISTORY_TURNS = 4
+
+
+class OpponentTracker:
+    """
+    Últimas posições observadas de cada adversário, em um buffer circular (HISTORY_TURNS, 12, 2)
+    alocado uma única vez e indexado pelo número do jogador (NaN onde ele não estava em campo).
+    A cada turno, estima a velocidade de todos os adversários de uma vez a partir do deslocamento
+    desde a amostra mais antiga da janela, limitada a PLAYER_MAX_SPEED.
+
+    A velocidade vem do que os adversários realmente fizeram, não do campo `velocity` do snapshot,
+    que é a ordem que eles enviaram (e pode ter sido barrada pela lateral ou por uma trombada).
+    """
+
+    def __init__(self, history: int = HISTORY_TURNS):
+        self._positions = np.full((history, lugo4py.specs.MAX_PLAYERS + 1, 2), np.nan)
+        self._turns = np.full(history, -1, dtype=np.int64)
+        self._head = -1
+        self._displacement = np.zeros((lugo4py.specs.MAX_PLAYERS + 1, 2))
+        self.velocities = np.zeros((lugo4py.specs.MAX_PLAYERS + 1, 2))
+
+    def reset(self):
+        """
+        Esquece o histórico, ex.: depois de um gol, quando todos voltam às posições iniciais.
+        """
+        self._positions.fill(np.nan)
+        self._turns.fill(-1)
+        self._head = -1
+        self.velocities.fill(0)
+
+    def update(self, context: TurnContext):
+        """
+        Grava as posições do turno e recalcula as velocidades. Chamadas repetidas no mesmo turno não
+        fazem nada; um turno anterior ao último gravado (outra partida) reinicia o histórico.
+        """
+        if self._head >= 0:
+            last_turn = self._turns[self._head]
+            if context.turn == last_turn:
+                return
+            if context.turn < last_turn:
+                self.reset()
+
+        self._head = (self._head + 1) % len(self._turns)
+        slot = self._positions[self._head]
+        slot.fill(np.nan)
+        slot[context.opponent_numbers] = context.opponent_positions
+        self._turns[self._head] = context.turn
+        self._estimate(context.turn)
+
+    def velocities_of(self, numbers: np.ndarray) -> np.ndarray:
+        """
+        Velocidades (N, 2), por turno, dos adversários de números `numbers`.
+        """
+        return self.velocities[numbers]
+
+    def _estimate(self, turn: int):
+        # Amostra mais antiga ainda dentro da janela (o turno atual fica de fora)
+        history = len(self._turns)
+        oldest, oldest_age = None, 0
+        for slot, sample_turn in enumerate(self._turns.tolist()):
+            age = turn - sample_turn
+            if sample_turn >= 0 and oldest_age < age < history:
+                oldest, oldest_age = slot, age
+        if oldest is None:
+            self.velocities.fill(0)
+            return
+
+        # Quem não estava em campo em uma das duas amostras fica parado
+        np.subtract(self._positions[self._head], self._positions[oldest], out=self._displacement)
+        np.divide(self._displacement, oldest_age, out=self.velocities)
+        self.velocities[np.isnan(self.velocities)] = 0
+
+        speeds = np.hypot(self.velocities[:, 0], self.velocities[:, 1])
+        if speeds.max() > lugo4py.specs.PLAYER_MAX_SPEED:
+            self.velocities *= (lugo4py.specs.PLAYER_MAX_SPEED / np.maximum(speeds, lugo4py.specs.PLAYER_MAX_SPEED))[:, np.newaxis]
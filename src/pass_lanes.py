@@ -0,0 +1,103 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+import lugo4py
+from ball_kinematics import BallTrajectory
+from turn_context import TurnContext
+
+# Pontos avaliados ao longo de cada linha de passe (o último é o próprio alvo)
+LANE_SAMPLES = 20
+# Alcance de um adversário ao disputar a bola
+INTERCEPTION_REACH = lugo4py.specs.PLAYER_SIZE / 2
+# Escala (em turnos) da conversão folga -> risco: risco = 1 / (1 + exp(folga / escala)).
+# Com escala 1, folga 0 é 50% de risco e 2 turnos de folga são 12%.
+RISK_SCALE_TURNS = 1.0
+
+
+class PassOptions(NamedTuple):
+    """
+    Passes avaliados, ordenados do alvo mais avançado para o menos avançado.
+    `margin` é a folga (em turnos) da bola sobre o adversário mais rápido no pior ponto da linha:
+    negativa quando algum adversário chega antes da bola.
+    """
+    numbers: np.ndarray
+    targets: np.ndarray
+    ball_turns: np.ndarray
+    margin: np.ndarray
+    risk: np.ndarray
+
+
+def evaluate_passes(context: TurnContext, numbers: np.ndarray, targets: np.ndarray, side_factor: int,
+                    kick_speed: float = lugo4py.specs.BALL_MAX_SPEED) -> PassOptions:
+    """
+    Avalia de uma vez os passes da bola até cada alvo (N, 2), vetorizado em alvos x pontos x adversários.
+    Para cada ponto da linha compara o turno em que a bola chega (chute com `kick_speed`
+    desacelerando BALL_DECELERATION por turno) com o tempo que cada adversário leva até lá.
+
+    A linha só é disputada até o primeiro ponto em que o companheiro de número `numbers[i]` chega antes
+    da bola: ali ele a domina, e o resto da linha não importa. Se ele não chega antes em nenhum ponto,
+    a disputa é no alvo, e o adversário precisa chegar antes do último entre a bola e o companheiro.
+    Um número que não está em campo conta como um companheiro parado no alvo.
+    """
+    numbers = np.asarray(numbers, dtype=int)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+    origin = context.ball_position
+
+    lanes = targets - origin
+    lengths = np.hypot(lanes[:, 0], lanes[:, 1])
+    fractions = np.arange(1, LANE_SAMPLES + 1) / LANE_SAMPLES
+
+    # Turno em que a bola passa por cada ponto (N, S)
+    kick = BallTrajectory(origin, np.array([100.0, 0.0]), kick_speed)
+    ball_turns = kick.turns_to_travel(lengths[:, np.newaxis] * fractions)
+
+    if len(context.opponents) == 0:
+        # Sem adversários, só perde a bola o passe que para antes do alvo
+        margin = np.where(np.isinf(ball_turns[:, -1]), -np.inf, np.inf)
+    else:
+        points = origin + lanes[:, np.newaxis, :] * fractions[np.newaxis, :, np.newaxis]
+        # Tempo de cada adversário até cada ponto (N, S, O), e do mais rápido (N, S)
+        delta = points[:, :, np.newaxis, :] - context.opponent_positions[np.newaxis, np.newaxis, :, :]
+        opponent_turns = (np.maximum(np.hypot(delta[..., 0], delta[..., 1]) - INTERCEPTION_REACH, 0) /
+                          lugo4py.specs.PLAYER_MAX_SPEED).min(axis=2)
+
+        # O recebedor domina a bola no primeiro ponto em que chega antes dela ou, se não chega, no alvo,
+        # onde a disputa é com o último a chegar (a bola ou ele)
+        receiver_turns = _receiver_turns(context, numbers, targets, points)
+        reached = receiver_turns <= ball_turns
+        last = np.where(reached.any(axis=1), reached.argmax(axis=1), LANE_SAMPLES - 1)
+        rows = np.arange(len(targets))
+        contest_turns = ball_turns.copy()
+        contest_turns[rows, last] = np.maximum(ball_turns[rows, last], receiver_turns[rows, last])
+        # Pontos que a bola não alcança antes de parar têm folga -inf; os depois do domínio não contam
+        margins = np.where(np.arange(LANE_SAMPLES) <= last[:, np.newaxis], opponent_turns - contest_turns, np.inf)
+        margin = margins.min(axis=1)
+
+    risk = 1 / (1 + np.exp(np.clip(margin, -50, 50) / RISK_SCALE_TURNS))
+
+    order = np.argsort(-targets[:, 0] * side_factor, kind='stable')
+    return PassOptions(numbers[order], targets[order], ball_turns[order, -1], margin[order], risk[order])
+
+
+def _receiver_turns(context: TurnContext, numbers: np.ndarray, targets: np.ndarray,
+                    points: np.ndarray) -> np.ndarray:
+    """
+    Turnos (N, S) que o recebedor de cada passe leva até cada ponto da linha.
+    """
+    rows = [context.ally_index(int(number)) for number in numbers]
+    receivers = np.array([context.ally_positions[row] if row is not None else target
+                          for row, target in zip(rows, targets)]).reshape(-1, 2)
+    delta = points - receivers[:, np.newaxis, :]
+    return np.maximum(np.hypot(delta[..., 0], delta[..., 1]) - INTERCEPTION_REACH, 0) / lugo4py.specs.PLAYER_MAX_SPEED
+
+
+def best_pass(options: PassOptions, max_risk: float) -> Optional[lugo4py.Point]:
+    """
+    Alvo mais avançado cujo risco de interceptação não passa de `max_risk`, ou None.
+    """
+    safe = np.flatnonzero(options.risk <= max_risk)
+    if len(safe) == 0:
+        return None
+    x, y = options.targets[safe[0]]
+    return lugo4py.Point(x=float(x), y=float(y))
@@ -0,0 +1,247 @@
+import atexit
+import cProfile
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import HANDLERS, budget_from_env
+
+# Intervalo entre amostras das pilhas (us). O intervalo de troca do GIL é reduzido para o mesmo valor,
+# senão a thread de amostragem só ganharia o GIL a cada 5ms, depois do fim da maioria dos turnos
+DEFAULT_INTERVAL_US = 250
+# Turnos gravados por bot; depois disso, os turnos lentos só aparecem no relatório de latência
+DEFAULT_MAX_TURNS = 200
+
+# Pedidos de "perfilar o próximo turno" (SIGUSR1), contados para que cada bot do processo atenda o seu
+_next_turn_requests = 0
+
+
+class _Sampler:
+    """
+    Uma thread por processo que, enquanto algum handler perfilado está rodando, lê a pilha da thread
+    de cada um (sys._current_frames) a cada `interval`. Entre os turnos, e com o jogo pausado em um
+    breakpoint, ela fica parada em um Event, sem gastar CPU.
+    """
+
+    _instance: Optional['_Sampler'] = None
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, '_TurnSamples'] = {}
+        self._wake = threading.Event()
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+        threading.Thread(target=self._loop, name='profiler-sampler', daemon=True).start()
+
+    @classmethod
+    def shared(cls, interval: float) -> '_Sampler':
+        if cls._instance is None:
+            cls._instance = cls(interval)
+        return cls._instance
+
+    def start(self, samples: '_TurnSamples'):
+        self._active[samples.thread_id] = samples
+        self._wake.set()
+
+    def stop(self, samples: '_TurnSamples'):
+        self._active.pop(samples.thread_id, None)
+
+    def _loop(self):
+        perf_counter_ns = time.perf_counter_ns
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while self._active:
+                time.sleep(self.interval)
+                now = perf_counter_ns()
+                frames = sys._current_frames()
+                for thread_id, samples in list(self._active.items()):
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples.add(frame, now)
+
+
+class _TurnSamples:
+    """
+    Pilhas amostradas de um turno: cada pilha (tupla de code objects, da raiz ao topo, a partir do
+    handler) com o tempo (ns) desde a amostra anterior.
+    """
+
+    def __init__(self, root):
+        self.thread_id = threading.get_ident()
+        self.root = root
+        self.stacks: Counter = Counter()
+        self.last = time.perf_counter_ns()
+        self.profile: Optional[cProfile.Profile] = None
+
+    def add(self, frame, now: int):
+        stack = []
+        while frame is not None and frame.f_code is not self.root:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        if frame is None:
+            # A thread ainda não entrou (ou já saiu) do handler
+            return
+        self.stacks[tuple(reversed(stack))] += now - self.last
+        self.last = now
+
+
+class TurnProfiler:
+    """
+    Perfilador de um bot, indexado pelo turno. Os turnos de `turns` (intervalos inclusivos) rodam com
+    o cProfile; todos os turnos têm as pilhas amostradas, e as de um turno só são gravadas se ele foi
+    perfilado ou passou de `slow_ms`. Assim dá para descobrir o que deixou um turno específico lento
+    sem perfilar a partida inteira.
+
+    Cada turno gravado vira, em `directory`, `t<turno>_<handler>.folded` (pilhas no formato
+    "collapsed" do flamegraph.pl/speedscope, em microssegundos) e, com o cProfile, `.pstats`. Uma
+    thread grava os arquivos logo depois do turno, então com o jogo pausado em um breakpoint
+    (servidor com --dev-mode) o turno que acabou de rodar já está no disco. SIGUSR1 pede que o
+    próximo turno de cada bot perfilado rode com o cProfile.
+    """
+
+    def __init__(self, directory: str, turns: List[Tuple[int, int]] = (), slow_ms: Optional[float] = None,
+                 interval_us: float = DEFAULT_INTERVAL_US, max_turns: int = DEFAULT_MAX_TURNS):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.turns = list(turns)
+        self.slow_us = None if slow_ms is None else slow_ms * 1000
+        self.max_turns = max_turns
+        self.saved = 0
+        self.skipped = 0
+        self._sampler = _Sampler.shared(interval_us / 1e6)
+        self._seen_requests = _next_turn_requests
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name=f'profiler-{os.path.basename(directory)}',
+                                        daemon=True)
+        self._writer.start()
+
+    def wants(self, turn: int) -> bool:
+        """
+        Se o turno roda com o cProfile: está em `turns` ou houve um SIGUSR1 desde o último turno.
+        """
+        if self._seen_requests != _next_turn_requests:
+            self._seen_requests = _next_turn_requests
+            return True
+        return any(first <= turn <= last for first, last in self.turns)
+
+    def begin(self, root, deterministic: bool) -> _TurnSamples:
+        samples = _TurnSamples(root)
+        if deterministic:
+            samples.profile = cProfile.Profile()
+            samples.profile.enable()
+        self._sampler.start(samples)
+        return samples
+
+    def end(self, samples: _TurnSamples, turn: int, handler: str, elapsed_us: float):
+        self._sampler.stop(samples)
+        if samples.profile is not None:
+            samples.profile.disable()
+        elif self.slow_us is None or elapsed_us <= self.slow_us:
+            return
+        if self.saved >= self.max_turns:
+            self.skipped += 1
+            return
+        self.saved += 1
+        self._queue.put((turn, handler, elapsed_us, samples))
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if self.skipped:
+            print(f'profiler: {self.skipped} turns not saved (PROFILE_MAX_TURNS) in {self.directory}')
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            turn, handler, elapsed_us, samples = item
+            path = os.path.join(self.directory, f't{turn:06d}_{handler}')
+            with open(path + '.folded', 'w') as folded_file:
+                for stack, elapsed_ns in sorted(samples.stacks.items(), key=lambda item: -item[1]):
+                    frames = ';'.join([handler] + [_frame_name(code) for code in stack])
+                    folded_file.write(f'{frames} {max(round(elapsed_ns / 1000), 1)}\n')
+            if samples.profile is not None:
+                samples.profile.dump_stats(path + '.pstats')
+            with open(os.path.join(self.directory, 'turns.log'), 'a') as log_file:
+                reason = 'profiled' if samples.profile is not None else 'slow'
+                log_file.write(f'{turn} {handler} {elapsed_us / 1000:.3f}ms {reason}\n')
+
+
+def parse_turns(value: str) -> List[Tuple[int, int]]:
+    """
+    "100-120,300" -> [(100, 120), (300, 300)].
+    """
+    turns = []
+    for part in filter(None, (part.strip() for part in value.split(','))):
+        first, _, last = part.partition('-')
+        turns.append((int(first), int(last or first)))
+    return turns
+
+
+def profile_bot(bot, profiler: TurnProfiler, handlers: List[str] = None):
+    """
+    Faz os handlers do bot passarem pelo perfilador. As pilhas começam no handler (abaixo do wrapper).
+    """
+    for name in HANDLERS if handlers is None else handlers:
+        setattr(bot, name, _profiled(name, getattr(bot, name), profiler))
+    return bot
+
+
+def profiler_from_env(side, number: int) -> Optional[TurnProfiler]:
+    """
+    Cria o perfilador do bot se o seu número está em PROFILE_BOTS ("7,10" ou "all"; vazio desliga).
+    PROFILE_TURNS ("100-120,300") escolhe os turnos do cProfile; PROFILE_SLOW_MS (padrão: o orçamento
+    do turno, veja instrumentation.py) grava as pilhas de qualquer turno mais lento. Os arquivos vão
+    para PROFILE_DIR/<lado>_<número> (padrão reports/profiles).
+    """
+    bots = os.environ.get('PROFILE_BOTS', '').strip()
+    if not bots or (bots != 'all' and number not in {int(n) for n in bots.split(',')}):
+        return None
+
+    side_name = 'home' if side == 0 else 'away'
+    slow_ms = os.environ.get('PROFILE_SLOW_MS')
+    profiler = TurnProfiler(
+        os.path.join(os.environ.get('PROFILE_DIR', os.path.join('reports', 'profiles')), f'{side_name}_{number:02d}'),
+        parse_turns(os.environ.get('PROFILE_TURNS', '')),
+        float(slow_ms) if slow_ms else budget_from_env(),
+        float(os.environ.get('PROFILE_INTERVAL_US', DEFAULT_INTERVAL_US)),
+        int(os.environ.get('PROFILE_MAX_TURNS', DEFAULT_MAX_TURNS)))
+    atexit.register(profiler.close)
+    if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, _request_next_turn)
+    return profiler
+
+
+def _request_next_turn(*_):
+    global _next_turn_requests
+    _next_turn_requests += 1
+
+
+def _frame_name(code) -> str:
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _profiled(name: str, handler, profiler: TurnProfiler):
+    perf_counter_ns = time.perf_counter_ns
+    # As pilhas amostradas são cortadas no frame do handler: o que está abaixo dele (gRPC, pool de threads) não interessa
+    root = getattr(handler, '__func__', handler).__code__
+
+    @wraps(handler)
+    def profiled(inspector, *args):
+        turn = inspector.get_turn()
+        samples = profiler.begin(root, profiler.wants(turn))
+        start = perf_counter_ns()
+        try:
+            return handler(inspector, *args)
+        finally:
+            profiler.end(samples, turn, name, (perf_counter_ns() - start) / 1000)
+
+    return profiled
@@ -0,0 +1,73 @@
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+from telemetry import TelemetryRecord, read_records
+
+
+def summarize(records: List[TelemetryRecord]) -> dict:
+    """
+    Turnos, tempo médio e máximo e turnos acima do orçamento por (handler, jogada), e quantas vezes
+    cada erro aconteceu.
+    """
+    branches: Dict[Tuple[str, str], dict] = {}
+    errors: Dict[str, int] = {}
+    for record in records:
+        key = (record.handler, record.branch)
+        stats = branches.get(key)
+        if stats is None:
+            stats = branches[key] = {'turns': 0, 'total_us': 0.0, 'max_us': 0.0, 'over_budget': 0}
+        stats['turns'] += 1
+        stats['over_budget'] += record.over_budget
+        stats['total_us'] += record.elapsed_us
+        stats['max_us'] = max(stats['max_us'], record.elapsed_us)
+        if record.failed:
+            errors[record.error] = errors.get(record.error, 0) + 1
+    return {'turns': len(records), 'branches': branches, 'errors': errors}
+
+
+def format_record(record: TelemetryRecord) -> str:
+    line = f'turn {record.turn:5d} {"home" if record.side == 0 else "away"} #{record.number:<2d} ' \
+           f'{record.handler:<14s} {record.branch:<20s} {record.elapsed_us / 1000:8.3f}ms'
+    if record.over_budget:
+        line += '  SLOW'
+    if record.failed:
+        line += f'  FAILED {record.error}'
+    return line
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Decodes the telemetry files written by the bots (TELEMETRY_DIR).')
+    parser.add_argument('files', nargs='+', help='telemetry_<side>_<number>.bin files')
+    parser.add_argument('--list', action='store_true', help='prints every turn instead of the summary')
+    parser.add_argument('--errors', action='store_true', help='prints only the turns that failed')
+    parser.add_argument('--turns', help='turn range, e.g. "100-200"')
+    args = parser.parse_args(argv)
+
+    first, last = 0, sys.maxsize
+    if args.turns:
+        first, _, last = args.turns.partition('-')
+        first, last = int(first), int(last) if last else int(first)
+
+    records = [record for path in args.files for record in read_records(path) if first <= record.turn <= last]
+    if args.list or args.errors:
+        for record in sorted(records, key=lambda r: (r.turn, r.side, r.number)):
+            if record.failed or not args.errors:
+                print(format_record(record))
+        return 0
+
+    summary = summarize(records)
+    print(f"{summary['turns']} turns")
+    for (handler, branch), stats in sorted(summary['branches'].items()):
+        print(f"  {handler:<14s} {branch:<20s} {stats['turns']:6d} turns  "
+              f"mean {stats['total_us'] / stats['turns'] / 1000:.3f}ms  max {stats['max_us'] / 1000:.3f}ms  "
+              f"over budget {stats['over_budget']}")
+    if summary['errors']:
+        print(f"{sum(summary['errors'].values())} failed turns:")
+        for error, count in sorted(summary['errors'].items(), key=lambda item: -item[1]):
+            print(f'  {count:6d}  {error}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
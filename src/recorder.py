@@ -0,0 +1,126 @@
+import atexit
+import gzip
+import os
+from functools import wraps
+from typing import BinaryIO, Iterator, Optional
+
+from lugo4py.protos import server_pb2
+
+
+class SnapshotWriter:
+    """
+    Grava GameSnapshots serializados em protobuf, cada um precedido do seu tamanho (varint),
+    o mesmo formato "length-delimited" usado pelas bibliotecas de protobuf.
+    Arquivos terminados em `.gz` são comprimidos com gzip.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file: BinaryIO = _open(path, 'wb')
+
+    def write(self, snapshot: server_pb2.GameSnapshot):
+        data = snapshot.SerializeToString()
+        self._file.write(_encode_varint(len(data)))
+        self._file.write(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_snapshots(path: str) -> Iterator[server_pb2.GameSnapshot]:
+    """
+    Lê, em ordem, os snapshots gravados por um SnapshotWriter.
+    """
+    with _open(path, 'rb') as snapshot_file:
+        while True:
+            size = _read_varint(snapshot_file)
+            if size is None:
+                return
+            data = snapshot_file.read(size)
+            if len(data) < size:
+                raise EOFError(f'truncated snapshot in {path}')
+            snapshot = server_pb2.GameSnapshot()
+            snapshot.ParseFromString(data)
+            yield snapshot
+
+
+def record_bot(bot, writer: SnapshotWriter):
+    """
+    Faz o bot gravar cada snapshot recebido (turnos e getting_ready) antes de tratá-lo.
+    """
+    for name in ('on_disputing', 'on_defending', 'on_holding', 'on_supporting', 'as_goalkeeper'):
+        setattr(bot, name, _recording(getattr(bot, name), writer, lambda inspector, *_: inspector.get_snapshot()))
+    bot.getting_ready = _recording(bot.getting_ready, writer, lambda snapshot, *_: snapshot)
+    return bot
+
+
+def writer_from_env(side, number: int) -> Optional[SnapshotWriter]:
+    """
+    Cria o gravador configurado por SNAPSHOT_RECORD_DIR (desligado se vazio). SNAPSHOT_RECORD_BOTS
+    limita quais números gravam (ex.: "1,7"); por padrão todos gravam.
+    """
+    record_dir = os.environ.get('SNAPSHOT_RECORD_DIR', '')
+    if not record_dir:
+        return None
+
+    bots = os.environ.get('SNAPSHOT_RECORD_BOTS', '')
+    if bots and number not in {int(n) for n in bots.split(',') if n.strip()}:
+        return None
+
+    side_name = 'home' if side == 0 else 'away'
+    writer = SnapshotWriter(os.path.join(record_dir, f'snapshots_{side_name}_{number:02d}.bin.gz'))
+    atexit.register(writer.close)
+    return writer
+
+
+def _recording(func, writer: SnapshotWriter, get_snapshot):
+    @wraps(func)
+    def recorded(*args, **kwargs):
+        writer.write(get_snapshot(*args))
+        return func(*args, **kwargs)
+
+    return recorded
+
+
+def _open(path: str, mode: str) -> BinaryIO:
+    if path.endswith('.gz'):
+        # Compressão leve: gravar não pode pesar no turno
+        return gzip.open(path, mode, compresslevel=1) if 'w' in mode else gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _read_varint(snapshot_file: BinaryIO) -> Optional[int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = snapshot_file.read(1)
+        if not byte:
+            if shift == 0:
+                return None
+            raise EOFError('truncated varint')
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
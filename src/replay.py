@@ -0,0 +1,173 @@
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from google.protobuf import json_format
+
+import lugo4py
+from lugo4py.src.define_state import define_state
+from my_bot import MyBot
+from recorder import read_snapshots
+from settings import MAPPER_COLS, MAPPER_ROWS, get_initial_position
+from speculation import speculate_bot, speculator_from_env
+
+HANDLER_BY_STATE = {
+    lugo4py.PLAYER_STATE.DISPUTING_THE_BALL: 'on_disputing',
+    lugo4py.PLAYER_STATE.DEFENDING: 'on_defending',
+    lugo4py.PLAYER_STATE.SUPPORTING: 'on_supporting',
+    lugo4py.PLAYER_STATE.HOLDING_THE_BALL: 'on_holding',
+}
+
+
+def new_bot(side: lugo4py.TeamSide, number: int) -> MyBot:
+    """
+    Cria um MyBot configurado como em main.py, sem conexão com o servidor.
+    """
+    bot = MyBot(side, number, get_initial_position(side, number), lugo4py.Mapper(MAPPER_COLS, MAPPER_ROWS, side))
+    speculator = speculator_from_env(bot)
+    if speculator:
+        speculate_bot(bot, speculator)
+    return bot
+
+
+def dispatch_turn(bot: lugo4py.Bot, inspector: lugo4py.GameSnapshotInspector) -> Tuple[str, List[lugo4py.Order]]:
+    """
+    Chama o handler do bot para o estado do jogador, como faz o cliente do lugo4py.
+    Retorna o nome do handler chamado e as ordens produzidas.
+    """
+    state = define_state(inspector, bot.number, bot.side)
+    if bot.number == lugo4py.specs.GOALKEEPER_NUMBER:
+        return 'as_goalkeeper', bot.as_goalkeeper(inspector, state)
+
+    handler = HANDLER_BY_STATE[state]
+    return handler, getattr(bot, handler)(inspector)
+
+
+def replay(path: str, players: List[Tuple[int, int]], orders_path: Optional[str] = None) -> dict:
+    """
+    Passa os snapshots gravados em `path` pelos handlers dos bots (lado, número) e mede o throughput.
+    """
+    bots = {(side, number): new_bot(side, number) for side, number in players}
+    handler_counts: Dict[str, int] = {}
+    decisions = []
+    turns = 0
+    elapsed = 0.0
+
+    for snapshot in read_snapshots(path):
+        if snapshot.state == lugo4py.State.GET_READY:
+            for bot in bots.values():
+                bot.getting_ready(snapshot)
+            continue
+        if snapshot.state != lugo4py.State.LISTENING:
+            continue
+
+        for (side, number), bot in bots.items():
+            try:
+                inspector = lugo4py.GameSnapshotInspector(side, number, snapshot)
+            except ValueError:
+                continue  # jogador fora da partida neste turno
+
+            # O goleiro usa random: a semente por turno deixa o replay determinístico
+            random.seed(snapshot.turn)
+            start = time.perf_counter()
+            handler, orders = dispatch_turn(bot, inspector)
+            elapsed += time.perf_counter() - start
+            if getattr(bot, 'speculator', None):
+                # Fora do tempo medido: em partida, a especulação roda enquanto o bot espera o próximo snapshot
+                bot.speculator.wait()
+
+            turns += 1
+            handler_counts[handler] = handler_counts.get(handler, 0) + 1
+            if orders_path:
+                decisions.append({
+                    'turn': snapshot.turn,
+                    'side': int(side),
+                    'number': number,
+                    'handler': handler,
+                    'orders': [json_format.MessageToDict(order) for order in orders or []],
+                })
+
+    if orders_path:
+        with open(orders_path, 'w') as orders_file:
+            for decision in decisions:
+                orders_file.write(json.dumps(decision, sort_keys=True) + '\n')
+
+    frame_cache = {}
+    for bot in bots.values():
+        for status, count in bot.frame_cache.stats()['totals'].items():
+            frame_cache[status] = frame_cache.get(status, 0) + count
+    speculation = {}
+    for bot in bots.values():
+        if getattr(bot, 'speculator', None):
+            for status, count in bot.speculator.stats()['totals'].items():
+                speculation[status] = speculation.get(status, 0) + count
+
+    return {
+        'turns': turns,
+        'seconds': elapsed,
+        'turns_per_second': turns / elapsed if elapsed else 0.0,
+        'handlers': handler_counts,
+        'frame_cache': frame_cache,
+        'speculation': speculation,
+    }
+
+
+def compare_orders(baseline_path: str, current_path: str) -> List[Tuple[dict, dict]]:
+    """
+    Lista as decisões que mudaram entre dois arquivos gerados com --orders.
+    """
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline = [json.loads(line) for line in baseline_file]
+        current = [json.loads(line) for line in current_file]
+
+    changed = [(a, b) for a, b in zip(baseline, current) if a != b]
+    if len(baseline) != len(current):
+        changed.append(({'decisions': len(baseline)}, {'decisions': len(current)}))
+    return changed
+
+
+def parse_players(side_arg: str, numbers_arg: str) -> List[Tuple[int, int]]:
+    sides = [lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY] if side_arg == 'both' else \
+        [lugo4py.TeamSide.HOME if side_arg == 'home' else lugo4py.TeamSide.AWAY]
+    numbers = range(1, lugo4py.specs.MAX_PLAYERS + 1) if numbers_arg == 'all' else \
+        [int(n) for n in numbers_arg.split(',')]
+    return [(side, number) for side in sides for number in numbers]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Replays recorded snapshots through the MyBot handlers.')
+    parser.add_argument('recording', help='file written by SnapshotWriter (SNAPSHOT_RECORD_DIR)')
+    parser.add_argument('--side', choices=['home', 'away', 'both'], default='home')
+    parser.add_argument('--number', default='all', help='player numbers, e.g. "7" or "2,3,4" or "all"')
+    parser.add_argument('--orders', help='writes every decision as JSON lines to this file')
+    parser.add_argument('--compare', help='orders file of a previous run; fails if any decision changed')
+    args = parser.parse_args(argv)
+
+    if args.compare and not args.orders:
+        parser.error('--compare needs --orders')
+
+    result = replay(args.recording, parse_players(args.side, args.number), args.orders)
+    print(f"{result['turns']} turns in {result['seconds']:.3f}s "
+          f"({result['turns_per_second']:.0f} turns/s)")
+    for handler, count in sorted(result['handlers'].items()):
+        print(f'  {handler}: {count}')
+    print('frame cache: ' + ', '.join(f'{status} {count}' for status, count in result['frame_cache'].items()))
+    if result['speculation']:
+        print('speculation: ' + ', '.join(f'{status} {count}' for status, count in result['speculation'].items()))
+
+    if args.compare:
+        changed = compare_orders(args.compare, args.orders)
+        if changed:
+            print(f'{len(changed)} decisions changed, first one:')
+            print(f'  before: {changed[0][0]}')
+            print(f'  after:  {changed[0][1]}')
+            return 1
+        print('no decision changed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import math
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Papéis do turno. SLOT é a jogada padrão do handler (posição tática ou linha de defesa); os demais
+# são as vagas que os handlers preenchiam ordenando o time pela distância até a bola ou o portador
+SLOT = 0
+CHASE = 1
+PRESS = 2
+APPROACH = 3
+SUPPORT = 4
+
+# Custo de uma combinação proibida (jogador fora dos candidatos de um papel, ou o lugar de outro
+# jogador). Finito: o algoritmo soma e subtrai custos e infinito quebraria os potenciais
+FORBIDDEN = 1e9
+# Desempate: com custos iguais, fica com a vaga o jogador de número menor (como na ordenação estável)
+TIE_BREAK = 1e-6
+
+
+def min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Atribuição de custo mínimo (algoritmo húngaro com potenciais, O(n² m)) de uma matriz (n, m) com
+    n <= m: a coluna de cada linha, (n,). Para as matrizes do time (até 4 x 10), laços em listas
+    do Python são mais rápidos que operações do numpy em arrays desse tamanho.
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError(f'cannot assign {n} rows to {m} columns')
+    rows = cost.tolist()
+    # Índices a partir de 1: a linha e a coluna 0 são a raiz de cada caminho aumentante
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    row_of = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        column = 0
+        min_slack = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[column] = True
+            row = row_of[column]
+            row_costs = rows[row - 1]
+            row_u = u[row]
+            delta = math.inf
+            next_column = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    slack = row_costs[j - 1] - row_u - v[j]
+                    if slack < min_slack[j]:
+                        min_slack[j] = slack
+                        way[j] = column
+                    if min_slack[j] < delta:
+                        delta = min_slack[j]
+                        next_column = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[row_of[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            column = next_column
+            if row_of[column] == 0:
+                break
+        # Inverte o caminho aumentante até a raiz
+        while column:
+            previous = way[column]
+            row_of[column] = row_of[previous]
+            column = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    for j in range(1, m + 1):
+        if row_of[j]:
+            assignment[row_of[j] - 1] = j - 1
+    return assignment
+
+
+def assign_roles(slot_costs: np.ndarray, roles: Sequence[Tuple[int, int, np.ndarray]]) -> np.ndarray:
+    """
+    Distribui N jogadores (em ordem de número) entre as vagas dos papéis pelo menor tempo total.
+    Cada papel é (código, vagas, custos (N,)), com FORBIDDEN para quem não é candidato; quem não
+    fica com uma vaga fica no seu lugar, que custa `slot_costs` (N,). Retorna o papel de cada jogador (N,).
+
+    Todas as vagas são preenchidas (se houver candidatos), então o custo de um jogador assumir um
+    papel é o tempo até o papel menos o tempo até o seu lugar: a matriz é (vagas, N), e o time manda
+    os jogadores que menos deixam a formação.
+    """
+    n = len(slot_costs)
+    tie_break = TIE_BREAK * np.arange(n)
+    rows, codes = [], []
+    for code, count, costs in roles:
+        count = min(count, int(np.count_nonzero(costs < FORBIDDEN)), n - len(rows))
+        row = np.where(costs < FORBIDDEN, costs + tie_break - slot_costs, FORBIDDEN)
+        rows.extend([row] * count)
+        codes.extend([code] * count)
+
+    result = np.full(n, SLOT, dtype=np.int64)
+    if not rows:
+        return result
+    cost = np.array(rows)
+    players = min_cost_assignment(cost)
+    # Papéis com os mesmos candidatos e mais vagas que eles: a vaga que sobraria para quem não é candidato fica vazia
+    allowed = cost[np.arange(len(rows)), players] < FORBIDDEN
+    result[players[allowed]] = np.array(codes)[allowed]
+    return result
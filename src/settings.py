@@ -1,8 +1,19 @@
+import os
+from typing import Optional
+
+import numpy as np
+
 import lugo4py
 import lugo4py.mapper as mapper
+from lugo4py.protos import physics_pb2
+
+from disk_cache import cache_key, load_or_build_array
+from field_grid import FieldGrid, get_field_grid
+from strategy import DEFAULT_PATH, DEFAULT_POLL_INTERVAL, Strategy, StrategyWatcher
 
 # MAPPER_COLS and MAPPER_ROWS define the number of regions on the field.
-# great values leads to more precision
+# great values leads to more precision. The regions are precomputed in a FieldGrid (field_grid.py),
+# so a finer grid (e.g. 40x24) costs nothing per turn
 # Use this tool to help you to decide about it https://github.com/mauriciorobertodev/strategy-creator-lugo-bots
 MAPPER_COLS = 10
 MAPPER_ROWS = 6
@@ -22,58 +33,134 @@ PLAYER_INITIAL_POSITIONS = {
     11: {'Col': 4, 'Row': 2},
 }
 
-def get_my_expected_position(inspector: lugo4py.GameSnapshotInspector, my_mapper: mapper.Mapper, number: int):
-    mapper_cols = MAPPER_COLS
-
-    player_tactic_positions = {
-        'DEFENSIVE': {
-            2: {'Col': 1, 'Row': 1},
-            3: {'Col': 2, 'Row': 2},
-            4: {'Col': 2, 'Row': 3},
-            5: {'Col': 1, 'Row': 4},
-            6: {'Col': 3, 'Row': 1},
-            7: {'Col': 3, 'Row': 2},
-            8: {'Col': 3, 'Row': 3},
-            9: {'Col': 3, 'Row': 4},
-            10: {'Col': 4, 'Row': 3},
-            11: {'Col': 4, 'Row': 2},
-        },
-        'NORMAL': {
-            2: {'Col': 2, 'Row': 1},
-            3: {'Col': 4, 'Row': 2},
-            4: {'Col': 4, 'Row': 3},
-            5: {'Col': 2, 'Row': 4},
-            6: {'Col': 6, 'Row': 1},
-            7: {'Col': 8, 'Row': 2},
-            8: {'Col': 8, 'Row': 3},
-            9: {'Col': 6, 'Row': 4},
-            10: {'Col': 7, 'Row': 4},
-            11: {'Col': 7, 'Row': 1},
-        },
-        'OFFENSIVE': { # tatica de ofensiva mudada
-            2: {'Col': 4, 'Row': 1},   
-            3: {'Col': 6, 'Row': 2},  
-            4: {'Col': 6, 'Row': 3},   
-            5: {'Col': 4, 'Row': 4},   
-            6: {'Col': 7, 'Row': 0},   
-            7: {'Col': 8, 'Row': 2},   
-            8: {'Col': 8, 'Row': 3},   
-            9: {'Col': 7, 'Row': 5},  
-            10: {'Col': 9, 'Row': 3},  
-            11: {'Col': 9, 'Row': 2}, 
-        }
-    }
-
-    ball_region = my_mapper.get_region_from_point(inspector.get_ball().position)
-    field_third = mapper_cols / 3
-    ball_cols = ball_region.get_col()
-
-    team_state = "OFFENSIVE"
-    if ball_cols < field_third:
-        team_state = "DEFENSIVE"
-    elif ball_cols < field_third * 2:
-        team_state = "NORMAL"
-
-    expected_region = my_mapper.get_region(player_tactic_positions[team_state][number]['Col'],
-                                           player_tactic_positions[team_state][number]['Row'])
-    return expected_region.get_center()
\ No newline at end of file
+# The tactic tables (TACTIC_POSITIONS/TACTIC_STATES), the defenders and the thresholds used by MyBot
+# live in the strategy file (src/strategy.json, or STRATEGY_FILE), which is reloaded while the bots
+# are running: see strategy.py. The initial positions stay here, since they are sent when the bot joins.
+STRATEGY_POLL_INTERVAL = float(os.environ.get('STRATEGY_POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
+
+
+class TacticTable:
+    """
+    Tactic positions of a strategy compiled for a given number of mapper cols.
+    `points[side][number][ball_col]` holds the target point of each player, and `targets` holds
+    the same values as an array shaped (sides, players + 1, cols, 2), NaN where there is no target.
+    The compiled array (`compiled`, with the initial positions as an extra col) is saved in the
+    disk cache, so restarts skip the compilation.
+    """
+
+    def __init__(self, cols: int, strategy: Strategy, initial_positions: dict = None, compiled: np.ndarray = None):
+        self.cols = cols
+        self.state_names = [name for name, _ in strategy.tactic_states]
+        self.col_states = [_state_for_col(col, cols, strategy.tactic_states) for col in range(cols)]
+        if compiled is None:
+            compiled = self._compile(strategy,
+                                     PLAYER_INITIAL_POSITIONS if initial_positions is None else initial_positions)
+        self.compiled = compiled
+        self.targets = compiled[:, :, :cols]
+
+        players = range(lugo4py.specs.MAX_PLAYERS + 1)
+        self.points = [
+            [[_point(compiled[side, number, col]) for col in range(cols)] if number else [] for number in players]
+            for side in (lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY)
+        ]
+        self.initial_points = [
+            [_point(compiled[side, number, cols]) for number in players]
+            for side in (lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY)
+        ]
+
+    def _compile(self, strategy: Strategy, initial_positions: dict) -> np.ndarray:
+        compiled = np.full((2, lugo4py.specs.MAX_PLAYERS + 1, self.cols + 1, 2), np.nan)
+
+        for side in (lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY):
+            centers = get_field_grid(strategy.tactic_cols, strategy.tactic_rows, side).centers
+
+            for number, position in initial_positions.items():
+                compiled[side, number, self.cols] = centers[position['Col'], position['Row']]
+
+            for number in range(1, lugo4py.specs.MAX_PLAYERS + 1):
+                for col in range(self.cols):
+                    # The goalkeeper (and anyone missing from a tactic) stays at the initial position
+                    position = strategy.tactic_positions[self.state_names[self.col_states[col]]].get(number)
+                    if position is None:
+                        compiled[side, number, col] = compiled[side, number, self.cols]
+                    else:
+                        compiled[side, number, col] = centers[position['Col'], position['Row']]
+
+        return compiled
+
+
+def _point(xy: np.ndarray) -> Optional[physics_pb2.Point]:
+    if np.isnan(xy[0]):
+        return None
+    return physics_pb2.Point(x=int(xy[0]), y=int(xy[1]))
+
+
+def _state_for_col(col: int, cols: int, states: list) -> int:
+    for index, (_, bound) in enumerate(states):
+        if col < bound * cols:
+            return index
+    return len(states) - 1
+
+
+def settings_key(cols: int, strategy: Strategy) -> str:
+    """
+    Hash of the settings the tactic table is compiled from, used as its disk cache key.
+    """
+    return cache_key('tactic_table', cols, strategy.tactic_cols, strategy.tactic_rows, strategy.tactic_positions,
+                     strategy.tactic_states, PLAYER_INITIAL_POSITIONS)
+
+
+def load_tactic_table(cols: int, strategy: Strategy) -> TacticTable:
+    compiled = load_or_build_array('tactic_table', settings_key(cols, strategy),
+                                   lambda: TacticTable(cols, strategy).compiled)
+    return TacticTable(cols, strategy, compiled=compiled)
+
+
+# Started on the first use (see main.py), so the startup time of each step can be measured
+_STRATEGY_WATCHER = None
+
+
+def get_strategy_watcher() -> StrategyWatcher:
+    """
+    Watcher of the strategy file shared by every bot of the process. A new strategy is compiled
+    by its thread (the tactic table for MAPPER_COLS), so the swap costs nothing inside a turn.
+    """
+    global _STRATEGY_WATCHER
+    if _STRATEGY_WATCHER is None:
+        _STRATEGY_WATCHER = StrategyWatcher(os.environ.get('STRATEGY_FILE') or DEFAULT_PATH,
+                                            lambda strategy: get_tactic_table(MAPPER_COLS, strategy),
+                                            STRATEGY_POLL_INTERVAL).start()
+    return _STRATEGY_WATCHER
+
+
+def get_strategy(turn: int = None) -> Strategy:
+    """
+    Strategy in use, or the one for `turn` (a pending reload is swapped in on a new turn).
+    """
+    watcher = get_strategy_watcher()
+    return watcher.current if turn is None else watcher.for_turn(turn)
+
+
+def get_tactic_table(cols: int = MAPPER_COLS, strategy: Strategy = None) -> TacticTable:
+    strategy = get_strategy() if strategy is None else strategy
+    table = strategy.tables.get(cols)
+    if table is None:
+        table = strategy.tables[cols] = load_tactic_table(cols, strategy)
+    return table
+
+
+def get_initial_position(side: lugo4py.TeamSide, number: int):
+    return get_tactic_table().initial_points[side][number]
+
+
+def get_ball_col(inspector: lugo4py.GameSnapshotInspector, my_mapper: mapper.Mapper) -> int:
+    """
+    Same as my_mapper.get_region_from_point(ball).get_col(), without building lugo4py objects.
+    """
+    return FieldGrid.from_mapper(my_mapper).col_of(inspector.get_ball().position.x)
+
+
+def get_my_expected_position(inspector: lugo4py.GameSnapshotInspector, my_mapper: mapper.Mapper, number: int,
+                             strategy: Strategy = None):
+    # The returned point is shared by every call, do not change it
+    return get_tactic_table(my_mapper.cols, strategy).points[my_mapper.side][number][get_ball_col(inspector, my_mapper)]
@@ -0,0 +1,160 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+import lugo4py
+from ball_kinematics import BallTrajectory
+from disk_cache import cache_key, load_or_build_array
+
+# Grade do mapa: posição do chutador (x, y) e y do goleiro adversário. Os pontos da grade
+# ficam em múltiplos do passo, então espelhar o eixo x do mapa espelha exatamente o campo.
+SHOT_X_STEP = 200
+SHOT_Y_STEP = 200
+KEEPER_Y_STEP = 250
+# Pontos de mira distribuídos entre as traves (a uma bola de distância de cada uma)
+SHOT_AIMS = 9
+# Alcance lateral do goleiro parado (o mesmo usado antes em find_best_shot_target)
+KEEPER_REACH = lugo4py.PLAYER_SIZE * 1.5
+# O goleiro só vê o chute no snapshot do turno seguinte
+KEEPER_REACTION_TURNS = 1
+# Escala (em turnos) da conversão folga -> qualidade: qualidade = 1 / (1 + exp(-folga / escala))
+QUALITY_SCALE_TURNS = 1.0
+
+QUALITY, AIM = 0, 1
+
+_SHOT_MAP = None
+
+
+class ShotMap:
+    """
+    Qualidade do chute ao gol (0 a 255) e melhor ponto de mira para cada combinação da grade
+    (x do chutador, y do chutador, y do goleiro). O mapa é calculado para o time da casa,
+    que ataca o gol em x = MAX_X_COORDINATE; o time visitante usa a visão espelhada em x.
+    """
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+        self.views = {
+            lugo4py.TeamSide.HOME: table,
+            lugo4py.TeamSide.AWAY: table[:, ::-1],
+        }
+        self.aims = aim_points()
+
+    def lookup(self, side, shooter: lugo4py.Point, keeper_y: float) -> Tuple[float, lugo4py.Point]:
+        """
+        Qualidade (0 a 1) do chute de `shooter` com o goleiro em `keeper_y`, e o ponto de mira.
+        """
+        view = self.views[side]
+        ix = min(max(int(round(shooter.x / SHOT_X_STEP)), 0), view.shape[1] - 1)
+        iy = min(max(int(round(shooter.y / SHOT_Y_STEP)), 0), view.shape[2] - 1)
+        ik = min(max(int(round(keeper_y / KEEPER_Y_STEP)), 0), view.shape[3] - 1)
+
+        goal_x = lugo4py.specs.MAX_X_COORDINATE if side == lugo4py.TeamSide.HOME else 0
+        quality, aim = view[:, ix, iy, ik]
+        return quality / 255, lugo4py.Point(x=goal_x, y=round(self.aims[aim]))
+
+    def qualities(self, side, points: np.ndarray, keeper_y: float) -> np.ndarray:
+        """
+        Qualidade (0 a 1) do chute de cada ponto de um array (N, 2), com o goleiro em `keeper_y`.
+        """
+        view = self.views[side]
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        ix = np.clip(np.rint(points[:, 0] / SHOT_X_STEP).astype(int), 0, view.shape[1] - 1)
+        iy = np.clip(np.rint(points[:, 1] / SHOT_Y_STEP).astype(int), 0, view.shape[2] - 1)
+        ik = min(max(int(round(keeper_y / KEEPER_Y_STEP)), 0), view.shape[3] - 1)
+        return view[QUALITY, ix, iy, ik] / 255
+
+    def lookups(self, side, shooters: np.ndarray, keeper_ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `lookup` para N chutadores (N, 2), cada um com o seu goleiro em `keeper_ys` (N,):
+        qualidades (N,) e pontos de mira (N, 2).
+        """
+        view = self.views[side]
+        shooters = np.asarray(shooters, dtype=float).reshape(-1, 2)
+        ix = np.clip(np.rint(shooters[:, 0] / SHOT_X_STEP).astype(int), 0, view.shape[1] - 1)
+        iy = np.clip(np.rint(shooters[:, 1] / SHOT_Y_STEP).astype(int), 0, view.shape[2] - 1)
+        ik = np.clip(np.rint(np.asarray(keeper_ys, dtype=float) / KEEPER_Y_STEP).astype(int), 0, view.shape[3] - 1)
+
+        goal_x = lugo4py.specs.MAX_X_COORDINATE if side == lugo4py.TeamSide.HOME else 0
+        aims = np.empty((len(shooters), 2))
+        aims[:, 0] = goal_x
+        aims[:, 1] = np.round(self.aims[view[AIM, ix, iy, ik]])
+        return view[QUALITY, ix, iy, ik] / 255, aims
+
+
+def aim_points() -> np.ndarray:
+    return np.linspace(lugo4py.specs.GOAL_MIN_Y + lugo4py.BALL_SIZE, lugo4py.specs.GOAL_MAX_Y - lugo4py.BALL_SIZE,
+                       SHOT_AIMS)
+
+
+def keeper_turns(gaps: np.ndarray) -> np.ndarray:
+    """
+    Turnos que o goleiro leva para cobrir um deslocamento lateral: o tempo de reação, um pulo de
+    GOALKEEPER_JUMP_DURATION turnos a GOALKEEPER_JUMP_SPEED e, depois, PLAYER_MAX_SPEED.
+    """
+    gaps = np.maximum(gaps - KEEPER_REACH, 0)
+    jump_distance = lugo4py.specs.GOALKEEPER_JUMP_DURATION * lugo4py.specs.GOALKEEPER_JUMP_SPEED
+    return KEEPER_REACTION_TURNS + np.where(
+        gaps <= jump_distance,
+        gaps / lugo4py.specs.GOALKEEPER_JUMP_SPEED,
+        lugo4py.specs.GOALKEEPER_JUMP_DURATION + (gaps - jump_distance) / lugo4py.specs.PLAYER_MAX_SPEED)
+
+
+def build_shot_map(kick_speed: float = lugo4py.specs.BALL_MAX_SPEED) -> np.ndarray:
+    """
+    Calcula a tabela (2, NX, NY, NK) de uint8: [QUALITY] e [AIM] (índice em `aim_points`).
+    Para cada mira, a folga é o tempo do goleiro até a linha da bola menos o turno em que a bola
+    cruza a linha do gol; a melhor mira é a de maior folga.
+    """
+    xs = np.arange(0, lugo4py.specs.MAX_X_COORDINATE + 1, SHOT_X_STEP, dtype=float)
+    ys = np.arange(0, lugo4py.specs.MAX_Y_COORDINATE + 1, SHOT_Y_STEP, dtype=float)
+    keepers = np.arange(0, lugo4py.specs.MAX_Y_COORDINATE + 1, KEEPER_Y_STEP, dtype=float)
+    aims = aim_points()
+
+    # Turno em que a bola chega a cada mira (NX, NY, K)
+    distances = np.hypot(lugo4py.specs.MAX_X_COORDINATE - xs[:, np.newaxis, np.newaxis],
+                         aims[np.newaxis, np.newaxis, :] - ys[np.newaxis, :, np.newaxis])
+    kick = BallTrajectory(np.zeros(2), np.array([100.0, 0.0]), kick_speed)
+    ball_turns = kick.turns_to_travel(distances)
+
+    # Turnos do goleiro até cada mira (NK, K)
+    keeper = keeper_turns(np.abs(aims[np.newaxis, :] - keepers[:, np.newaxis]))
+
+    margin = keeper[np.newaxis, np.newaxis, :, :] - ball_turns[:, :, np.newaxis, :]
+    quality = 1 / (1 + np.exp(-np.clip(margin, -50, 50) / QUALITY_SCALE_TURNS))
+
+    table = np.empty((2, len(xs), len(ys), len(keepers)), dtype=np.uint8)
+    table[AIM] = quality.argmax(axis=3)
+    table[QUALITY] = np.round(quality.max(axis=3) * 255)
+    return table
+
+
+def shot_map_key() -> str:
+    """
+    Hash dos parâmetros do mapa: qualquer mudança neles gera um arquivo novo.
+    """
+    return cache_key(SHOT_X_STEP, SHOT_Y_STEP, KEEPER_Y_STEP, SHOT_AIMS, KEEPER_REACH, KEEPER_REACTION_TURNS,
+                     QUALITY_SCALE_TURNS, lugo4py.specs.BALL_MAX_SPEED, lugo4py.specs.BALL_DECELERATION,
+                     lugo4py.specs.GOALKEEPER_JUMP_SPEED, lugo4py.specs.GOALKEEPER_JUMP_DURATION,
+                     lugo4py.specs.PLAYER_MAX_SPEED, lugo4py.specs.GOAL_MIN_Y, lugo4py.specs.GOAL_MAX_Y,
+                     lugo4py.specs.MAX_X_COORDINATE, lugo4py.specs.MAX_Y_COORDINATE)
+
+
+def load_shot_map(path: Optional[str] = None) -> ShotMap:
+    """
+    Abre o mapa gravado em disco com memory-map, calculando e gravando-o na primeira vez
+    (no cache de disco, ou em `path`). Se não for possível gravar, o mapa fica só na memória.
+    """
+    if path is None:
+        return ShotMap(load_or_build_array('shot_map', shot_map_key(), build_shot_map, mmap=True))
+    if not os.path.exists(path):
+        np.save(path, build_shot_map())
+    return ShotMap(np.load(path, mmap_mode='r'))
+
+
+def get_shot_map() -> ShotMap:
+    global _SHOT_MAP
+    if _SHOT_MAP is None:
+        _SHOT_MAP = load_shot_map(os.environ.get('SHOT_MAP_PATH') or None)
+    return _SHOT_MAP
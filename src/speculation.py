@@ -0,0 +1,324 @@
+import copy
+import os
+import queue
+import threading
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import lugo4py
+from lugo4py.protos import server_pb2
+from ball_kinematics import BallTrajectory
+from frame_cache import FrameCache
+from instrumentation import HANDLERS
+from turn_context import get_turn_context
+
+# Helpers caros cujos resultados são antecipados para o próximo turno
+SPECULATED_HELPERS = ['search_action', 'find_support_position', 'find_dribble_position',
+                      'find_open_space_in_attack', 'find_best_pass']
+
+# Diferença máxima (em qualquer coordenada da bola ou de um jogador) entre o snapshot previsto
+# e o real para aproveitar os resultados antecipados
+DEFAULT_TOLERANCE = 100.0
+
+HIT, MISS = 'hit', 'miss'
+# Motivos para não usar (ou não fazer) a especulação de um turno
+NOT_READY, KICKED, DIFFERENT_TURN, DIFFERENT_STATE, MOVED = \
+    'not_ready', 'kicked', 'different_turn', 'different_state', 'moved'
+
+
+class _Job:
+    """
+    Especulação de um turno. O bot só monta o job e o entrega à thread: a previsão do snapshot e as
+    cópias do estado do bot são feitas lá, depois da resposta do turno.
+    """
+
+    def __init__(self, inspector: lugo4py.GameSnapshotInspector, handler: str, args: tuple, orders, calls):
+        self.inspector = inspector
+        self.handler = handler
+        self.args = args
+        self.orders = orders
+        self.calls = calls
+        self.expected_turn = inspector.get_turn() + 1
+        # O turno real chegou antes do fim: a thread para na próxima chamada (ou lote da ActionSearch)
+        self.stop = threading.Event()
+        # Cópias do estado do bot feitas (ou puladas): só depois disso o bot pode começar o próximo turno
+        self.copied = threading.Event()
+        self.done = threading.Event()
+        self.predicted: Optional[np.ndarray] = None
+        self.results: Dict[tuple, object] = {}
+        self.frame_cache: Optional[FrameCache] = None
+
+
+class Speculator:
+    """
+    Modo especulativo: logo depois de o bot responder um turno, uma thread prevê o próximo snapshot
+    (a bola pela desaceleração, o bot pela própria ordem, os outros jogadores parados) e repete nele as chamadas dos helpers caros feitas neste
+    turno, em uma cópia do bot. Quando o snapshot real chega, ele é comparado com o previsto e, se
+    nada se afastou mais que `tolerance`, os helpers devolvem os resultados antecipados.
+
+    A cópia do bot começa com os resultados do FrameCache do bot real e, quando a especulação é
+    aproveitada, o bot real fica com os resultados que ela guardou: assim, se a especulação do turno
+    seguinte falhar, as buscas ainda podem ser reaproveitadas ou refinadas.
+    """
+
+    def __init__(self, bot, tolerance: float = DEFAULT_TOLERANCE):
+        self.bot = bot
+        self.tolerance = tolerance
+        self.counters: Dict[str, int] = {HIT: 0, MISS: 0}
+        self.rejections: Dict[str, int] = {}
+
+        # Cópia do bot usada só pela thread: sem cache do time (não publica fatos de um turno previsto) e sem
+        # trocar a revisão da estratégia, o que adiantaria a troca em um turno para o bot real
+        self._shadow = type(bot)(bot.side, bot.number, bot.initPosition, bot.mapper)
+        self._shadow.team_cache = None
+        self._shadow.advances_strategy = False
+        if bot.action_search is not None and self._shadow.action_search is not None:
+            # O mesmo prazo do bot (dividido entre os bots do processo em team_main.py)
+            self._shadow.action_search.budget_ms = bot.action_search.budget_ms
+
+        self._calls: List[Tuple[str, tuple, dict]] = []
+        self._job: Optional[_Job] = None
+        self._results: Dict[tuple, object] = {}
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        threading.Thread(target=self._work, name=f'speculation-{bot.number}', daemon=True).start()
+
+    def wrap_handler(self, name: str, handler: Callable) -> Callable:
+        @wraps(handler)
+        def speculating(inspector, *args):
+            self._begin_turn(inspector, name, args)
+            orders = handler(inspector, *args)
+            self._speculate(inspector, name, args, orders)
+            return orders
+
+        return speculating
+
+    def wrap_helper(self, name: str, helper: Callable) -> Callable:
+        @wraps(helper)
+        def speculated(inspector, *args, **kwargs):
+            key = _call_key(name, args, kwargs)
+            self._calls.append((name, args, kwargs))
+            if key in self._results:
+                self.counters[HIT] += 1
+                return self._results[key]
+            self.counters[MISS] += 1
+            return helper(inspector, *args, **kwargs)
+
+        return speculated
+
+    def wait(self):
+        """
+        Espera a especulação em andamento, ex.: no replay, onde não há o tempo ocioso entre os turnos.
+        """
+        if self._job is not None:
+            self._job.done.wait()
+
+    def stats(self) -> dict:
+        lookups = self.counters[HIT] + self.counters[MISS]
+        return {
+            'tolerance': self.tolerance,
+            'hit_rate': round(self.counters[HIT] / lookups, 3) if lookups else 0.0,
+            'totals': dict(self.counters),
+            'rejections': dict(sorted(self.rejections.items())),
+        }
+
+    def _begin_turn(self, inspector: lugo4py.GameSnapshotInspector, handler: str, args: tuple):
+        """
+        Valida a especulação do turno anterior contra o snapshot que chegou.
+        """
+        self._calls = []
+        self._results = {}
+        job = self._job
+        self._job = None
+        if job is None:
+            return
+        if not job.done.is_set():
+            # A thread ainda está calculando: o resultado chegaria tarde demais para este turno. Ela para
+            # na próxima chamada, e o turno só espera as cópias do estado do bot (que ele vai alterar)
+            job.stop.set()
+            job.copied.wait()
+            self._reject(NOT_READY)
+            return
+
+        predicted = job.predicted
+        if predicted is None:
+            return
+        if inspector.get_turn() != job.expected_turn:
+            self._reject(DIFFERENT_TURN)
+            return
+        if (handler, args) != (job.handler, job.args):
+            self._reject(DIFFERENT_STATE)
+            return
+
+        real = get_turn_context(inspector)
+        # Mesmo com os jogadores fora do previsto, as buscas da cópia servem ao FrameCache, que confere
+        # as âncoras de cada entrada antes de reaproveitá-la
+        self.bot.frame_cache.adopt(job.frame_cache)
+        if real.positions.shape != predicted.shape or \
+                np.abs(real.positions - predicted).max() > self.tolerance:
+            self._reject(MOVED)
+            return
+        self._results = job.results
+
+    def _speculate(self, inspector: lugo4py.GameSnapshotInspector, handler: str, args: tuple, orders):
+        orders = list(orders or [])
+        if any(order.HasField('kick') for order in orders):
+            # Depois de um chute o próximo turno é outra jogada: não vale antecipar nada
+            self._reject(KICKED)
+            return
+        if not self._calls:
+            return
+
+        self._job = _Job(inspector, handler, args, orders, self._calls)
+        self._jobs.put(self._job)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                self._run(job)
+            except Exception as e:
+                job.predicted = None
+                print(f'speculation failed: {e}')
+            finally:
+                job.copied.set()
+                job.done.set()
+
+    def _run(self, job: _Job):
+        """
+        Executa na thread (uma por bot, então as especulações nunca rodam juntas): repete as chamadas
+        do turno no snapshot previsto, com a cópia do bot. Para assim que `job.stop` é marcado.
+        """
+        if job.stop.is_set():
+            return
+        shadow = self._shadow
+        try:
+            shadow.opponent_tracker = copy.deepcopy(self.bot.opponent_tracker)
+            shadow.opponent_model = copy.deepcopy(self.bot.opponent_model)
+            shadow.frame_cache = job.frame_cache = self.bot.frame_cache.fork()
+        finally:
+            job.copied.set()
+
+        snapshot = predict_snapshot(job.inspector, job.orders)
+        inspector = lugo4py.GameSnapshotInspector(shadow.side, shadow.number, snapshot)
+        if shadow.action_search is not None:
+            shadow.action_search.stop = job.stop
+        shadow._start_turn(inspector, job.handler)
+
+        results = {}
+        for name, args, kwargs in job.calls:
+            if job.stop.is_set():
+                return
+            key = _call_key(name, args, kwargs)
+            if key not in results:
+                results[key] = getattr(shadow, name)(inspector, *_rebind(inspector, args),
+                                                     **{k: _rebind_value(inspector, v) for k, v in kwargs.items()})
+        if job.stop.is_set():
+            return
+        job.results = results
+        job.predicted = get_turn_context(inspector).positions
+
+    def _reject(self, reason: str):
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+
+def predict_snapshot(inspector: lugo4py.GameSnapshotInspector, orders) -> lugo4py.GameSnapshot:
+    """
+    Snapshot do próximo turno: o bot avança pela própria ordem de movimento, a bola pelo portador
+    ou pela desaceleração, e os outros jogadores ficam onde estão.
+
+    Mover os outros jogadores pela velocidade (do snapshot ou do OpponentTracker) acerta menos: os
+    bots oscilam ao redor do destino e a previsão erra por até dois passos, enquanto parados o erro
+    nunca passa de um passo (PLAYER_MAX_SPEED), que é a tolerância padrão.
+    """
+    snapshot = inspector.get_snapshot()
+    predicted = type(snapshot)()
+    predicted.CopyFrom(snapshot)
+    predicted.turn = snapshot.turn + 1
+
+    me = inspector.get_me()
+    my_velocity = next((order.move.velocity for order in orders if order.HasField('move')), None)
+    my_step = _step(my_velocity) if my_velocity is not None else (0.0, 0.0)
+    team = predicted.home_team if me.team_side == lugo4py.TeamSide.HOME else predicted.away_team
+    for player in team.players:
+        if player.number == me.number:
+            player.position.x = _clip(player.position.x + my_step[0], lugo4py.specs.MAX_X_COORDINATE)
+            player.position.y = _clip(player.position.y + my_step[1], lugo4py.specs.MAX_Y_COORDINATE)
+
+    ball = predicted.ball
+    ball_step = None
+    if ball.holder.number:
+        # O portador (se não for o bot, parado como os outros) leva a bola junto
+        is_me = ball.holder.team_side == me.team_side and ball.holder.number == me.number
+        ball_step = my_step if is_me else (0.0, 0.0)
+
+    if ball_step is not None:
+        ball.position.x = _clip(ball.position.x + ball_step[0], lugo4py.specs.MAX_X_COORDINATE)
+        ball.position.y = _clip(ball.position.y + ball_step[1], lugo4py.specs.MAX_Y_COORDINATE)
+    elif ball.velocity.speed > 0:
+        direction = np.array([ball.velocity.direction.x, ball.velocity.direction.y], dtype=float)
+        trajectory = BallTrajectory(np.array([ball.position.x, ball.position.y], dtype=float), direction,
+                                    ball.velocity.speed)
+        x, y = trajectory.position_at(1)
+        ball.position.x, ball.position.y = int(round(x)), int(round(y))
+        ball.velocity.speed = max(ball.velocity.speed - lugo4py.specs.BALL_DECELERATION, 0)
+    return predicted
+
+
+def speculator_from_env(bot) -> Optional[Speculator]:
+    """
+    Cria o Speculator se SPECULATION=on; SPECULATION_TOLERANCE muda a tolerância.
+    """
+    if os.environ.get('SPECULATION', '').lower() != 'on':
+        return None
+    return Speculator(bot, float(os.environ.get('SPECULATION_TOLERANCE', DEFAULT_TOLERANCE)))
+
+
+def speculate_bot(bot, speculator: Speculator, handlers: List[str] = None, helpers: List[str] = None):
+    """
+    Troca os handlers e helpers da instância do bot pelas versões do modo especulativo.
+    """
+    for name in HANDLERS if handlers is None else handlers:
+        setattr(bot, name, speculator.wrap_handler(name, getattr(bot, name)))
+    for name in SPECULATED_HELPERS if helpers is None else helpers:
+        setattr(bot, name, speculator.wrap_helper(name, getattr(bot, name)))
+    bot.speculator = speculator
+    return bot
+
+
+def _step(velocity) -> Tuple[float, float]:
+    # As direções do lugo4py são normalizadas para 100 unidades
+    return velocity.direction.x / 100 * velocity.speed, velocity.direction.y / 100 * velocity.speed
+
+
+def _clip(value: float, maximum: float) -> int:
+    return int(round(min(max(value, 0), maximum)))
+
+
+def _call_key(name: str, args: tuple, kwargs: dict) -> tuple:
+    return name, tuple(_value_key(a) for a in args), tuple(sorted((k, _value_key(v)) for k, v in kwargs.items()))
+
+
+def _value_key(value):
+    # Jogadores são identificados pelo lado e número: são objetos diferentes em cada snapshot
+    if isinstance(value, server_pb2.Player):
+        return 'player', value.team_side, value.number
+    if isinstance(value, (list, tuple)):
+        return tuple(_value_key(v) for v in value)
+    return value
+
+
+def _rebind(inspector: lugo4py.GameSnapshotInspector, args: tuple) -> tuple:
+    return tuple(_rebind_value(inspector, a) for a in args)
+
+
+def _rebind_value(inspector: lugo4py.GameSnapshotInspector, value):
+    """
+    Troca os jogadores do snapshot real pelos mesmos jogadores no snapshot previsto.
+    """
+    if isinstance(value, server_pb2.Player):
+        return inspector.get_player(value.team_side, value.number) or value
+    if isinstance(value, list):
+        return [_rebind_value(inspector, v) for v in value]
+    return value
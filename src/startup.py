@@ -0,0 +1,83 @@
+import builtins
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Bibliotecas pesadas cujo tempo de import aparece no relatório mesmo quando importadas indiretamente
+HEAVY_MODULES = ('numpy', 'grpc', 'google.protobuf', 'lugo4py')
+
+
+class ImportTimer:
+    """
+    Mede quanto tempo leva cada import feito pela primeira vez enquanto o timer está instalado
+    (tempo inclusivo, como a coluna "cumulative" de `python -X importtime`).
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.times: Dict[str, float] = {}
+        self.order: List[Tuple[int, str]] = []
+        self._depth = 0
+        self._original_import = None
+
+    def install(self) -> 'ImportTimer':
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        depth = self._depth
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth = depth
+            self.times[name] = (time.perf_counter() - start) * 1000
+            self.order.append((depth, name))
+
+    def top_level(self) -> Dict[str, float]:
+        """
+        Tempo dos imports feitos diretamente pelo script (profundidade 0).
+        """
+        return {name: self.times[name] for depth, name in self.order if depth == 0}
+
+    def heavy(self) -> Dict[str, float]:
+        return {name: self.times[name] for name in HEAVY_MODULES if name in self.times}
+
+
+def process_age_ms() -> float:
+    """
+    Tempo desde que o processo começou (inclui subir o interpretador), lido de /proc.
+    Fora do Linux retorna 0.
+    """
+    try:
+        with open('/proc/self/stat') as stat_file:
+            start_ticks = int(stat_file.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return 0.0
+    return max(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 0.0) * 1000
+
+
+def startup_report(timer: ImportTimer, derived_ms: float) -> str:
+    """
+    Uma linha com o tempo até o bot estar pronto para entrar na partida, separado por etapa.
+    """
+    timer.uninstall()
+    total_ms = (time.perf_counter() - timer.started_at) * 1000
+    heavy = ', '.join(f'{name} {ms:.0f}ms' for name, ms in timer.heavy().items())
+    imports = ', '.join(f'{name} {ms:.0f}ms' for name, ms in sorted(timer.top_level().items(), key=lambda i: -i[1])
+                        if ms >= 1)
+    return (f'[startup] ready in {total_ms:.0f}ms ({process_age_ms():.0f}ms since the process started) | '
+            f'imports: {imports} | of which {heavy} | derived data: {derived_ms:.1f}ms')
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import threading
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Tuple
+
+import lugo4py
+from disk_cache import cache_key
+
+# Arquivo da estratégia: táticas, defensores e limiares usados pelo MyBot. Ele não é um .py,
+# então editá-lo não faz o nodemon reiniciar os bots: o StrategyWatcher o recarrega com o jogo rodando.
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strategy.json')
+
+# Versão do formato do arquivo; arquivos de outra versão são recusados
+FORMAT_VERSION = 1
+
+# Quantos turnos um bot do time pode estar atrasado; um turno mais antigo que isso é de outra partida
+MAX_TURN_LAG = 2
+
+# Intervalo (s) entre as consultas ao arquivo (um os.stat) da thread do StrategyWatcher
+DEFAULT_POLL_INTERVAL = 1.0
+
+logger = logging.getLogger(__name__)
+
+RADII = ('free_ally', 'marked_holder', 'goalkeeper_free_ally', 'support_marked_holder')
+DEFENSE_LINE = ('ball_factor', 'min_goal_distance', 'center_y_factor', 'spacing')
+KEYS = ('format', 'revision', 'tactic_grid', 'tactic_positions', 'tactic_states', 'def_players', 'ball_catchers',
+        'radii', 'defense_line')
+
+
+class StrategyError(ValueError):
+    pass
+
+
+class Strategy:
+    """
+    Estratégia validada. `tables` guarda as tabelas táticas já compiladas (veja settings.get_tactic_table),
+    e `fingerprint` identifica o conteúdo, ex.: para que bots com estratégias diferentes não troquem fatos
+    pelo cache do time.
+    """
+
+    def __init__(self, data: dict):
+        _check(isinstance(data, dict), 'the strategy must be a JSON object')
+        unknown = sorted(set(data) - set(KEYS))
+        _check(not unknown, f'unknown keys {unknown}')
+        missing = sorted(set(KEYS) - set(data))
+        _check(not missing, f'missing keys {missing}')
+        _check(data['format'] == FORMAT_VERSION, f'format {data["format"]!r} is not {FORMAT_VERSION}')
+        self.revision = data['revision']
+
+        grid = data['tactic_grid']
+        _check(isinstance(grid, dict) and set(grid) == {'cols', 'rows'}, 'tactic_grid needs "cols" and "rows"')
+        self.tactic_cols = _integer(grid['cols'], 'tactic_grid.cols', 1)
+        self.tactic_rows = _integer(grid['rows'], 'tactic_grid.rows', 1)
+
+        self.tactic_states = self._states(data['tactic_states'])
+        self.tactic_positions = self._positions(data['tactic_positions'])
+        missing = [name for name, _ in self.tactic_states if name not in self.tactic_positions]
+        _check(not missing, f'tactic_states {missing} have no tactic_positions')
+
+        def_players = data['def_players']
+        _check(isinstance(def_players, list) and def_players, 'def_players must be a non-empty list')
+        self.def_players = [_integer(n, 'def_players', 2, lugo4py.specs.MAX_PLAYERS) for n in def_players]
+        _check(len(set(self.def_players)) == len(self.def_players), 'def_players has repeated numbers')
+
+        self.ball_catchers = _integer(data['ball_catchers'], 'ball_catchers', 1, lugo4py.specs.MAX_PLAYERS)
+
+        radii = _section(data, 'radii', RADII)
+        self.free_ally_radius = _number(radii['free_ally'], 'radii.free_ally', 0)
+        self.marked_holder_radius = _number(radii['marked_holder'], 'radii.marked_holder', 0)
+        self.goalkeeper_free_ally_radius = _number(radii['goalkeeper_free_ally'], 'radii.goalkeeper_free_ally', 0)
+        self.support_marked_holder_radius = _number(radii['support_marked_holder'], 'radii.support_marked_holder', 0)
+
+        line = _section(data, 'defense_line', DEFENSE_LINE)
+        self.defense_ball_factor = _number(line['ball_factor'], 'defense_line.ball_factor', 0, 1)
+        self.defense_min_goal_distance = _number(line['min_goal_distance'], 'defense_line.min_goal_distance', 0)
+        self.defense_center_y_factor = _number(line['center_y_factor'], 'defense_line.center_y_factor', 0, 1)
+        self.defense_spacing = _number(line['spacing'], 'defense_line.spacing', 0)
+
+        # 47 bits: combinado (xor) com o carimbo do turno do cache do time, continua cabendo em um int64
+        self.fingerprint = int(cache_key('strategy', json.dumps(data, sort_keys=True)), 16) & ((1 << 47) - 1)
+        self.tables: Dict[int, object] = {}
+
+    def _states(self, states) -> List[Tuple[str, Fraction]]:
+        _check(isinstance(states, list) and states, 'tactic_states must be a non-empty list')
+        parsed = []
+        for entry in states:
+            _check(isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str),
+                   f'tactic_states entry {entry!r} must be ["NAME", bound]')
+            try:
+                bound = Fraction(entry[1])
+            except (TypeError, ValueError, ZeroDivisionError):
+                raise StrategyError(f'tactic_states bound {entry[1]!r} is not a fraction')
+            _check(0 < bound <= 1, f'tactic_states bound {entry[1]!r} must be in (0, 1]')
+            _check(not parsed or bound > parsed[-1][1], 'tactic_states bounds must increase')
+            parsed.append((entry[0], bound))
+        _check(parsed[-1][1] == 1, 'the last tactic_states bound must be 1')
+        return parsed
+
+    def _positions(self, tactics) -> Dict[str, Dict[int, dict]]:
+        _check(isinstance(tactics, dict), 'tactic_positions must be an object')
+        parsed = {}
+        for name, positions in tactics.items():
+            _check(isinstance(positions, dict), f'tactic_positions.{name} must be an object')
+            parsed[name] = {}
+            for number, position in positions.items():
+                where = f'tactic_positions.{name}.{number}'
+                _check(isinstance(number, str) and number.isdigit(), f'{where}: the key must be a player number')
+                _integer(int(number), where, 2, lugo4py.specs.MAX_PLAYERS)
+                _check(isinstance(position, dict) and set(position) == {'Col', 'Row'}, f'{where} needs "Col" and "Row"')
+                parsed[name][int(number)] = {
+                    'Col': _integer(position['Col'], f'{where}.Col', 0, self.tactic_cols - 1),
+                    'Row': _integer(position['Row'], f'{where}.Row', 0, self.tactic_rows - 1),
+                }
+        return parsed
+
+
+def load_strategy(path: str = DEFAULT_PATH) -> Strategy:
+    """
+    Lê e valida o arquivo; qualquer problema vira StrategyError.
+    """
+    try:
+        with open(path) as strategy_file:
+            data = json.load(strategy_file)
+    except (OSError, ValueError) as e:
+        raise StrategyError(f'could not read {path}: {e}')
+    return Strategy(data)
+
+
+class StrategyWatcher:
+    """
+    Estratégia em uso, recarregada sem reiniciar o bot. Uma thread consulta o arquivo a cada
+    `poll_interval` (um os.stat); quando ele muda, valida, compila (`prepare`) e deixa a nova
+    estratégia pendente. Ela só entra em uso no primeiro turno novo (`for_turn`), então um turno
+    nunca mistura duas estratégias e nenhuma compilação acontece dentro do turno. Um arquivo
+    inválido é ignorado, e a estratégia anterior continua valendo.
+
+    As mensagens (revisão recusada ou em uso) vão para o logger pela thread, nunca durante um turno.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, prepare: Callable[[Strategy], None] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.prepare = prepare
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.errors = 0
+
+        self._stat = _stat(path)
+        self.current = self._load()
+        self._previous = self.current
+        self._pending: Optional[Strategy] = None
+        self._turn = -1
+        self._swap_turn = -1
+        # (revisão, turno) da última troca, registrada no log pela thread
+        self._swapped: Optional[Tuple[object, int]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'StrategyWatcher':
+        if self.poll_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name='strategy-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self) -> bool:
+        """
+        Recarrega o arquivo se ele mudou. Retorna True se uma nova estratégia ficou pendente.
+        """
+        stat = _stat(self.path)
+        if stat == self._stat:
+            return False
+        self._stat = stat
+        try:
+            strategy = self._load()
+        except StrategyError as e:
+            self.errors += 1
+            logger.warning('strategy not reloaded, keeping revision %r: %s', self.current.revision, e)
+            return False
+        with self._lock:
+            self._pending = strategy
+        return True
+
+    def for_turn(self, turn: int) -> Strategy:
+        """
+        Estratégia do turno: troca pela pendente quando chega um turno novo. Um turno anterior
+        à troca (um bot atrasado do time) continua com a estratégia antiga.
+        """
+        if turn + MAX_TURN_LAG < self._turn:
+            # Outra partida (ex.: no replay, ou com o servidor reiniciado): os turnos recomeçam
+            self._turn, self._swap_turn = -1, -1
+        if self._pending is not None and turn > self._turn:
+            with self._lock:
+                if self._pending is not None:
+                    self._previous, self.current, self._pending = self.current, self._pending, None
+                    self._swap_turn = turn
+                    self.reloads += 1
+                    self._swapped = (self.current.revision, turn)
+        if turn > self._turn:
+            self._turn = turn
+        return self._previous if turn < self._swap_turn else self.current
+
+    def _load(self) -> Strategy:
+        strategy = load_strategy(self.path)
+        if self.prepare is not None:
+            self.prepare(strategy)
+        return strategy
+
+    def report_swap(self):
+        swapped, self._swapped = self._swapped, None
+        if swapped is not None:
+            logger.info('strategy revision %r in use from turn %d', *swapped)
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.report_swap()
+            self.poll()
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _section(data: dict, name: str, keys: Tuple[str, ...]) -> dict:
+    section = data[name]
+    _check(isinstance(section, dict) and set(section) == set(keys), f'{name} needs exactly {list(keys)}')
+    return section
+
+
+def _integer(value, where: str, minimum: int, maximum: int = None) -> int:
+    _check(isinstance(value, int) and not isinstance(value, bool), f'{where}: {value!r} is not an integer')
+    _check(value >= minimum and (maximum is None or value <= maximum),
+           f'{where}: {value} is out of [{minimum}, {maximum if maximum is not None else "..."}]')
+    return value
+
+
+def _number(value, where: str, minimum: float, maximum: float = None) -> float:
+    _check(isinstance(value, (int, float)) and not isinstance(value, bool), f'{where}: {value!r} is not a number')
+    _check(value >= minimum and (maximum is None or value <= maximum),
+           f'{where}: {value} is out of [{minimum}, {maximum if maximum is not None else "..."}]')
+    return value
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise StrategyError(message)
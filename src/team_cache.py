@@ -0,0 +1,161 @@
+import atexit
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# Posições de cada faixa do buffer: geração (ímpar durante uma escrita), carimbo do turno e checksum,
+# seguidos dos valores
+GENERATION, KEY, CHECKSUM, HEADER = 0, 1, 2, 3
+# Multiplicadores (ímpares, fixos para todos os processos) do checksum dos valores
+_CHECKSUM_WEIGHTS = np.random.default_rng(0x7EA4).integers(1, 2 ** 62, size=1024, dtype=np.int64) | 1
+
+
+class TeamTurnCache:
+    """
+    Resultados do turno que valem para o time inteiro (quem está mais perto da bola, quem está livre,
+    a linha de defesa...), calculados pelo primeiro bot que trata o turno e lidos pelos demais.
+
+    Cada fato ocupa uma faixa fixa de um buffer de int64: [geração, carimbo, checksum, valores...].
+    O carimbo identifica o turno (veja `turn_context.turn_key`). A geração é um seqlock: fica ímpar enquanto
+    alguém escreve e é lida antes e depois dos valores, então quem lê sabe se pegou uma escrita pela
+    metade e, nesse caso, simplesmente calcula de novo.
+
+    Os bots não chegam necessariamente ao mesmo resultado (os fatos dependem do histórico de cada um
+    no OpponentTracker, e um bot reiniciado começa sem histórico), então duas escritas do mesmo turno
+    não podem se misturar. No mesmo processo, um lock serializa as escritas. Entre processos não há
+    como incrementar a geração atomicamente, então o checksum do carimbo e dos valores, gravado junto
+    com eles, garante que quem lê aceita os valores inteiros de um único bot.
+
+    O buffer pode ser um array do processo (bots em threads, como em team_main.py) ou um bloco de
+    `multiprocessing.shared_memory` (um processo por jogador, como em main.py). O bloco não é removido
+    quando um bot sai: o nodemon reinicia um bot de cada vez, e o bot reiniciado precisa abrir o mesmo
+    bloco que os companheiros continuam usando. Ele fica em /dev/shm (algumas centenas de bytes) até o
+    sistema reiniciar, e a próxima partida com o mesmo nome o reaproveita.
+    """
+
+    def __init__(self, facts: Dict[str, int], buffer=None):
+        self.slots: Dict[str, slice] = {}
+        offset = 0
+        for name, size in facts.items():
+            self.slots[name] = slice(offset, offset + HEADER + size)
+            offset += HEADER + size
+        self.size = offset
+
+        if buffer is None:
+            self._data = np.zeros(self.size, dtype=np.int64)
+        else:
+            self._data = np.ndarray((self.size,), dtype=np.int64, buffer=buffer)
+        self._write_lock = threading.Lock()
+        self._shm = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls, name: str, facts: Dict[str, int]) -> 'TeamTurnCache':
+        """
+        Cria (ou abre, se outro processo do time já criou) o bloco de memória compartilhada `name`.
+        """
+        # Importado só aqui: custa alguns ms na inicialização e team_main.py não usa memória compartilhada
+        from multiprocessing import resource_tracker, shared_memory
+
+        nbytes = sum(HEADER + size for size in facts.values()) * np.dtype(np.int64).itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=nbytes)
+        except FileExistsError:
+            shm = _attach(name, nbytes)
+        # Ninguém remove o bloco (veja a classe): sem isso, o resource_tracker o apagaria quando
+        # o processo terminasse, e o bot reiniciado criaria outro, que os companheiros não enxergam
+        resource_tracker.unregister(shm._name, 'shared_memory')
+
+        cache = cls(facts, shm.buf)
+        cache._shm = shm
+        return cache
+
+    def get(self, key: int, name: str) -> Optional[np.ndarray]:
+        data = self._data[self.slots[name]]
+        generation = int(data[GENERATION])
+        if generation & 1 or data[KEY] != key:
+            return None
+        values = data[HEADER:].copy()
+        checksum = int(data[CHECKSUM])
+        if data[GENERATION] != generation or data[KEY] != key or checksum != _checksum(key, values):
+            return None
+        return values
+
+    def put(self, key: int, name: str, values):
+        data = self._data[self.slots[name]]
+        values = np.asarray(values, dtype=np.int64)
+        with self._write_lock:
+            generation = int(data[GENERATION]) | 1
+            data[GENERATION] = generation
+            data[KEY] = key
+            data[HEADER:] = values
+            data[CHECKSUM] = _checksum(key, values)
+            data[GENERATION] = generation + 1
+
+    def get_or_compute(self, key: int, name: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        values = self.get(key, name)
+        if values is not None:
+            self.hits += 1
+            return values
+        self.misses += 1
+        values = np.asarray(compute(), dtype=np.int64)
+        self.put(key, name, values)
+        return values
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._data = None
+        self._shm.close()
+        self._shm = None
+
+
+def _checksum(key: int, values: np.ndarray) -> int:
+    """
+    Soma ponderada (módulo 2^64) dos valores, combinada com o carimbo: valores de duas escritas
+    misturados não batem com o checksum de nenhuma delas.
+    """
+    return int(np.dot(values, _CHECKSUM_WEIGHTS[:len(values)])) ^ key
+
+
+def team_cache_from_env(side, facts: Dict[str, int]) -> Optional[TeamTurnCache]:
+    """
+    Abre o cache em memória compartilhada do time, configurado por TEAM_CACHE ("off" desliga).
+    Por padrão o nome do bloco vem do lado e de BOT_GRPC_URL, para que partidas simultâneas
+    em servidores diferentes não se misturem, e do formato das faixas (`facts`): como o bloco
+    sobrevive aos bots, uma versão do bot com outros fatos não pode abrir o bloco da anterior.
+    """
+    name = os.environ.get('TEAM_CACHE', '')
+    if name.lower() == 'off':
+        return None
+    if not name:
+        side_name = 'home' if side == 0 else 'away'
+        server = re.sub(r'[^0-9A-Za-z]+', '_', os.environ.get('BOT_GRPC_URL', 'localhost:5000'))
+        layout = hashlib.sha1(repr(list(facts.items())).encode()).hexdigest()[:8]
+        name = f'lugo_{server}_{side_name}_{layout}'
+
+    cache = TeamTurnCache.shared(name, facts)
+    atexit.register(cache.close)
+    return cache
+
+
+def _attach(name: str, nbytes: int):
+    from multiprocessing import shared_memory
+
+    # O bloco pode ter acabado de ser criado por outro processo e ainda não ter o tamanho final
+    for _ in range(50):
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+            if shm.size >= nbytes:
+                return shm
+            shm.close()
+        except ValueError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f'shared memory {name!r} is smaller than the team cache layout')
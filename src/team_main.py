@@ -0,0 +1,91 @@
+import logging
+import os
+import resource
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lugo4py import LugoClient, Mapper, TeamSide
+
+from action_search import ActionSearch
+from instrumentation import instrument_bot, monitor_from_env
+from my_bot import TEAM_FACTS, TURN_BRANCHES, MyBot
+from profiler import profile_bot, profiler_from_env
+from recorder import record_bot, writer_from_env
+from settings import MAPPER_COLS, MAPPER_ROWS, get_initial_position
+from shot_map import get_shot_map
+from speculation import speculate_bot, speculator_from_env
+from team_cache import TeamTurnCache
+from telemetry import telemetry_bot, telemetry_from_env
+
+logger = logging.getLogger('team_main')
+
+if __name__ == "__main__":
+    #################################################################################
+    #   Runs the whole team (or the numbers in BOT_NUMBERS, e.g. "2,3,4") in a      #
+    #   single process, instead of one src/main.py process per player.             #
+    #################################################################################
+    started_at = time.monotonic()
+    # Messages from outside the turns (strategy reloads...); LOG_LEVEL=WARNING keeps only the problems
+    logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format='%(asctime)s %(name)s: %(message)s')
+
+    if "BOT_TEAM" not in os.environ:
+        raise SystemError("missing BOT_TEAM env value")
+
+    side = TeamSide.HOME if os.environ["BOT_TEAM"].upper() == 'HOME' else TeamSide.AWAY
+    grpc_url = os.environ.get('BOT_GRPC_URL', 'localhost:5000')
+    grpc_insecure = bool(os.environ.get('BOT_GRPC_INSECURE', 'false'))
+    token = os.environ.get('BOT_TOKEN', '')
+    numbers = [int(n) for n in os.environ.get('BOT_NUMBERS', ','.join(str(n) for n in range(1, 12))).split(',')]
+
+    # Every player of the team shares the same mapper, settings and thread pool.
+    # The server tells the players apart by their connections, so each one still has its own channel.
+    mapper = Mapper(MAPPER_COLS, MAPPER_ROWS, side)
+    executor = ThreadPoolExecutor(max_workers=len(numbers))
+    # Team-wide facts of the turn are computed by the first player and read by the others
+    team_cache = TeamTurnCache(TEAM_FACTS)
+    # The shot map is memory-mapped once for the whole team
+    get_shot_map()
+
+    clients = []
+    for number in numbers:
+        initial_position = get_initial_position(side, number)
+        bot = MyBot(side, number, initial_position, mapper)
+        bot.team_cache = team_cache
+        # The players' searches compete for the same GIL, so the search deadline is split between them
+        bot.action_search = ActionSearch.from_env(bots_in_process=len(numbers))
+
+        speculator = speculator_from_env(bot)
+        if speculator:
+            speculate_bot(bot, speculator)
+        profiler = profiler_from_env(side, number)
+        if profiler:
+            profile_bot(bot, profiler)
+        telemetry = telemetry_from_env(side, number, TURN_BRANCHES)
+        if telemetry:
+            telemetry_bot(bot, telemetry)
+        monitor = monitor_from_env(side, number)
+        if monitor:
+            instrument_bot(bot, monitor)
+        writer = writer_from_env(side, number)
+        if writer:
+            record_bot(bot, writer)
+
+        client = LugoClient(grpc_url, grpc_insecure, token, side, number, initial_position)
+        client.play_as_bot(executor, bot, lambda: None)
+        clients.append(client)
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    logger.info('%d players joined in %.2fs (max RSS %.1fMB)', len(clients), time.monotonic() - started_at, rss_mb)
+
+    def signal_handler(_, __):
+        logger.info("stop requested")
+        for client in clients:
+            client._play_finished.set()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    for client in clients:
+        client.wait()
+    logger.info("all players finished")
@@ -0,0 +1,214 @@
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+from functools import wraps
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+from instrumentation import HANDLERS, budget_from_env
+
+MAGIC = b'PXTL'
+VERSION = 1
+# Cabeçalho do arquivo: MAGIC, versão, tamanho do registro e tamanho do JSON com as tabelas de nomes
+HEADER = struct.Struct('<4sHHI')
+# Registro de um turno: turno, duração (us), lado, número, handler, jogada escolhida, flags
+# e o texto do erro (vazio quando o turno foi jogado)
+RECORD = struct.Struct('<IfBBBBB3x80s')
+ERROR_TEXT_SIZE = 80
+
+# Flags do registro
+FAILED = 1
+OVER_BUDGET = 2
+
+# Registros que cabem no buffer entre duas gravações; se o buffer encher, os novos são descartados
+DEFAULT_CAPACITY = 4096
+# Intervalo (s) entre as gravações da thread
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+UNKNOWN = '?'
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TelemetryRecord(NamedTuple):
+    turn: int
+    elapsed_us: float
+    side: int
+    number: int
+    handler: str
+    branch: str
+    failed: bool
+    error: str
+    over_budget: bool
+
+
+class Telemetry:
+    """
+    Telemetria de um bot: cada turno vira um registro binário de tamanho fixo (RECORD), escrito em um
+    buffer circular alocado uma única vez. Uma thread grava os registros acumulados em `path` a cada
+    `flush_interval`, então o turno nunca espera o disco (nem o stdout, como acontecia com print).
+
+    Os nomes de handlers e jogadas vão no cabeçalho do arquivo; os registros guardam só os índices.
+    Com `budget_ms`, os turnos mais lentos que isso levam a flag OVER_BUDGET.
+    """
+
+    def __init__(self, path: str, branches: List[str], handlers: List[str] = None,
+                 capacity: int = DEFAULT_CAPACITY, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 budget_ms: Optional[float] = None):
+        self.path = path
+        self.budget_us = float('inf') if budget_ms is None else budget_ms * 1000
+        self.handlers = [UNKNOWN] + list(HANDLERS if handlers is None else handlers)
+        self.branches = [UNKNOWN] + list(branches)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._handler_ids = {name: index for index, name in enumerate(self.handlers)}
+        self._branch_ids = {name: index for index, name in enumerate(self.branches)}
+
+        self._buffer = bytearray(capacity * RECORD.size)
+        # Só o bot avança _head e só a thread avança _tail: com o GIL, não é preciso lock
+        self._head = 0
+        self._tail = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file: BinaryIO = open(path, 'wb')
+        names = json.dumps({'handlers': self.handlers, 'branches': self.branches}).encode()
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(names)))
+        self._file.write(names)
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name=f'telemetry-{os.path.basename(path)}',
+                                        daemon=True)
+        self._thread.start()
+
+    def record(self, turn: int, elapsed_us: float, side: int, number: int, handler: str,
+               branch: Optional[str], error: Optional[BaseException] = None):
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return
+        flags, error_text = 0, b''
+        if error is not None:
+            flags, error_text = FAILED, describe_error(error).encode('utf-8', 'replace')[:ERROR_TEXT_SIZE]
+        if elapsed_us > self.budget_us:
+            flags |= OVER_BUDGET
+        RECORD.pack_into(self._buffer, (head % self.capacity) * RECORD.size, turn, elapsed_us, side, number,
+                         self._handler_ids.get(handler, 0), self._branch_ids.get(branch, 0), flags, error_text)
+        self._head = head + 1
+
+    def flush(self):
+        head = self._head
+        tail = self._tail
+        if head == tail:
+            return
+        start, end = tail % self.capacity, head % self.capacity
+        if start < end:
+            self._file.write(self._buffer[start * RECORD.size:end * RECORD.size])
+        else:
+            # Os registros dão a volta no buffer
+            self._file.write(self._buffer[start * RECORD.size:])
+            self._file.write(self._buffer[:end * RECORD.size])
+        self._file.flush()
+        self._tail = head
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
+        if self.dropped:
+            print(f'telemetry: {self.dropped} records dropped (buffer full) in {self.path}')
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+def describe_error(error: BaseException) -> str:
+    """
+    "arquivo:linha Tipo: mensagem", com a linha mais interna do traceback que está no código do bot
+    (e não no lugo4py ou no numpy).
+    """
+    location = ''
+    traceback = error.__traceback__
+    while traceback is not None:
+        filename = traceback.tb_frame.f_code.co_filename
+        if not location or os.path.dirname(os.path.abspath(filename)) == SOURCE_DIR:
+            location = f'{os.path.basename(filename)}:{traceback.tb_lineno} '
+        traceback = traceback.tb_next
+    return f'{location}{type(error).__name__}: {error}'
+
+
+def read_records(path: str) -> Iterator[TelemetryRecord]:
+    """
+    Lê, em ordem, os registros gravados por uma Telemetry.
+    """
+    with open(path, 'rb') as telemetry_file:
+        magic, version, record_size, names_size = HEADER.unpack(telemetry_file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f'{path} is not a telemetry file (version {VERSION})')
+        names = json.loads(telemetry_file.read(names_size))
+        handlers, branches = names['handlers'], names['branches']
+
+        while True:
+            data = telemetry_file.read(record_size)
+            if len(data) < record_size:
+                return
+            turn, elapsed_us, side, number, handler, branch, flags, error = RECORD.unpack(data)
+            yield TelemetryRecord(turn, elapsed_us, side, number,
+                                  handlers[handler] if handler < len(handlers) else UNKNOWN,
+                                  branches[branch] if branch < len(branches) else UNKNOWN,
+                                  bool(flags & FAILED), error.rstrip(b'\0').decode('utf-8', 'replace'),
+                                  bool(flags & OVER_BUDGET))
+
+
+def telemetry_bot(bot, telemetry: Telemetry, handlers: List[str] = None):
+    """
+    Faz cada handler do bot gerar um registro: a jogada e o erro do turno vêm de `bot.turn_branch`
+    e `bot.turn_error`, preenchidos pelo próprio handler.
+    """
+    for name in HANDLERS if handlers is None else handlers:
+        setattr(bot, name, _recording(bot, name, getattr(bot, name), telemetry))
+    bot.telemetry = telemetry
+    return bot
+
+
+def telemetry_from_env(side, number: int, branches: List[str]) -> Optional[Telemetry]:
+    """
+    Cria a telemetria gravada em TELEMETRY_DIR, se estiver definido (por padrão, como LATENCY_REPORT_DIR,
+    nada é gravado e os erros dos turnos vão para o stdout). TELEMETRY_CAPACITY muda o tamanho do buffer.
+    Os turnos acima do orçamento (veja instrumentation.py) são marcados nos registros.
+    """
+    telemetry_dir = os.environ.get('TELEMETRY_DIR', '')
+    if not telemetry_dir:
+        return None
+
+    side_name = 'home' if side == 0 else 'away'
+    telemetry = Telemetry(os.path.join(telemetry_dir, f'telemetry_{side_name}_{number:02d}.bin'), branches,
+                          capacity=int(os.environ.get('TELEMETRY_CAPACITY', DEFAULT_CAPACITY)),
+                          budget_ms=budget_from_env())
+    atexit.register(telemetry.close)
+    return telemetry
+
+
+def _recording(bot, name: str, handler, telemetry: Telemetry):
+    perf_counter_ns = time.perf_counter_ns
+
+    @wraps(handler)
+    def recorded(inspector, *args):
+        bot.turn_branch = None
+        bot.turn_error = None
+        start = perf_counter_ns()
+        try:
+            return handler(inspector, *args)
+        finally:
+            telemetry.record(inspector.get_turn(), (perf_counter_ns() - start) / 1000, bot.side, bot.number,
+                             name, bot.turn_branch, bot.turn_error)
+
+    return recorded
@@ -0,0 +1,279 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional
+
+from instrumentation import BUCKET_EDGES_US, HANDLERS, LatencyHistogram
+from local_server import DEFAULT_LISTENING_TIMEOUT, serve
+from strategy import DEFAULT_PATH, Strategy
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SRC_DIR)
+
+DEFAULT_TURNS = 1000
+DEFAULT_GAMES = 2
+# Segundos para os times saírem sozinhos depois do fim da partida, antes do SIGINT (e depois do kill)
+TEAM_EXIT_TIMEOUT = 10.0
+
+
+class Variant(NamedTuple):
+    """
+    Um MyBot construído de um conjunto de parâmetros: `strategy` sobrescreve campos de strategy.json
+    (recursivamente) e `env` define variáveis de ambiente do processo do time (ACTION_SEARCH, SPECULATION...).
+    """
+    name: str
+    strategy: dict
+    env: Dict[str, str]
+
+
+class Match(NamedTuple):
+    index: int
+    home: str
+    away: str
+
+
+def load_variants(path: str, base_strategy: str = DEFAULT_PATH) -> List[Variant]:
+    """
+    Lê as variantes de um JSON {"nome": {"strategy": {...}, "env": {...}}, ...} e valida a estratégia
+    de cada uma antes de jogar qualquer partida.
+    """
+    with open(path) as variants_file:
+        data = json.load(variants_file)
+    with open(base_strategy) as strategy_file:
+        base = json.load(strategy_file)
+
+    variants = []
+    for name, params in data.items():
+        unknown = set(params) - {'strategy', 'env'}
+        if unknown:
+            raise ValueError(f'variant {name!r}: unknown keys {sorted(unknown)}')
+        strategy = _merge(base, params.get('strategy', {}))
+        Strategy(strategy)
+        variants.append(Variant(name, strategy, {k: str(v) for k, v in params.get('env', {}).items()}))
+    return variants
+
+
+def schedule(variants: List[Variant], games: int, baseline: Optional[str] = None) -> List[Match]:
+    """
+    Cada variante contra `baseline` (ou todas contra todas), `games` partidas por par, alternando os lados.
+    """
+    names = [variant.name for variant in variants]
+    if baseline is not None:
+        if baseline not in names:
+            raise ValueError(f'unknown baseline {baseline!r}')
+        pairs = [(name, baseline) for name in names if name != baseline]
+    else:
+        pairs = list(itertools.combinations(names, 2))
+
+    matches = []
+    for first, second in pairs:
+        for game in range(games):
+            home, away = (first, second) if game % 2 == 0 else (second, first)
+            matches.append(Match(len(matches), home, away))
+    return matches
+
+
+def run_match(match: Match, variants: Dict[str, Variant], turns: int, listening_timeout: float,
+              workdir: str) -> dict:
+    """
+    Joga uma partida (em um processo do pool): um LocalGameServer próprio, numa porta livre,
+    e um team_main.py por time, com o ambiente e a estratégia da sua variante.
+    """
+    match_dir = os.path.join(workdir, f'match_{match.index:03d}')
+    os.makedirs(match_dir, exist_ok=True)
+
+    server, game = serve(0, max_turns=turns, join_timeout=60.0, listening_timeout=listening_timeout)
+    teams = {}
+    for side, name in (('home', match.home), ('away', match.away)):
+        variant = variants[name]
+        side_dir = os.path.join(match_dir, side)
+        os.makedirs(side_dir, exist_ok=True)
+        strategy_path = os.path.join(side_dir, 'strategy.json')
+        with open(strategy_path, 'w') as strategy_file:
+            json.dump(variant.strategy, strategy_file, indent=2)
+
+        env = dict(os.environ, **variant.env)
+        env.update({
+            'BOT_TEAM': side,
+            'BOT_GRPC_URL': f'localhost:{game.port}',
+            'STRATEGY_FILE': strategy_path,
+            'STRATEGY_POLL_INTERVAL': '0',
+            'LATENCY_REPORT_DIR': side_dir,
+            'TELEMETRY_DIR': side_dir,
+            'PROFILE_DIR': os.path.join(side_dir, 'profiles'),
+        })
+        log = open(os.path.join(side_dir, 'team.log'), 'w')
+        teams[side] = (subprocess.Popen([sys.executable, os.path.join(SRC_DIR, 'team_main.py')], cwd=PROJECT_DIR,
+                                        env=env, stdout=log, stderr=subprocess.STDOUT), log)
+
+    started = time.monotonic()
+    result = game.run_game()
+    seconds = time.monotonic() - started
+    server.stop(grace=1)
+    for process, log in teams.values():
+        _stop(process)
+        log.close()
+
+    return {
+        'match': match.index,
+        'home': match.home,
+        'away': match.away,
+        'score': result['score'],
+        'possession': result['possession'],
+        'timed_out_turns': result['timed_out_turns'],
+        'turns': result['turns'],
+        'seconds': round(seconds, 3),
+        'latency': {side: handler_latency(os.path.join(match_dir, side)) for side in teams},
+    }
+
+
+def handler_latency(report_dir: str) -> dict:
+    """
+    Junta os histogramas dos handlers de todos os bots do time (relatórios do LatencyMonitor).
+    """
+    merged = LatencyHistogram()
+    over_budget = 0
+    for filename in sorted(os.listdir(report_dir)):
+        if not (filename.startswith('latency_') and filename.endswith('.json')):
+            continue
+        with open(os.path.join(report_dir, filename)) as report_file:
+            report = json.load(report_file)
+        over_budget += report['over_budget']
+        for name, histogram in report['latency'].items():
+            if name not in HANDLERS:
+                continue
+            for edge, count in histogram['buckets']:
+                merged.counts[BUCKET_EDGES_US.index(edge) if edge is not None else len(BUCKET_EDGES_US)] += count
+            merged.count += histogram['count']
+            merged.total_us += histogram['mean_us'] * histogram['count']
+            merged.max_us = max(merged.max_us, histogram['max_us'])
+
+    latency = merged.to_dict()
+    del latency['buckets']
+    latency['over_budget'] = over_budget
+    return latency
+
+
+def summarize(rows: List[dict]) -> Dict[str, dict]:
+    """
+    Resultados por variante: vitórias, gols, posse, latência (média ponderada pelos turnos dos p50/p99)
+    e turnos em que o time não mandou todas as ordens a tempo.
+    """
+    table: Dict[str, dict] = {}
+    for row in rows:
+        for side, other in (('home', 'away'), ('away', 'home')):
+            stats = table.setdefault(row[side], {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0,
+                                                 'goals_against': 0, 'possession': 0, 'possession_total': 0,
+                                                 'turns': 0, 'p50_us': 0.0, 'p99_us': 0.0, 'over_budget': 0,
+                                                 'timed_out_turns': 0})
+            goals_for, goals_against = row['score'][side], row['score'][other]
+            stats['games'] += 1
+            stats['wins' if goals_for > goals_against else 'losses' if goals_for < goals_against else 'draws'] += 1
+            stats['goals_for'] += goals_for
+            stats['goals_against'] += goals_against
+            stats['possession'] += row['possession'][side]
+            stats['possession_total'] += row['possession'][side] + row['possession'][other]
+            latency = row['latency'][side]
+            stats['turns'] += latency['count']
+            stats['p50_us'] += latency['p50_us'] * latency['count']
+            stats['p99_us'] += latency['p99_us'] * latency['count']
+            stats['over_budget'] += latency['over_budget']
+            stats['timed_out_turns'] += row['timed_out_turns'][side]
+
+    for stats in table.values():
+        stats['points'] = 3 * stats['wins'] + stats['draws']
+        stats['possession'] = round(stats['possession'] / stats['possession_total'], 3) \
+            if stats['possession_total'] else 0.0
+        del stats['possession_total']
+        turns = stats.pop('turns')
+        stats['p50_us'] = round(stats['p50_us'] / turns, 1) if turns else 0.0
+        stats['p99_us'] = round(stats['p99_us'] / turns, 1) if turns else 0.0
+    return dict(sorted(table.items(), key=lambda item: (-item[1]['points'],
+                                                        item[1]['goals_against'] - item[1]['goals_for'])))
+
+
+def format_table(table: Dict[str, dict]) -> str:
+    lines = [f"{'variant':<20s} {'games':>5s} {'W':>3s} {'D':>3s} {'L':>3s} {'pts':>4s} {'GF':>4s} {'GA':>4s} "
+             f"{'poss':>5s} {'p50 ms':>7s} {'p99 ms':>7s} {'slow':>5s} {'late':>5s}"]
+    for name, stats in table.items():
+        lines.append(f"{name:<20s} {stats['games']:5d} {stats['wins']:3d} {stats['draws']:3d} {stats['losses']:3d} "
+                     f"{stats['points']:4d} {stats['goals_for']:4d} {stats['goals_against']:4d} "
+                     f"{stats['possession']:5.0%} {stats['p50_us'] / 1000:7.2f} {stats['p99_us'] / 1000:7.2f} "
+                     f"{stats['over_budget']:5d} {stats['timed_out_turns']:5d}")
+    return '\n'.join(lines)
+
+
+def _merge(base: dict, overrides: dict) -> dict:
+    merged = dict(base)
+    for key, value in overrides.items():
+        merged[key] = _merge(base[key], value) if isinstance(value, dict) and isinstance(base.get(key), dict) \
+            else value
+    return merged
+
+
+def _stop(process: subprocess.Popen):
+    # O team_main.py grava os relatórios (atexit) ao sair; o SIGINT é o mesmo do Ctrl+C
+    for stop in (None, lambda: process.send_signal(signal.SIGINT), process.kill):
+        if stop is not None:
+            stop()
+        try:
+            process.wait(timeout=TEAM_EXIT_TIMEOUT)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Plays MyBot variants against each other on local servers, '
+                                                 'many matches in parallel.')
+    parser.add_argument('variants', help='JSON file: {"name": {"strategy": {...}, "env": {...}}, ...}')
+    parser.add_argument('--baseline', help='plays every variant against this one (default: round robin)')
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help='matches per pair, alternating sides')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS)
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help='matches at the same time (default: half the cores, each match runs two teams)')
+    parser.add_argument('--listening-timeout', type=float, default=DEFAULT_LISTENING_TIMEOUT,
+                        help='seconds the server waits for missing orders (default: the 50ms listening window); '
+                             'the turn ends as soon as all arrive')
+    parser.add_argument('--workdir', default=os.path.join(PROJECT_DIR, 'reports', 'tournament'),
+                        help='logs, strategies and latency reports of each match')
+    parser.add_argument('--out', help='writes one JSON line per match to this file')
+    args = parser.parse_args(argv)
+
+    variants = {variant.name: variant for variant in load_variants(args.variants)}
+    matches = schedule(list(variants.values()), args.games, args.baseline)
+    print(f'{len(matches)} matches of {args.turns} turns, {args.jobs} at a time')
+
+    rows = []
+    started = time.monotonic()
+    # spawn: cada partida começa em um interpretador limpo (gRPC não convive bem com fork)
+    with ProcessPoolExecutor(max_workers=args.jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+        pending = [pool.submit(run_match, match, variants, args.turns, args.listening_timeout, args.workdir)
+                   for match in matches]
+        for future in as_completed(pending):
+            row = future.result()
+            rows.append(row)
+            print(f"match {row['match']:3d}: {row['home']} {row['score']['home']} x {row['score']['away']} "
+                  f"{row['away']} ({row['seconds']:.1f}s, {sum(row['timed_out_turns'].values())} turns timed out)")
+
+    rows.sort(key=lambda row: row['match'])
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            for row in rows:
+                out_file.write(json.dumps(row, sort_keys=True) + '\n')
+
+    elapsed = time.monotonic() - started
+    print(f'{len(rows)} matches in {elapsed:.1f}s ({sum(row["turns"] for row in rows) / elapsed:.0f} turns/s)')
+    print(format_table(summarize(rows)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+from typing import List, Optional
+
+import numpy as np
+
+import lugo4py
+
+# Linha da bola na matriz de distâncias. Os aliados vêm logo depois e em seguida os adversários.
+BALL_ROW = 0
+
+
+class TurnContext:
+    """
+    Visão do snapshot em formato de arrays (struct-of-arrays), montada uma única vez por turno.
+    Posições e velocidades da bola, dos aliados e dos adversários são lidas do protobuf
+    apenas aqui; os helpers do bot respondem às consultas a partir destes arrays.
+    """
+
+    def __init__(self, inspector: lugo4py.GameSnapshotInspector):
+        self.inspector = inspector
+        self.turn = inspector.get_turn()
+        self.side = inspector.get_my_team_side()
+
+        self.allies: List[lugo4py.Player] = list(inspector.get_my_team_players())
+        self.opponents: List[lugo4py.Player] = list(inspector.get_opponent_players())
+
+        ball = inspector.get_ball()
+        self.ball_position = np.array([ball.position.x, ball.position.y], dtype=float)
+        self.ball_direction = np.array([ball.velocity.direction.x, ball.velocity.direction.y], dtype=float)
+        self.ball_speed = float(ball.velocity.speed)
+
+        self.ally_numbers = np.array([p.number for p in self.allies], dtype=int)
+        self.ally_positions = _positions(self.allies)
+        self.ally_directions = _directions(self.allies)
+        self.ally_speeds = _speeds(self.allies)
+
+        self.opponent_numbers = np.array([p.number for p in self.opponents], dtype=int)
+        self.opponent_positions = _positions(self.opponents)
+        self.opponent_directions = _directions(self.opponents)
+        self.opponent_speeds = _speeds(self.opponents)
+        # Velocidade observada de cada adversário (por turno), preenchida pelo OpponentTracker do bot
+        self.opponent_velocities = np.zeros_like(self.opponent_positions)
+
+        n_allies = len(self.allies)
+        self.ally_slice = slice(1, 1 + n_allies)
+        self.opponent_slice = slice(1 + n_allies, 1 + n_allies + len(self.opponents))
+
+        # Todas as posições empilhadas: [bola, aliados..., adversários...]
+        self.positions = np.vstack((self.ball_position[np.newaxis, :], self.ally_positions, self.opponent_positions))
+
+        self._ally_rows = {number: 1 + i for i, number in enumerate(self.ally_numbers.tolist())}
+        self._opponent_rows = {number: 1 + n_allies + i for i, number in enumerate(self.opponent_numbers.tolist())}
+        self._distances = None
+        self._predicted = {}
+
+        # Resultados derivados deste turno (trajetória da bola, etc.), compartilhados pelos helpers
+        self.cache = {}
+
+    @property
+    def distances(self) -> np.ndarray:
+        """
+        Matriz (até 23x23) de distâncias entre bola e jogadores, calculada na primeira consulta.
+        """
+        if self._distances is None:
+            delta = self.positions[:, np.newaxis, :] - self.positions[np.newaxis, :, :]
+            self._distances = np.hypot(delta[..., 0], delta[..., 1])
+        return self._distances
+
+    def set_opponent_velocities(self, velocities: np.ndarray):
+        self.opponent_velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)
+        self._predicted = {}
+
+    def opponent_positions_at(self, turns: int = 0) -> np.ndarray:
+        """
+        Posições (adversários, 2) previstas daqui a `turns` turnos, mantendo a velocidade observada
+        e limitadas ao campo. Com `turns` 0 são as posições atuais; cada previsão é calculada uma vez por turno.
+        """
+        if turns == 0:
+            return self.opponent_positions
+        predicted = self._predicted.get(turns)
+        if predicted is None:
+            predicted = self.opponent_positions + self.opponent_velocities * turns
+            np.clip(predicted[:, 0], 0, lugo4py.specs.MAX_X_COORDINATE, out=predicted[:, 0])
+            np.clip(predicted[:, 1], 0, lugo4py.specs.MAX_Y_COORDINATE, out=predicted[:, 1])
+            self._predicted[turns] = predicted
+        return predicted
+
+    def ally_row(self, number: int) -> Optional[int]:
+        return self._ally_rows.get(number)
+
+    def opponent_row(self, number: int) -> Optional[int]:
+        return self._opponent_rows.get(number)
+
+    def ally_index(self, number: int) -> Optional[int]:
+        row = self._ally_rows.get(number)
+        return None if row is None else row - 1
+
+    def ally_distances(self, row: int) -> np.ndarray:
+        """
+        Distâncias da entidade na linha `row` (bola ou jogador) até cada aliado.
+        """
+        return self.distances[row, self.ally_slice]
+
+    def opponent_distances(self, row: int) -> np.ndarray:
+        """
+        Distâncias da entidade na linha `row` (bola ou jogador) até cada adversário.
+        """
+        return self.distances[row, self.opponent_slice]
+
+    def ally_to_opponent_distances(self, turns: int = 0) -> np.ndarray:
+        """
+        Submatriz (aliados x adversários) de distâncias, com os adversários previstos daqui a `turns` turnos.
+        """
+        if turns == 0:
+            return self.distances[self.ally_slice, self.opponent_slice]
+        return self.opponent_distances_from(self.ally_positions, turns)
+
+    def opponent_distances_from(self, points: np.ndarray, turns: int = 0) -> np.ndarray:
+        """
+        Distâncias (N, adversários) de cada ponto de um array (N, 2) até cada adversário
+        (nas posições previstas daqui a `turns` turnos).
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        delta = points[:, np.newaxis, :] - self.opponent_positions_at(turns)[np.newaxis, :, :]
+        return np.hypot(delta[..., 0], delta[..., 1])
+
+    def nearest_opponent_distance(self, points: np.ndarray, turns: int = 0) -> np.ndarray:
+        """
+        Para cada ponto de um array (N, 2), retorna a distância até o adversário mais próximo
+        (nas posições previstas daqui a `turns` turnos). Sem adversários em campo, a distância é infinita.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(self.opponents) == 0:
+            return np.full(len(points), np.inf)
+        return self.opponent_distances_from(points, turns).min(axis=1)
+
+
+def get_turn_context(inspector: lugo4py.GameSnapshotInspector) -> TurnContext:
+    """
+    Retorna o TurnContext do inspector, criando-o na primeira chamada do turno.
+    """
+    context = getattr(inspector, '_turn_context', None)
+    if context is None:
+        context = TurnContext(inspector)
+        inspector._turn_context = context
+    return context
+
+
+# O carimbo guarda cada coordenada da bola em 16 bits: o campo precisa caber nisso
+assert max(lugo4py.specs.MAX_X_COORDINATE, lugo4py.specs.MAX_Y_COORDINATE) < 1 << 16
+
+
+def turn_key(inspector: lugo4py.GameSnapshotInspector) -> int:
+    """
+    Carimbo do turno: o número do turno (bits 32 em diante) e a posição da bola, x nos bits 16-31 e
+    y nos bits 0-15. A posição distingue turnos de mesmo número de partidas diferentes (ex.: um bloco
+    de memória que sobrou de uma partida anterior). O carimbo cabe em um int64 (o buffer do cache do
+    time) enquanto o turno tiver menos de 31 bits.
+    """
+    ball = inspector.get_ball().position
+    return (inspector.get_turn() << 32) | ((int(ball.x) & 0xFFFF) << 16) | (int(ball.y) & 0xFFFF)
+
+
+def _positions(players: List[lugo4py.Player]) -> np.ndarray:
+    return np.array([(p.position.x, p.position.y) for p in players], dtype=float).reshape(-1, 2)
+
+
+def _directions(players: List[lugo4py.Player]) -> np.ndarray:
+    return np.array([(p.velocity.direction.x, p.velocity.direction.y) for p in players], dtype=float).reshape(-1, 2)
+
+
+def _speeds(players: List[lugo4py.Player]) -> np.ndarray:
+    return np.array([p.velocity.speed for p in players], dtype=float)
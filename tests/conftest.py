@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do bot são importados pelo nome, como quando src/main.py roda de dentro de src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,35 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import lugo4py
+from lugo4py.protos import server_pb2
+
+HOME, AWAY = lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY
+
+
+def build_snapshot(home: Dict[int, Sequence[float]], away: Dict[int, Sequence[float]], ball: Sequence[float],
+                   turn: int = 1, holder: Optional[Tuple[int, int]] = None) -> server_pb2.GameSnapshot:
+    """
+    Snapshot com os jogadores parados nas posições dadas ({número: (x, y)} por time). `holder` é
+    (lado, número) do portador da bola.
+    """
+    snapshot = server_pb2.GameSnapshot()
+    snapshot.state = server_pb2.GameSnapshot.State.LISTENING
+    snapshot.turn = turn
+    for side, players, message in ((HOME, home, snapshot.home_team), (AWAY, away, snapshot.away_team)):
+        message.side = side
+        for number, (x, y) in players.items():
+            player = message.players.add()
+            player.number = number
+            player.team_side = side
+            player.position.x, player.position.y = x, y
+    snapshot.ball.position.x, snapshot.ball.position.y = ball
+    if holder is not None:
+        side, number = holder
+        message = snapshot.home_team if side == HOME else snapshot.away_team
+        snapshot.ball.holder.CopyFrom(next(p for p in message.players if p.number == number))
+    return snapshot
+
+
+def inspector_for(side, number: int, home: Dict[int, Sequence[float]], away: Dict[int, Sequence[float]],
+                  ball: Sequence[float], turn: int = 1, holder: Optional[Tuple[int, int]] = None):
+    return lugo4py.GameSnapshotInspector(side, number, build_snapshot(home, away, ball, turn, holder))
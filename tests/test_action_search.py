@@ -0,0 +1,126 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import lugo4py
+from action_search import (CARRY, PASS, PATH_SAMPLES, ROLLOUTS_PER_BATCH, SHOOT, ActionCandidates, ActionSearch,
+                           _converged, _estimate, rollout_batch)
+
+
+def context_with(opponents, numbers=None):
+    """
+    Só os campos do TurnContext que a simulação lê; os adversários estão parados.
+    """
+    positions = np.array(opponents, dtype=float).reshape(-1, 2)
+    return SimpleNamespace(
+        opponents=list(range(len(positions))),
+        opponent_positions=positions,
+        opponent_velocities=np.zeros_like(positions),
+        opponent_numbers=np.array(numbers if numbers is not None else range(2, 2 + len(positions)), dtype=int))
+
+
+def candidates_along(targets, success_value, failure_value, kinds=None, origin=(5000, 5000)):
+    """
+    Candidatos em linha reta de `origin` até cada alvo, com a bola andando um ponto por turno.
+    """
+    targets = np.array(targets, dtype=float).reshape(-1, 2)
+    fractions = np.arange(1, PATH_SAMPLES + 1) / PATH_SAMPLES
+    paths = origin + (targets - origin)[:, np.newaxis, :] * fractions[np.newaxis, :, np.newaxis]
+    kinds = kinds or [PASS] * len(targets)
+    return ActionCandidates(
+        kinds=kinds,
+        numbers=np.arange(len(targets)),
+        targets=targets,
+        paths=paths,
+        ball_turns=np.tile(np.arange(1, PATH_SAMPLES + 1, dtype=float), (len(targets), 1)),
+        ignores_goalkeeper=np.array([kind == SHOOT for kind in kinds]),
+        success_value=np.array(success_value, dtype=float),
+        failure_value=np.array(failure_value, dtype=float))
+
+
+def test_open_path_always_succeeds_and_blocked_path_never_does():
+    candidates = candidates_along([(5000, 8000), (8000, 5000)], [1, 1], [0, 0])
+    context = context_with([(7000, 5000)])
+
+    successes = rollout_batch(candidates, context, np.random.default_rng(0))
+
+    assert successes.tolist() == [ROLLOUTS_PER_BATCH, 0]
+
+
+def test_goalkeeper_does_not_contest_shots():
+    candidates = candidates_along([(8000, 5000), (8000, 5000)], [1, 1], [0, 0], kinds=[SHOOT, PASS])
+    context = context_with([(7000, 5000)], numbers=[lugo4py.specs.GOALKEEPER_NUMBER])
+
+    successes = rollout_batch(candidates, context, np.random.default_rng(0))
+
+    assert successes.tolist() == [ROLLOUTS_PER_BATCH, 0]
+
+
+def test_without_opponents_only_unreachable_paths_fail():
+    candidates = candidates_along([(5000, 8000), (8000, 5000)], [1, 1], [0, 0])
+    candidates.ball_turns[1, -1] = np.inf
+
+    successes = rollout_batch(candidates, context_with([]), np.random.default_rng(0))
+
+    assert successes.tolist() == [ROLLOUTS_PER_BATCH, 0]
+
+
+def test_estimate_starts_from_half_success():
+    candidates = candidates_along([(5000, 8000)], [1], [-1])
+
+    value, success = _estimate(candidates, np.zeros(1), 0)
+
+    assert success[0] == 0.5
+    assert value[0] == 0
+
+
+def test_converges_only_when_the_best_action_stands_out():
+    candidates = candidates_along([(5000, 8000), (8000, 5000), (2000, 5000)], [1, 1, 0.2], [-1, -1, -1])
+    rollouts = 2 * ROLLOUTS_PER_BATCH
+
+    assert _converged(candidates, np.array([rollouts, 0, 0]), rollouts)
+    assert not _converged(candidates, np.array([rollouts / 2, rollouts / 2, 0]), rollouts)
+
+
+def test_search_stops_once_converged():
+    candidates = candidates_along([(5000, 8000), (8000, 5000)], [1, 1], [0, 0])
+    search = ActionSearch(budget_ms=10000)
+
+    choice = search.search(candidates, context_with([(7000, 5000)]), time.perf_counter())
+
+    assert (choice.kind, choice.number) == (PASS, 0)
+    assert (choice.target.x, choice.target.y) == (5000, 8000)
+    assert search.converged_stops == 1 and search.deadline_stops == 0
+    assert search.batches == 2
+
+
+def test_search_runs_one_batch_when_stopped():
+    # Ações iguais nunca convergem: só o pedido de parada encerra a busca
+    candidates = candidates_along([(5000, 8000), (5000, 2000)], [1, 1], [0, 0])
+    search = ActionSearch(budget_ms=10000)
+    search.stop = threading.Event()
+    search.stop.set()
+
+    choice = search.search(candidates, context_with([(9000, 9000)]), time.perf_counter())
+
+    assert choice.rollouts == ROLLOUTS_PER_BATCH
+    assert search.stats()['choices'] == {SHOOT: 0, PASS: 1, CARRY: 0}
+
+
+def test_search_without_candidates():
+    assert ActionSearch(budget_ms=10).search(candidates_along([], [], []), context_with([]), 0) is None
+
+
+def test_from_env_is_opt_in(monkeypatch):
+    monkeypatch.delenv('ACTION_SEARCH', raising=False)
+    assert ActionSearch.from_env() is None
+
+    monkeypatch.setenv('ACTION_SEARCH', 'on')
+    monkeypatch.setenv('LISTENING_DURATION', '60ms')
+    monkeypatch.setenv('ACTION_SEARCH_FRACTION', '0.5')
+    search = ActionSearch.from_env(bots_in_process=3)
+
+    assert search.budget_ms == pytest.approx(10)
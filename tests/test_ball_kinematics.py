@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import lugo4py
+from ball_kinematics import BallTrajectory
+
+
+def step_positions(position, direction, speed, turns):
+    """
+    A bola turno a turno: a velocidade cai BALL_DECELERATION (sem ficar negativa) e a bola anda.
+    """
+    positions = [np.array(position, dtype=float)]
+    for _ in range(turns):
+        speed = max(speed - lugo4py.specs.BALL_DECELERATION, 0)
+        positions.append(positions[-1] + np.asarray(direction) / 100 * speed)
+    return np.array(positions)
+
+
+@pytest.mark.parametrize('speed', [0, 50, 99, 100, 250, lugo4py.specs.BALL_MAX_SPEED])
+def test_closed_form_matches_step_loop(speed):
+    angle = 0.7
+    direction = np.array([np.cos(angle), np.sin(angle)]) * 100
+    ball = BallTrajectory(np.array([5000.0, 4000.0]), direction, speed)
+    horizon = ball.stop_turn + 5
+
+    expected = step_positions(ball.position, direction, speed, horizon)
+
+    np.testing.assert_allclose(ball.trajectory(horizon), expected)
+    np.testing.assert_allclose(ball.stop_point, expected[-1])
+
+
+def test_turns_to_travel_matches_step_loop():
+    speed = lugo4py.specs.BALL_MAX_SPEED
+    ball = BallTrajectory(np.zeros(2), np.array([100.0, 0.0]), speed)
+    travelled = step_positions(np.zeros(2), [100.0, 0.0], speed, ball.stop_turn)[:, 0]
+    distances = np.linspace(0, travelled[-1] + 500, 97)
+
+    turns = ball.turns_to_travel(distances)
+
+    for distance, turn in zip(distances, turns):
+        reached = np.flatnonzero(travelled >= distance)
+        if len(reached):
+            assert turn == reached[0]
+        else:
+            assert np.isinf(turn)
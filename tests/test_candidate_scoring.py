@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import lugo4py
+from candidate_scoring import (best_candidate, grid_candidates, inside_field, refine_candidates, ring_candidates,
+                               score_candidates)
+from helpers import HOME, inspector_for
+from turn_context import get_turn_context
+
+
+def reference_score(point, opponents, goal, goal_weight):
+    nearest = min(np.hypot(point[0] - x, point[1] - y) for x, y in opponents)
+    return nearest - goal_weight * np.hypot(point[0] - goal.x, point[1] - goal.y)
+
+
+def test_scores_match_the_point_by_point_loop():
+    opponents = [(12000, 4000), (9000, 7000), (15000, 5000)]
+    inspector = inspector_for(HOME, 5, {5: (8000, 5000)}, dict(enumerate(opponents, start=2)), (8000, 5000))
+    goal = lugo4py.Point(x=20000, y=5000)
+    points = ring_candidates(lugo4py.Point(x=8000, y=5000), (500, 1000, 2000), -90, 90, 7)
+
+    scored = score_candidates(get_turn_context(inspector), points, goal=goal, goal_weight=0.3)
+
+    expected = [reference_score(point, opponents, goal, 0.3) for point in scored.points]
+    np.testing.assert_allclose(scored.score, expected)
+
+
+def test_points_outside_the_field_are_dropped():
+    width, height = lugo4py.specs.FIELD_WIDTH, lugo4py.specs.FIELD_HEIGHT
+    points = np.array([(100, 100), (-50, 5000), (5000, height), (width - 1, height - 1)], dtype=float)
+
+    assert inside_field(points).tolist() == [True, False, False, True]
+
+
+def test_lane_penalty_prefers_the_lane():
+    inspector = inspector_for(HOME, 5, {5: (8000, 5000)}, {2: (1000, 1000)}, (8000, 5000))
+    points = np.array([(10000, 3000), (10000, 7000)], dtype=float)
+
+    scored = score_candidates(get_turn_context(inspector), points, lane_y=7000, lane_weight=5)
+
+    assert best_candidate(scored).y == 7000
+
+
+def test_grid_follows_the_attack_direction():
+    origin = lugo4py.Point(x=10000, y=5000)
+
+    home = grid_candidates(origin, (1000, 2000), (-500, 0, 500), side_factor=1)
+    away = grid_candidates(origin, (1000, 2000), (-500, 0, 500), side_factor=-1)
+
+    assert home.shape == (6, 2)
+    assert set(home[:, 0]) == {11000, 12000}
+    assert set(away[:, 0]) == {9000, 8000}
+
+
+def test_refine_keeps_the_center_first():
+    center = lugo4py.Point(x=3000, y=4000)
+
+    points = refine_candidates(center, radii=(100,), n_angles=4)
+
+    np.testing.assert_allclose(points, [(3000, 4000), (3100, 4000), (3000, 4100), (2900, 4000), (3000, 3900)],
+                               atol=1e-9)
+
+
+@pytest.mark.parametrize('min_score', [np.inf, 10])
+def test_best_candidate_respects_the_minimum(min_score):
+    inspector = inspector_for(HOME, 5, {5: (8000, 5000)}, {2: (8000, 5000)}, (8000, 5000))
+    scored = score_candidates(get_turn_context(inspector), np.array([(8005, 5000)], dtype=float))
+
+    assert best_candidate(scored, min_score) is None
+    assert best_candidate(scored._replace(points=np.empty((0, 2)), score=np.empty(0))) is None
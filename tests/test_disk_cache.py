@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from disk_cache import KEEP_PER_NAME, cache_key, cache_path, load_or_build_array, prune
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('BOT_CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def touch(directory, filename, mtime):
+    path = directory / filename
+    path.write_bytes(b'')
+    os.utime(path, (mtime, mtime))
+    return filename
+
+
+def test_prune_keeps_the_newest_files(cache_dir):
+    files = [touch(cache_dir, f'shot_map_{index:012x}.npy', 1000 + index) for index in range(KEEP_PER_NAME + 2)]
+
+    prune('shot_map', '.npy')
+
+    assert sorted(os.listdir(cache_dir)) == sorted(files[-KEEP_PER_NAME:])
+
+
+def test_prune_only_touches_its_own_files(cache_dir):
+    others = [touch(cache_dir, 'shot_map_000000000001.json', 1), touch(cache_dir, 'shot_map_extra_000000000002.npy', 1),
+              touch(cache_dir, 'tactics_000000000003.npy', 1), touch(cache_dir, 'shot_map_000000000004.npy.9.tmp', 1)]
+    newest = touch(cache_dir, 'shot_map_00000000000a.npy', 2)
+
+    prune('shot_map', '.npy', keep=0)
+
+    assert sorted(os.listdir(cache_dir)) == sorted(others)
+    assert newest not in os.listdir(cache_dir)
+
+
+def test_prune_without_the_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('BOT_CACHE_DIR', str(tmp_path / 'missing'))
+
+    prune('shot_map', '.npy')
+
+
+def test_built_once_and_then_loaded(cache_dir):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return np.arange(6)
+
+    key = cache_key('test', 1)
+    first = load_or_build_array('table', key, build)
+    second = load_or_build_array('table', key, build, mmap=True)
+
+    assert len(builds) == 1
+    np.testing.assert_array_equal(first, second)
+    assert os.path.exists(cache_path('table', key, '.npy'))
+    assert cache_key('test', 2) != key
+
+
+def test_new_key_prunes_older_files(cache_dir):
+    for index in range(KEEP_PER_NAME):
+        touch(cache_dir, os.path.basename(cache_path('table', cache_key('test', index), '.npy')), 1000 + index)
+
+    load_or_build_array('table', cache_key('test', KEEP_PER_NAME), lambda: np.zeros(1))
+
+    assert len(os.listdir(cache_dir)) == KEEP_PER_NAME
+    assert not os.path.exists(cache_path('table', cache_key('test', 0), '.npy'))
+    assert os.path.exists(cache_path('table', cache_key('test', KEEP_PER_NAME), '.npy'))
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import lugo4py
+from field_grid import FieldGrid
+
+MAX_X = lugo4py.specs.MAX_X_COORDINATE
+MAX_Y = lugo4py.specs.MAX_Y_COORDINATE
+
+
+@pytest.mark.parametrize('side', [lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY])
+@pytest.mark.parametrize('cols, rows', [(10, 6), (16, 10), (40, 24), (7, 5)])
+def test_matches_mapper(side, cols, rows):
+    grid = FieldGrid(cols, rows, side)
+    mapper = lugo4py.Mapper(cols, rows, side)
+
+    for col in range(cols):
+        for row in range(rows):
+            center = mapper.get_region(col, row).get_center()
+            assert (grid.centers[col, row, 0], grid.centers[col, row, 1]) == (center.x, center.y)
+            assert grid.center(col, row) == center
+
+    rng = np.random.default_rng(cols * rows)
+    points = np.vstack((rng.integers(0, [MAX_X + 1, MAX_Y + 1], size=(500, 2)),
+                        [(0, 0), (MAX_X, MAX_Y), (0, MAX_Y), (MAX_X, 0)]))
+    cells = grid.cells_of(points)
+    for (x, y), cell in zip(points.tolist(), cells.tolist()):
+        region = mapper.get_region_from_point(lugo4py.Point(x=x, y=y))
+        assert cell == [region.get_col(), region.get_row()]
+        assert grid.cell_of(lugo4py.Point(x=x, y=y)) == (region.get_col(), region.get_row())
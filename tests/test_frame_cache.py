@@ -0,0 +1,87 @@
+from frame_cache import HIT, MISS, REFINE, FrameCache
+from helpers import HOME, inspector_for
+from turn_context import get_turn_context
+
+ME = {5: (8000, 5000)}
+
+
+def start(cache, turn, opponents, handler='on_supporting'):
+    context = get_turn_context(inspector_for(HOME, 5, ME, opponents, (8000, 5000), turn=turn))
+    cache.start_turn(context, handler)
+
+
+def stored_cache(opponents=None):
+    cache = FrameCache(reuse_distance=100, refine_distance=300)
+    start(cache, 1, opponents or {2: (9000, 5000), 3: (15000, 5000)})
+    cache.store('support', (8000, 5000), 2000, 'previous')
+    return cache
+
+
+def test_small_moves_reuse_the_result():
+    cache = stored_cache()
+    start(cache, 2, {2: (9050, 5000), 3: (15000, 5000)})
+
+    assert cache.lookup('support', (8050, 5000)) == (HIT, 'previous')
+
+
+def test_medium_moves_refine_the_result():
+    cache = stored_cache()
+    start(cache, 2, {2: (9200, 5000), 3: (15000, 5000)})
+
+    assert cache.lookup('support', (8000, 5000)) == (REFINE, 'previous')
+    cache.update('support', 'refined')
+    assert cache.lookup('support', (8000, 5000)) == (REFINE, 'refined')
+
+
+def test_large_moves_miss():
+    cache = stored_cache()
+    start(cache, 2, {2: (9000, 5000), 3: (15000, 5000)})
+
+    assert cache.lookup('support', (8500, 5000)) == (MISS, None)
+
+
+def test_far_opponents_do_not_count():
+    cache = stored_cache()
+    start(cache, 2, {2: (9000, 5000), 3: (16000, 5000)})
+
+    assert cache.lookup('support', (8000, 5000))[0] == HIT
+
+
+def test_opponent_entering_the_region_misses():
+    cache = stored_cache()
+    start(cache, 2, {2: (9000, 5000), 3: (9500, 5000)})
+
+    assert cache.lookup('support', (8000, 5000))[0] == MISS
+
+
+def test_relevant_opponent_leaving_the_field_misses():
+    cache = stored_cache()
+    start(cache, 2, {3: (15000, 5000)})
+
+    assert cache.lookup('support', (8000, 5000))[0] == MISS
+
+
+def test_skipped_turn_or_other_handler_invalidates():
+    cache = stored_cache()
+    start(cache, 3, {2: (9000, 5000), 3: (15000, 5000)})
+    assert cache.lookup('support', (8000, 5000))[0] == MISS
+
+    cache = stored_cache()
+    start(cache, 2, {2: (9000, 5000), 3: (15000, 5000)}, handler='on_defending')
+    assert cache.lookup('support', (8000, 5000))[0] == MISS
+    assert cache.invalidations == 1
+
+
+def test_fork_and_adopt():
+    cache = stored_cache()
+    fork = cache.fork()
+    start(fork, 2, {2: (9000, 5000), 3: (15000, 5000)})
+    fork.store('dribble', (8000, 5000), 2000, 'speculated')
+
+    start(cache, 2, {2: (9000, 5000), 3: (15000, 5000)})
+    cache.adopt(fork)
+
+    assert cache.lookup('support', (8000, 5000)) == (HIT, 'previous')
+    assert cache.lookup('dribble', (8000, 5000)) == (HIT, 'speculated')
+    assert fork.stats()['totals'] == {HIT: 0, REFINE: 0, MISS: 0}
+    assert cache.stats()['hit_rate'] == 1.0
@@ -0,0 +1,148 @@
+import pytest
+
+import lugo4py
+from local_server import AWAY, CATCH_DISTANCE, HOME, LocalGameServer, _PlayerState
+from lugo4py.protos import physics_pb2, server_pb2
+
+GOALKEEPER = lugo4py.specs.GOALKEEPER_NUMBER
+
+
+def server_with(*players):
+    """
+    Servidor sem rede, com os jogadores (lado, número, x, y) já em campo.
+    """
+    server = LocalGameServer()
+    for side, number, x, y in players:
+        server.players[(side, number)] = _PlayerState(side, number, physics_pb2.Point(x=x, y=y))
+    return server
+
+
+def velocity(x, y, speed):
+    return physics_pb2.Velocity(direction=physics_pb2.Vector(x=x, y=y), speed=speed)
+
+
+def play(server, orders):
+    """
+    Um turno com as ordens {(lado, número): [Order...]}.
+    """
+    server._arrivals = []
+    for key, player_orders in orders.items():
+        player = server.players[key]
+        player.orders = player_orders
+        server._arrivals.append(player)
+    server._play()
+
+
+def move(x, y, speed):
+    return server_pb2.Order(move=server_pb2.Move(velocity=velocity(x, y, speed)))
+
+
+def kick(x, y, speed):
+    return server_pb2.Order(kick=server_pb2.Kick(velocity=velocity(x, y, speed)))
+
+
+CATCH = server_pb2.Order(catch=server_pb2.Catch())
+
+
+def test_free_ball_slows_down_and_stops():
+    server = server_with()
+    server.ball.set_velocity(1, 0, 30)
+    start = server.ball.x
+
+    positions = []
+    for _ in range(4):
+        play(server, {})
+        positions.append(server.ball.x - start)
+
+    # A bola anda e depois perde BALL_DECELERATION
+    assert positions == [30, 50, 60, 60]
+    assert server.ball.speed == 0
+
+
+def test_ball_bounces_off_the_sideline():
+    server = server_with()
+    server.ball.x, server.ball.y = 5000, lugo4py.specs.MAX_Y_COORDINATE - 100
+    server.ball.set_velocity(0, 1, 300)
+
+    play(server, {})
+
+    assert server.ball.y == lugo4py.specs.MAX_Y_COORDINATE - 200
+    assert server.ball.dir_y == -1
+
+
+def test_ball_in_the_goal_scores_and_restarts():
+    server = server_with((HOME, 5, 3000, 4000))
+    server.players[(HOME, 5)].x = 9000
+    server.ball.x, server.ball.y = lugo4py.specs.MAX_X_COORDINATE - 100, 5000
+    server.ball.set_velocity(1, 0, 300)
+
+    play(server, {})
+
+    assert server.score == {HOME: 1, AWAY: 0}
+    assert (server.ball.x, server.ball.y, server.ball.speed) == (lugo4py.specs.MAX_X_COORDINATE / 2,
+                                                                  lugo4py.specs.MAX_Y_COORDINATE / 2, 0)
+    assert server.players[(HOME, 5)].x == 3000
+
+
+def test_moves_are_limited_to_the_max_speed_and_the_field():
+    server = server_with((HOME, 5, 50, 5000), (HOME, 6, 5000, 5000))
+
+    play(server, {(HOME, 5): [move(-1, 0, 100)], (HOME, 6): [move(0, 1, 1000)]})
+    play(server, {})
+
+    assert server.players[(HOME, 5)].x == 0
+    assert server.players[(HOME, 6)].y == 5000 + 2 * lugo4py.specs.PLAYER_MAX_SPEED
+
+
+def test_catch_only_within_reach():
+    reach = int(CATCH_DISTANCE)
+    server = server_with((HOME, 5, 5000 - reach, 5000), (AWAY, 5, 5000, 5000 + reach + 1))
+    server.ball.x, server.ball.y = 5000, 5000
+
+    play(server, {(AWAY, 5): [CATCH]})
+    assert server.holder is None
+    play(server, {(HOME, 5): [CATCH]})
+    assert server.holder is server.players[(HOME, 5)]
+
+    play(server, {(HOME, 5): [move(1, 0, 100)]})
+    assert (server.ball.x, server.ball.y) == (5100 - reach, 5000)
+    assert server.possession == {HOME: 2, AWAY: 0}
+
+
+@pytest.mark.parametrize('direction, speed', [((1, 0), 300), ((-1, 0), 150)])
+def test_kick_against_the_run_loses_force(direction, speed):
+    server = server_with((HOME, 5, 5000, 5000))
+    server.ball.x, server.ball.y = 5000, 5000
+    play(server, {(HOME, 5): [CATCH]})
+    server.players[(HOME, 5)].set_velocity(1, 0, 0)
+
+    play(server, {(HOME, 5): [kick(*direction, 300)]})
+
+    assert server.holder is None
+    assert server.ball.x == 5000 + direction[0] * speed
+    assert server.ball.speed == speed - lugo4py.specs.BALL_DECELERATION
+
+
+def test_only_the_goalkeeper_jumps():
+    server = server_with((HOME, GOALKEEPER, 0, 5000), (HOME, 5, 3000, 5000))
+
+    play(server, {(HOME, GOALKEEPER): [server_pb2.Order(jump=server_pb2.Jump(velocity=velocity(0, 1, 1000)))],
+                  (HOME, 5): [server_pb2.Order(jump=server_pb2.Jump(velocity=velocity(0, 1, 1000)))]})
+    # Durante o pulo, as ordens de movimento não valem
+    play(server, {(HOME, GOALKEEPER): [move(1, 0, 100)]})
+
+    goalkeeper = server.players[(HOME, GOALKEEPER)]
+    assert (goalkeeper.x, goalkeeper.y) == (0, 5000 + 2 * lugo4py.specs.GOALKEEPER_JUMP_SPEED)
+    assert server.players[(HOME, 5)].y == 5000
+
+
+def test_shot_clock_gives_the_ball_to_the_other_goalkeeper():
+    server = server_with((HOME, 5, 5000, 5000), (AWAY, GOALKEEPER, lugo4py.specs.MAX_X_COORDINATE, 5000))
+    server.ball.x, server.ball.y = 5000, 5000
+    play(server, {(HOME, 5): [CATCH]})
+
+    for _ in range(lugo4py.specs.SHOT_CLOCK_TIME - 1):
+        play(server, {})
+
+    assert server.holder is server.players[(AWAY, GOALKEEPER)]
+    assert server.snapshot().shot_clock.team_side == AWAY
@@ -0,0 +1,92 @@
+import copy
+
+import numpy as np
+import pytest
+
+from field_grid import FieldGrid
+from helpers import HOME, inspector_for
+from opponent_model import OpponentModel
+from turn_context import get_turn_context
+
+# Grade 10 x 3 do time da casa: colunas de 2000 a partir de x = 0, linhas de 10000 / 3
+GRID = FieldGrid(10, 3, HOME)
+
+
+def observe(model, turn, opponents):
+    context = get_turn_context(inspector_for(HOME, 5, {5: (1000, 1000)}, dict(enumerate(opponents, start=2)),
+                                             (1000, 1000), turn=turn))
+    model.update(context)
+
+
+def test_occupancy_is_the_mean_count_per_region():
+    # Meia-vida longa: a média dos dois turnos quase sem decaimento
+    model = OpponentModel(GRID, half_life=1e9)
+    assert not model.observed
+    observe(model, 1, [(1000, 1000), (1500, 1500)])
+    observe(model, 2, [(1000, 1000), (19000, 9000)])
+
+    occupancy = model.occupancy()
+
+    assert model.observed
+    assert occupancy[0, 0] == pytest.approx(1.5)
+    assert occupancy[9, 2] == pytest.approx(0.5)
+    assert occupancy.sum() == pytest.approx(2)
+
+
+def test_older_turns_weigh_less():
+    model = OpponentModel(GRID, half_life=10)
+    observe(model, 1, [(1000, 1000)])
+    observe(model, 11, [(19000, 9000)])
+
+    occupancy = model.occupancy()
+
+    assert occupancy[0, 0] == pytest.approx(1 / 3)
+    assert occupancy[9, 2] == pytest.approx(2 / 3)
+
+
+def test_least_covered_row():
+    model = OpponentModel(GRID)
+    # Sem observações, todas empatam: fica a faixa central
+    assert model.least_covered_row(0) == 1
+
+    observe(model, 1, [(15000, 5000), (15000, 1000), (3000, 9000), (3000, 5000)])
+
+    assert model.least_covered_row(5) == 2
+    assert model.least_covered_row(0, 4) == 0
+
+
+def test_earlier_turn_restarts_the_model():
+    model = OpponentModel(GRID)
+    observe(model, 100, [(1000, 1000)])
+    observe(model, 1, [(19000, 9000)])
+
+    assert model.occupancy()[0, 0] == 0
+    assert model.occupancy()[9, 2] == pytest.approx(1)
+
+
+def test_rescaling_keeps_the_averages():
+    rng = np.random.default_rng(3)
+    model = OpponentModel(GRID, half_life=1)
+    reference = np.zeros((GRID.cols, GRID.rows))
+    weights = 0.0
+    for turn in range(0, 400, 5):
+        positions = rng.integers((0, 0), (20000, 10000), size=(3, 2))
+        observe(model, turn, positions)
+        reference *= 2 ** -5
+        weights = weights * 2 ** -5 + 1
+        for x, y in positions:
+            reference[GRID.col_of(x), GRID.row_of(y)] += 1
+
+    assert model._weight < 1e100
+    np.testing.assert_allclose(model.occupancy(), reference / weights)
+
+
+def test_copies_do_not_share_statistics():
+    model = OpponentModel(GRID)
+    observe(model, 1, [(1000, 1000)])
+    fork = copy.deepcopy(model)
+
+    observe(fork, 2, [(19000, 9000)])
+
+    assert model.occupancy()[9, 2] == 0
+    assert fork.grid is model.grid
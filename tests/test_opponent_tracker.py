@@ -0,0 +1,68 @@
+import numpy as np
+
+import lugo4py
+from helpers import HOME, inspector_for
+from opponent_tracker import HISTORY_TURNS, OpponentTracker
+from turn_context import get_turn_context
+
+
+def observe(tracker, turn, opponents):
+    tracker.update(get_turn_context(inspector_for(HOME, 5, {5: (1000, 1000)}, opponents, (1000, 1000), turn=turn)))
+
+
+def test_velocity_is_the_mean_displacement_in_the_window():
+    tracker = OpponentTracker()
+    for turn in range(1, 8):
+        observe(tracker, turn, {2: (5000 + 50 * turn, 5000 - 20 * turn)})
+
+    np.testing.assert_allclose(tracker.velocities_of(np.array([2])), [(50, -20)])
+
+
+def test_first_turn_is_still():
+    tracker = OpponentTracker()
+    observe(tracker, 1, {2: (5000, 5000)})
+
+    assert not tracker.velocities.any()
+
+
+def test_speed_is_limited():
+    tracker = OpponentTracker()
+    observe(tracker, 1, {2: (5000, 5000), 3: (1000, 1000)})
+    observe(tracker, 2, {2: (5600, 5000), 3: (1050, 1000)})
+
+    np.testing.assert_allclose(tracker.velocities_of(np.array([2, 3])),
+                               [(lugo4py.specs.PLAYER_MAX_SPEED, 0), (50, 0)])
+
+
+def test_repeated_turn_is_ignored():
+    tracker = OpponentTracker()
+    observe(tracker, 1, {2: (5000, 5000)})
+    observe(tracker, 2, {2: (5040, 5000)})
+    observe(tracker, 2, {2: (9000, 5000)})
+
+    np.testing.assert_allclose(tracker.velocities_of(np.array([2])), [(40, 0)])
+
+
+def test_samples_outside_the_window_are_not_used():
+    tracker = OpponentTracker()
+    observe(tracker, 1, {2: (5000, 5000)})
+    observe(tracker, 1 + HISTORY_TURNS, {2: (5100, 5000)})
+
+    assert not tracker.velocities.any()
+
+
+def test_players_missing_from_a_sample_stay_still():
+    tracker = OpponentTracker()
+    observe(tracker, 1, {2: (5000, 5000)})
+    observe(tracker, 2, {2: (5030, 5000), 3: (7000, 5000)})
+
+    np.testing.assert_allclose(tracker.velocities_of(np.array([2, 3])), [(30, 0), (0, 0)])
+
+
+def test_earlier_turn_restarts_the_history():
+    tracker = OpponentTracker()
+    observe(tracker, 10, {2: (5000, 5000)})
+    observe(tracker, 11, {2: (5050, 5000)})
+    observe(tracker, 1, {2: (9000, 5000)})
+
+    assert not tracker.velocities.any()
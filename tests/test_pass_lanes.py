@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from pass_lanes import best_pass, evaluate_passes
+
+
+def context_with(ball, allies, opponents):
+    """
+    Só os campos do TurnContext que evaluate_passes lê; `allies` é {número: posição}.
+    """
+    numbers = list(allies)
+    return SimpleNamespace(
+        ball_position=np.array(ball, dtype=float),
+        opponents=list(range(len(opponents))),
+        opponent_positions=np.array(opponents, dtype=float).reshape(-1, 2),
+        ally_positions=np.array([allies[n] for n in numbers], dtype=float).reshape(-1, 2),
+        ally_index=lambda number: numbers.index(number) if number in numbers else None)
+
+
+def test_open_lane_is_safe():
+    context = context_with((5000, 5000), {7: (9000, 5000)}, [(5000, 9000)])
+
+    options = evaluate_passes(context, [7], [(9000, 5000)], side_factor=1)
+
+    assert options.margin[0] > 2
+    assert options.risk[0] < 0.2
+
+
+def test_opponent_on_the_lane_is_risky():
+    context = context_with((5000, 5000), {7: (9000, 5000)}, [(7000, 5000)])
+
+    options = evaluate_passes(context, [7], [(9000, 5000)], side_factor=1)
+
+    assert options.margin[0] < 0
+    assert options.risk[0] > 0.5
+
+
+def test_lane_past_the_receiver_is_not_contested():
+    # O companheiro está no meio da linha: domina a bola antes do adversário que espera no alvo
+    context = context_with((5000, 5000), {7: (6500, 5000)}, [(9000, 5000)])
+    without_receiver = context_with((5000, 5000), {}, [(9000, 5000)])
+
+    options = evaluate_passes(context, [7], [(9000, 5000)], side_factor=1)
+    reference = evaluate_passes(without_receiver, [7], [(9000, 5000)], side_factor=1)
+
+    assert options.margin[0] > 0
+    assert reference.margin[0] < options.margin[0]
+
+
+def test_without_opponents_only_unreachable_targets_are_lost():
+    context = context_with((1000, 5000), {7: (3000, 5000)}, [])
+
+    options = evaluate_passes(context, [7, 8], [(3000, 5000), (19000, 5000)], side_factor=1)
+
+    # O chute mais forte para antes de 18000: o alvo mais avançado (o primeiro) não é alcançado
+    assert options.margin.tolist() == [-np.inf, np.inf]
+    assert np.isinf(options.ball_turns[0])
+
+
+@pytest.mark.parametrize('side_factor', [1, -1])
+def test_options_are_ordered_by_advance(side_factor):
+    targets = [(8000, 2000), (12000, 5000), (4000, 8000)]
+    context = context_with((10000, 5000), {2: targets[0], 3: targets[1], 4: targets[2]}, [(0, 0)])
+
+    options = evaluate_passes(context, [2, 3, 4], targets, side_factor=side_factor)
+
+    expected = [3, 2, 4] if side_factor == 1 else [4, 2, 3]
+    assert options.numbers.tolist() == expected
+
+
+def test_best_pass_takes_the_most_advanced_safe_target():
+    context = context_with((5000, 5000), {2: (8000, 2000), 3: (12000, 5000)}, [(10500, 5000)])
+    options = evaluate_passes(context, [2, 3], [(8000, 2000), (12000, 5000)], side_factor=1)
+
+    target = best_pass(options, max_risk=0.3)
+
+    assert (target.x, target.y) == (8000, 2000)
+    assert best_pass(options, max_risk=0) is None
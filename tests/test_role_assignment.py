@@ -0,0 +1,36 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from role_assignment import min_cost_assignment
+
+
+def brute_force_cost(cost: np.ndarray) -> float:
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(columns)].sum() for columns in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(0, 10000, size=(4, 10))
+    # Custos repetidos e proibidos, como nas matrizes do time
+    cost[rng.random(cost.shape) < 0.2] = 1e9
+    cost[:, rng.integers(10)] = cost[0, 0]
+
+    assignment = min_cost_assignment(cost)
+
+    assert len(set(assignment.tolist())) == 4
+    assert cost[np.arange(4), assignment].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_square_matrix():
+    rng = np.random.default_rng(42)
+    cost = rng.uniform(0, 100, size=(4, 4))
+    assert cost[np.arange(4), min_cost_assignment(cost)].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_more_rows_than_columns():
+    with pytest.raises(ValueError):
+        min_cost_assignment(np.zeros((3, 2)))
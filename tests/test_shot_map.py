@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import lugo4py
+from shot_map import QUALITY, ShotMap, aim_points, build_shot_map, keeper_turns, load_shot_map
+
+HOME, AWAY = lugo4py.TeamSide.HOME, lugo4py.TeamSide.AWAY
+MAX_X = lugo4py.specs.MAX_X_COORDINATE
+
+
+@pytest.fixture(scope='module')
+def shot_map():
+    return ShotMap(build_shot_map())
+
+
+def test_closer_shots_are_better(shot_map):
+    near, _ = shot_map.lookup(HOME, lugo4py.Point(x=18000, y=5000), 4000)
+    far, _ = shot_map.lookup(HOME, lugo4py.Point(x=3000, y=5000), 4000)
+    centered, _ = shot_map.lookup(HOME, lugo4py.Point(x=18000, y=5000), 5000)
+
+    assert near > 0.9
+    assert far < 0.1
+    # Com o goleiro no meio do gol, sobra menos canto para a mira
+    assert centered < near
+
+
+def test_aim_is_away_from_the_keeper(shot_map):
+    _, aim_low = shot_map.lookup(HOME, lugo4py.Point(x=17000, y=5000), 6000)
+    _, aim_high = shot_map.lookup(HOME, lugo4py.Point(x=17000, y=5000), 4000)
+
+    assert aim_low.x == MAX_X
+    assert aim_low.y < 5000 < aim_high.y
+    assert aim_low.y in aim_points() and aim_high.y in aim_points()
+
+
+def test_away_view_is_the_mirrored_field(shot_map):
+    home_quality, home_aim = shot_map.lookup(HOME, lugo4py.Point(x=16000, y=3000), 5500)
+    away_quality, away_aim = shot_map.lookup(AWAY, lugo4py.Point(x=MAX_X - 16000, y=3000), 5500)
+
+    assert away_quality == home_quality
+    assert (away_aim.x, away_aim.y) == (0, home_aim.y)
+
+
+@pytest.mark.parametrize('side', [HOME, AWAY])
+def test_batched_lookups_match_lookup(shot_map, side):
+    rng = np.random.default_rng(7)
+    shooters = rng.uniform((0, 0), (MAX_X, lugo4py.specs.MAX_Y_COORDINATE), size=(30, 2))
+    keepers = rng.uniform(3000, 7000, size=30)
+
+    qualities, aims = shot_map.lookups(side, shooters, keepers)
+
+    for shooter, keeper, quality, aim in zip(shooters, keepers, qualities, aims):
+        expected_quality, expected_aim = shot_map.lookup(side, lugo4py.Point(x=shooter[0], y=shooter[1]), keeper)
+        assert quality == expected_quality
+        assert tuple(aim) == (expected_aim.x, expected_aim.y)
+    np.testing.assert_array_equal(shot_map.qualities(side, shooters, 5000),
+                                  shot_map.lookups(side, shooters, np.full(30, 5000.0))[0])
+
+
+def test_keeper_turns_grow_with_the_gap():
+    turns = keeper_turns(np.array([0, 500, 1000, 3000, 6000]))
+
+    assert turns[0] == turns[1]  # dentro do alcance do goleiro parado
+    assert np.all(np.diff(turns[1:]) > 0)
+
+
+def test_load_shot_map_writes_once(tmp_path):
+    path = str(tmp_path / 'shot_map.npy')
+
+    first = load_shot_map(path)
+    second = load_shot_map(path)
+
+    assert isinstance(second.table, np.memmap)
+    np.testing.assert_array_equal(first.table[QUALITY], second.table[QUALITY])
@@ -0,0 +1,140 @@
+import copy
+import json
+import logging
+import os
+
+import pytest
+
+from strategy import DEFAULT_PATH, MAX_TURN_LAG, Strategy, StrategyError, StrategyWatcher, load_strategy
+
+with open(DEFAULT_PATH) as strategy_file:
+    DEFAULT = json.load(strategy_file)
+
+
+def write(path, data, mtime_ns):
+    with open(path, 'w') as strategy_file:
+        json.dump(data, strategy_file)
+    # O watcher compara mtime e tamanho: o mtime fixo não depende da resolução do relógio
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def revision(number):
+    data = copy.deepcopy(DEFAULT)
+    data['revision'] = number
+    return data
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    path = str(tmp_path / 'strategy.json')
+    write(path, revision(1), 10 ** 18)
+    return StrategyWatcher(path, poll_interval=0)
+
+
+def test_default_strategy_is_valid():
+    strategy = load_strategy()
+
+    assert strategy.def_players == DEFAULT['def_players']
+    assert [name for name, _ in strategy.tactic_states] == [name for name, _ in DEFAULT['tactic_states']]
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda data: data.pop('radii'), 'missing keys'),
+    (lambda data: data.update(extra=1), 'unknown keys'),
+    (lambda data: data.update(format=2), 'format'),
+    (lambda data: data.update(def_players=[2, 2]), 'repeated'),
+    (lambda data: data['radii'].update(free_ally=-1), 'radii.free_ally'),
+    (lambda data: data['tactic_states'].reverse(), 'must increase'),
+    (lambda data: data['tactic_states'][-1].__setitem__(1, '9/10'), 'must be 1'),
+    (lambda data: data['tactic_positions']['NORMAL']['2'].update(Col=99), 'NORMAL.2.Col'),
+    (lambda data: data['tactic_positions'].pop('NORMAL'), 'no tactic_positions'),
+])
+def test_invalid_strategies_are_rejected(change, message):
+    data = copy.deepcopy(DEFAULT)
+    change(data)
+
+    with pytest.raises(StrategyError, match=message):
+        Strategy(data)
+
+
+def test_fingerprint_follows_the_content():
+    assert Strategy(revision(1)).fingerprint == Strategy(revision(1)).fingerprint
+    assert Strategy(revision(1)).fingerprint != Strategy(revision(2)).fingerprint
+    assert Strategy(revision(1)).fingerprint < 1 << 47
+
+
+def test_unreadable_file(tmp_path):
+    path = tmp_path / 'strategy.json'
+    path.write_text('{')
+
+    with pytest.raises(StrategyError, match='could not read'):
+        load_strategy(str(path))
+
+
+def test_reload_takes_effect_on_the_next_turn(watcher):
+    assert watcher.for_turn(10).revision == 1
+    assert not watcher.poll()
+
+    write(watcher.path, revision(2), 2 * 10 ** 18)
+    assert watcher.poll()
+
+    assert watcher.for_turn(11).revision == 2
+    assert watcher.reloads == 1
+
+
+def test_lagging_turn_keeps_the_previous_strategy(watcher):
+    watcher.for_turn(10)
+    write(watcher.path, revision(2), 2 * 10 ** 18)
+    watcher.poll()
+
+    assert watcher.for_turn(11).revision == 2
+    # Um bot do time ainda no turno 10 não troca de estratégia no meio do turno
+    assert watcher.for_turn(10).revision == 1
+    assert watcher.for_turn(11).revision == 2
+
+
+def test_earlier_match_uses_the_current_strategy(watcher):
+    watcher.for_turn(100)
+    write(watcher.path, revision(2), 2 * 10 ** 18)
+    watcher.poll()
+    watcher.for_turn(101)
+
+    assert watcher.for_turn(100 - MAX_TURN_LAG - 1).revision == 2
+
+
+def test_invalid_file_keeps_the_current_strategy(watcher, caplog):
+    data = revision(2)
+    data['def_players'] = []
+    write(watcher.path, data, 2 * 10 ** 18)
+
+    with caplog.at_level(logging.WARNING, logger='strategy'):
+        assert not watcher.poll()
+
+    assert watcher.for_turn(11).revision == 1
+    assert watcher.errors == 1
+    assert 'keeping revision 1' in caplog.text
+
+
+def test_swap_is_logged_outside_the_turn(watcher, caplog):
+    write(watcher.path, revision(2), 2 * 10 ** 18)
+    watcher.poll()
+
+    with caplog.at_level(logging.INFO, logger='strategy'):
+        watcher.for_turn(5)
+        assert not caplog.records
+        watcher.report_swap()
+        watcher.report_swap()
+
+    assert [record.getMessage() for record in caplog.records] == ['strategy revision 2 in use from turn 5']
+
+
+def test_prepare_runs_on_load(tmp_path):
+    path = str(tmp_path / 'strategy.json')
+    write(path, revision(1), 10 ** 18)
+    prepared = []
+
+    watcher = StrategyWatcher(path, prepare=lambda strategy: prepared.append(strategy.revision), poll_interval=0)
+    write(path, revision(2), 2 * 10 ** 18)
+    watcher.poll()
+
+    assert prepared == [1, 2]
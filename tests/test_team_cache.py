@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from team_cache import CHECKSUM, GENERATION, HEADER, KEY, TeamTurnCache
+from turn_context import turn_key
+
+FACTS = {'closest': 4, 'free': 3}
+
+
+def test_round_trip():
+    cache = TeamTurnCache(FACTS)
+    cache.put(7, 'closest', [1, 2, 3, 4])
+
+    np.testing.assert_array_equal(cache.get(7, 'closest'), [1, 2, 3, 4])
+    assert cache.get(8, 'closest') is None
+    assert cache.get(7, 'free') is None
+
+
+def test_write_in_progress_is_not_read():
+    cache = TeamTurnCache(FACTS)
+    cache.put(7, 'closest', [1, 2, 3, 4])
+    data = cache._data[cache.slots['closest']]
+
+    data[GENERATION] += 1
+
+    assert cache.get(7, 'closest') is None
+
+
+def test_torn_values_are_not_read():
+    # Dois processos escrevendo o mesmo turno: a geração não é atômica entre processos, então os
+    # valores do segundo podem ficar pela metade sobre os do primeiro, com a geração par
+    cache = TeamTurnCache(FACTS)
+    cache.put(7, 'closest', [1, 2, 3, 4])
+    data = cache._data[cache.slots['closest']]
+
+    data[HEADER:HEADER + 2] = [9, 9]
+
+    assert cache.get(7, 'closest') is None
+
+
+def test_values_of_another_turn_are_not_read():
+    cache = TeamTurnCache(FACTS)
+    cache.put(7, 'closest', [1, 2, 3, 4])
+    data = cache._data[cache.slots['closest']]
+
+    # Carimbo novo sobre os valores e o checksum do turno anterior
+    data[KEY] = 8
+
+    assert cache.get(8, 'closest') is None
+    data[KEY] = 7
+    assert cache.get(7, 'closest') is not None
+    data[CHECKSUM] ^= 1
+    assert cache.get(7, 'closest') is None
+
+
+def test_shared_buffer():
+    buffer = bytearray(sum(HEADER + size for size in FACTS.values()) * 8)
+    writer, reader = TeamTurnCache(FACTS, buffer), TeamTurnCache(FACTS, buffer)
+
+    writer.put(3, 'free', [5, 6, 7])
+
+    np.testing.assert_array_equal(reader.get(3, 'free'), [5, 6, 7])
+    assert reader.get_or_compute(3, 'free', lambda: [0, 0, 0]).tolist() == [5, 6, 7]
+    assert reader.hits == 1
+
+
+def inspector_at(turn, x, y):
+    ball = SimpleNamespace(position=SimpleNamespace(x=x, y=y))
+    return SimpleNamespace(get_turn=lambda: turn, get_ball=lambda: ball)
+
+
+def test_turn_key_layout():
+    key = turn_key(inspector_at(1234, 20000, 10000))
+
+    assert key >> 32 == 1234
+    assert (key >> 16) & 0xFFFF == 20000
+    assert key & 0xFFFF == 10000
+    # Mesmo turno com a bola em outro lugar: outro carimbo, que ainda cabe no int64 do buffer
+    assert turn_key(inspector_at(1234, 20000, 9999)) != key
+    assert np.array([key], dtype=np.int64)[0] == key
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from read_telemetry import summarize
+from telemetry import ERROR_TEXT_SIZE, UNKNOWN, Telemetry, read_records, telemetry_bot, telemetry_from_env
+
+# A thread não grava nada durante o teste: só flush() e close()
+NO_FLUSH = 3600
+
+
+def new_telemetry(tmp_path, **kwargs):
+    return Telemetry(str(tmp_path / 'telemetry.bin'), ['pass', 'shoot'], flush_interval=NO_FLUSH, **kwargs)
+
+
+def failure(message):
+    try:
+        raise RuntimeError(message)
+    except RuntimeError as e:
+        return e
+
+
+def test_records_round_trip(tmp_path):
+    telemetry = new_telemetry(tmp_path, budget_ms=5)
+    telemetry.record(7, 1200.5, 0, 9, 'on_holding', 'shoot')
+    telemetry.record(8, 6000, 1, 3, 'on_defending', 'not-a-branch', failure('boom'))
+    telemetry.close()
+
+    first, second = read_records(telemetry.path)
+
+    assert first._replace(elapsed_us=round(first.elapsed_us, 1)) == \
+        (7, 1200.5, 0, 9, 'on_holding', 'shoot', False, '', False)
+    assert (second.handler, second.branch, second.failed, second.over_budget) == \
+        ('on_defending', UNKNOWN, True, True)
+    assert second.error.startswith('test_telemetry.py:')
+    assert second.error.endswith('RuntimeError: boom')
+
+
+def test_error_text_is_truncated(tmp_path):
+    telemetry = new_telemetry(tmp_path)
+    telemetry.record(1, 10, 0, 2, 'on_supporting', None, failure('x' * 200))
+    telemetry.close()
+
+    record, = read_records(telemetry.path)
+
+    assert len(record.error) == ERROR_TEXT_SIZE
+    assert record.branch == UNKNOWN
+
+
+def test_buffer_wraps_around_and_drops_when_full(tmp_path):
+    telemetry = new_telemetry(tmp_path, capacity=3)
+    for turn in range(1, 3):
+        telemetry.record(turn, 10, 0, 2, 'on_holding', 'pass')
+    telemetry.flush()
+    for turn in range(3, 7):
+        telemetry.record(turn, 10, 0, 2, 'on_holding', 'pass')
+    telemetry.close()
+
+    assert [record.turn for record in read_records(telemetry.path)] == [1, 2, 3, 4, 5]
+    assert telemetry.dropped == 1
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+
+    with pytest.raises(ValueError, match='not a telemetry file'):
+        list(read_records(str(path)))
+
+
+def test_bot_handlers_are_recorded(tmp_path):
+    telemetry = new_telemetry(tmp_path)
+    bot = SimpleNamespace(side=0, number=4)
+
+    def on_holding(inspector):
+        bot.turn_branch = 'pass'
+        return 'orders'
+
+    bot.on_holding = on_holding
+    telemetry_bot(bot, telemetry, handlers=['on_holding'])
+
+    assert bot.on_holding(SimpleNamespace(get_turn=lambda: 12)) == 'orders'
+    telemetry.close()
+    record, = read_records(telemetry.path)
+
+    assert (record.turn, record.number, record.handler, record.branch) == (12, 4, 'on_holding', 'pass')
+    assert summarize([record])['branches'][('on_holding', 'pass')]['turns'] == 1
+
+
+def test_telemetry_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv('TELEMETRY_DIR', raising=False)
+    assert telemetry_from_env(0, 5, ['pass']) is None
+
+    monkeypatch.setenv('TELEMETRY_DIR', str(tmp_path))
+    telemetry = telemetry_from_env(1, 5, ['pass'])
+    telemetry.close()
+
+    assert telemetry.path == str(tmp_path / 'telemetry_away_05.bin')